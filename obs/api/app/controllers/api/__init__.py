@@ -13,10 +13,12 @@ api.add_resource(upload_object, "/storage/object/upload/<bucket_name>")
 api.add_resource(move_object, "/storage/object/move/<bucket_name>")
 api.add_resource(copy_object, "/storage/object/copy/<bucket_name>")
 api.add_resource(presign, "/storage/presign/<bucket_name>/<object_name>")
+api.add_resource(presign_batch, "/storage/presign/<bucket_name>")
 api.add_resource(mkdir, "/storage/mkdir/<bucket_name>")
 api.add_resource(acl, "/storage/acl")
 api.add_resource(list, "/storage/list")
 api.add_resource(usage, "/storage/usage")
+api.add_resource(batch, "/storage/batch")
 api.add_resource(gmt_policy, "/storage/gmt")
 
 api.add_resource(user_api, "/admin/user")
@@ -1,11 +1,12 @@
 import re
+import itertools
 
 from obs.libs import qos
 from obs.libs import user
 from obs.libs import credential
 from obs.libs import auth as client
 from obs.libs import admin as admin_usage
-from obs.api.app.helpers.rest import response
+from obs.api.app.helpers.rest import response, ndjson_response
 from flask import current_app
 from flask_restful import Resource, reqparse, inputs
 
@@ -37,6 +38,9 @@ class user_api(Resource):
         parser.add_argument("limit", type=str, default="")
         parser.add_argument("userId", type=str)
         parser.add_argument("groupId", type=str, required=True)
+        parser.add_argument(
+            "format", type=str, default="json", choices=("json", "ndjson")
+        )
         args = parser.parse_args()
 
         try:
@@ -51,6 +55,19 @@ class user_api(Resource):
                     return response(users["status_code"], message=users["reason"])
                 return response(200, data=users)
 
+            if args["format"] == "ndjson" and not args["limit"]:
+                users = user.iter_users(
+                    get_client(),
+                    args["groupId"],
+                    args["user_type"],
+                    args["user_status"],
+                )
+                # a failing first page gets an error response instead of a stream
+                first = next(users, None)
+                if first is None:
+                    return ndjson_response(200, [])
+                return ndjson_response(200, itertools.chain([first], users))
+
             user_list = user.list_user(
                 get_client(),
                 args["groupId"],
@@ -63,6 +80,8 @@ class user_api(Resource):
                 current_app.logger.error(user_list["reason"])
                 return response(user_list["status_code"], message=user_list["reason"])
 
+            if args["format"] == "ndjson":
+                return ndjson_response(200, user_list)
             return response(200, data=user_list)
         except Exception as e:
             current_app.logger.error(f"{e}")
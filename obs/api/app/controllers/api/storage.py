@@ -1,26 +1,39 @@
 import os
 import re
-import boto3
-import zipfile
+import itertools
 import tempfile
+import unicodedata
 import xmltodict
 
 from obs.libs import bucket
 from obs.libs import gmt
+from obs.libs import batch as batch_lib
 from obs.libs import auth
 from obs.libs import utils
+from obs.libs import listing
+from obs.libs import archive
+from obs.libs import transfer
 from requests_aws4auth import AWS4Auth
-from obs.api.app.helpers.rest import response
+from obs.api.app.helpers.rest import response, ndjson_response, records_response
 from werkzeug.utils import secure_filename
-from flask import request, current_app, send_from_directory
-from flask_restful import Resource, reqparse
+from werkzeug.urls import url_quote
+from werkzeug.http import parse_options_header, quote_header_value
+from werkzeug.formparser import MultiPartParser
+from flask import Response, request, current_app, stream_with_context
+from flask_restful import Resource, reqparse, inputs
+
+# uploads that can't be streamed are kept in memory up to this size
+SPOOL_SIZE = 512 * 1024
+# most operations or presigned URLs accepted in one batch request
+BATCH_LIMIT = 1000
+# most entries of a listing page, as limited by S3
+MAX_KEYS = 1000
+# formats of listings, "ndjson" streams one record per line
+FORMATS = ("json", "ndjson")
 
 
 def get_resources(access_key, secret_key):
-    endpoint = auth.get_endpoint("storage")
-    sess = boto3.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
-    s3_resource = sess.resource("s3", endpoint_url=endpoint)
-    return s3_resource
+    return auth.pooled_resource(access_key, secret_key)
 
 
 def get_plain_auth(access_key, secret_key):
@@ -28,17 +41,63 @@ def get_plain_auth(access_key, secret_key):
     return auth
 
 
-def list_objects(buckets):
-    objects = []
-    if buckets["CommonPrefixes"]:
-        for prefix in buckets["CommonPrefixes"]:
-            objects.append({"directory": f"{prefix['Prefix']}"})
-
-    if buckets["Contents"]:
-        for content in buckets["Contents"]:
-            content["LastModified"] = f'{content["LastModified"]:%Y-%m-%d %H:%M:%S}'
-            objects.append(content)
-    return objects
+def list_objects(entries):
+    for entry in entries:
+        if "Prefix" in entry:
+            yield {"directory": f"{entry['Prefix']}"}
+        else:
+            entry["LastModified"] = f'{entry["LastModified"]:%Y-%m-%d %H:%M:%S}'
+            yield entry
+
+
+def list_page(args, secret_key, bucket_name, prefix, max_keys):
+    token = args["continuation_token"]
+    entries, next_token = bucket.list_page(
+        get_resources(args["access_key"], secret_key),
+        bucket_name,
+        prefix,
+        max_keys=max_keys,
+        continuation_token=token and token.replace(" ", "+"),
+        start_after=args["start_after"],
+    )
+    return response(
+        200, data=[*list_objects(entries)], next_continuation_token=next_token
+    )
+
+
+def list_bucket(args, secret_key, key, bucket_name, prefix):
+    objects = listing.cached_listing(key)
+    if objects is None:
+        entries = bucket.iter_objects(
+            get_resources(args["access_key"], secret_key), bucket_name, prefix
+        )
+        objects = listing.caching(key, list_objects(entries))
+    objects = iter(objects)
+    first = next(objects, None)
+    if first is None:
+        return response(200, f"Bucket is Empty.")
+    records = itertools.chain([first], objects)
+    return records_response(200, records, args["format"])
+
+
+def list_buckets(args, secret_key, key):
+    all_bucket = listing.cached_listing(key)
+    if all_bucket is None:
+        buckets = bucket.buckets(get_resources(args["access_key"], secret_key))
+        all_bucket = []
+        for index, buck in enumerate(buckets):
+            all_bucket.append(
+                {
+                    "name": buck.name,
+                    "creation_date": f"{buck.creation_date:%Y-%m-%d %H:%M:%S}",
+                }
+            )
+        all_bucket = [*listing.caching(key, all_bucket)]
+    if not all_bucket:
+        return response(200, f"Storage is Empty.")
+    if args["format"] == "ndjson":
+        return ndjson_response(200, all_bucket)
+    return response(200, data=all_bucket)
 
 
 class list(Resource):
@@ -47,35 +106,33 @@ class list(Resource):
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("bucket_name", type=str)
+        parser.add_argument("max_keys", type=int)
+        parser.add_argument("continuation_token", type=str)
+        parser.add_argument("start_after", type=str)
+        parser.add_argument("format", type=str, default="json", choices=FORMATS)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         bucket_name = args["bucket_name"]
         if args["bucket_name"]:
             bucket_name, prefix = utils.get_bucket_key(args["bucket_name"])
+        key = listing.listing_key(args["access_key"], secret_key, bucket_name, prefix)
+        paged = any(
+            args[name] is not None
+            for name in ("max_keys", "continuation_token", "start_after")
+        )
+        max_keys = args["max_keys"]
+        if max_keys is None:
+            max_keys = MAX_KEYS
+        if not 0 < max_keys <= MAX_KEYS:
+            return response(400, f"max_keys must be between 1 and {MAX_KEYS}")
 
         try:
+            if args["bucket_name"] and paged:
+                return list_page(args, secret_key, bucket_name, prefix, max_keys)
             if args["bucket_name"]:
-                buckets = bucket.get_objects(
-                    get_resources(args["access_key"], secret_key), bucket_name, prefix
-                )
-                objects = list_objects(buckets)
-                if not objects:
-                    return response(200, f"Bucket is Empty.")
-                return response(200, data=objects)
-
-            buckets = bucket.buckets(get_resources(args["access_key"], secret_key))
-            all_bucket = []
-            for index, buck in enumerate(buckets):
-                all_bucket.append(
-                    {
-                        "name": buck.name,
-                        "creation_date": f"{buck.creation_date:%Y-%m-%d %H:%M:%S}",
-                    }
-                )
-            if not all_bucket:
-                return response(200, f"Storage is Empty.")
-            return response(200, data=all_bucket)
+                return list_bucket(args, secret_key, key, bucket_name, prefix)
+            return list_buckets(args, secret_key, key)
         except Exception as e:
             current_app.logger.error(f"{e}")
             return response(500, f"{e}")
@@ -86,6 +143,7 @@ class bucket_api(Resource):
         parser = reqparse.RequestParser()
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
+        parser.add_argument("fields", type=str, default="")
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
@@ -94,6 +152,7 @@ class bucket_api(Resource):
                 get_resources(args["access_key"], secret_key),
                 bucket_name,
                 get_plain_auth(args["access_key"], secret_key),
+                utils.split_fields(args["fields"]),
             )
             return response(200, data=bucket_info)
         except Exception as e:
@@ -128,6 +187,7 @@ class bucket_api(Resource):
             if responses.text:
                 error = xmltodict.parse(responses.text)
                 return response(400, error["Error"]["Message"])
+            listing.invalidate_buckets()
             return response(201, f"Bucket {bucket_name} created successfully.")
         except Exception as e:
             current_app.logger.error(f"{e}")
@@ -137,29 +197,57 @@ class bucket_api(Resource):
         parser = reqparse.RequestParser()
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
+        parser.add_argument("force", type=inputs.boolean, default=False)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
             result = bucket.remove_bucket(
-                get_resources(args["access_key"], secret_key), bucket_name
+                get_resources(args["access_key"], secret_key),
+                bucket_name,
+                force=args["force"],
             )
+            listing.invalidate(bucket_name)
+            listing.invalidate_buckets()
             return response(200, f"Bucket {bucket_name} deleted successfully.", result)
         except Exception as e:
             current_app.logger.error(f"{e}")
             return response(500, f"{e}")
 
 
+def objects_info(infos):
+    for info in infos:
+        if "LastModified" in info:
+            info["LastModified"] = f'{info["LastModified"]:%Y-%m-%d %H:%M:%S}'
+        yield info
+
+
 class object_api(Resource):
     def get(self, bucket_name):
         parser = reqparse.RequestParser()
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("object_name", type=str, required=True)
+        parser.add_argument("recursive", type=inputs.boolean, default=False)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
+            if args["recursive"]:
+                resources = get_resources(args["access_key"], secret_key)
+                objects = objects_info(
+                    bucket.objects_info(
+                        resources,
+                        bucket_name,
+                        args["object_name"],
+                        utils.DEFAULT_WORKERS,
+                    )
+                )
+                # list the first page here, so listing errors return 500
+                first = next(objects, None)
+                records = [] if first is None else itertools.chain([first], objects)
+                return ndjson_response(200, records)
+
             object_info = bucket.object_info(
                 get_resources(args["access_key"], secret_key),
                 bucket_name,
@@ -177,15 +265,29 @@ class object_api(Resource):
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("object_name", type=str, required=True)
+        parser.add_argument("recursive", type=inputs.boolean, default=False)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
+            if args["recursive"]:
+                removed, errors = bucket.remove_prefix(
+                    get_resources(args["access_key"], secret_key),
+                    bucket_name,
+                    args["object_name"],
+                )
+                listing.invalidate(bucket_name, args["object_name"])
+                message = f"{removed} objects under {args['object_name']} deleted."
+                if errors:
+                    message = f"{message} {len(errors)} objects failed to be deleted."
+                return response(200, message, errors)
+
             result = bucket.remove_object(
                 get_resources(args["access_key"], secret_key),
                 bucket_name,
                 args["object_name"],
             )
+            listing.invalidate(bucket_name, args["object_name"])
             return response(
                 200, f"Object {args['object_name']} deleted successfully.", result
             )
@@ -194,6 +296,28 @@ class object_api(Resource):
             return response(500, f"{e}")
 
 
+def copy_prefix(resource, bucket_name, args, dest_bucket, move=False):
+    stats = bucket.copy_prefix(
+        resource,
+        bucket_name,
+        args["object_name"],
+        dest_bucket,
+        args["dest_prefix"],
+        move=move,
+    )
+    dest_prefix = args["dest_prefix"]
+    if dest_prefix is None:
+        dest_prefix = args["object_name"]
+    listing.invalidate(dest_bucket, dest_prefix)
+    if move:
+        listing.invalidate(bucket_name, args["object_name"])
+    action = "moved" if move else "copied"
+    message = f"{stats['transferred']} objects under {args['object_name']} {action}."
+    if stats["errors"]:
+        message = f"{message} {len(stats['errors'])} objects failed."
+    return response(201, message, stats["errors"])
+
+
 class move_object(Resource):
     def post(self, bucket_name):
         parser = reqparse.RequestParser()
@@ -201,17 +325,23 @@ class move_object(Resource):
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("object_name", type=str, required=True)
         parser.add_argument("move_to", type=str, required=True)
+        parser.add_argument("recursive", type=inputs.boolean, default=False)
+        parser.add_argument("dest_prefix", type=str)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
+            resource = get_resources(args["access_key"], secret_key)
+            if args["recursive"]:
+                return copy_prefix(
+                    resource, bucket_name, args, args["move_to"], move=True
+                )
+
             bucket.move_object(
-                get_resources(args["access_key"], secret_key),
-                bucket_name,
-                args["object_name"],
-                args["move_to"],
-                None,
+                resource, bucket_name, args["object_name"], args["move_to"], None
             )
+            listing.invalidate(bucket_name, args["object_name"])
+            listing.invalidate(args["move_to"], args["object_name"])
             return response(201, f"Object {args['object_name']} moved successfully.")
         except Exception as e:
             current_app.logger.error(f"{e}")
@@ -225,41 +355,38 @@ class copy_object(Resource):
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("object_name", type=str, required=True)
         parser.add_argument("copy_to", type=str, required=True)
+        parser.add_argument("recursive", type=inputs.boolean, default=False)
+        parser.add_argument("dest_prefix", type=str)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
+            resource = get_resources(args["access_key"], secret_key)
+            if args["recursive"]:
+                return copy_prefix(resource, bucket_name, args, args["copy_to"])
+
             bucket.copy_object(
-                get_resources(args["access_key"], secret_key),
-                bucket_name,
-                args["object_name"],
-                args["copy_to"],
-                None,
+                resource, bucket_name, args["object_name"], args["copy_to"], None
             )
+            listing.invalidate(args["copy_to"], args["object_name"])
             return response(201, f"Object {args['object_name']} copied successfully.")
         except Exception as e:
             current_app.logger.error(f"{e}")
             return response(500, f"{e}")
 
 
-def file_download(resources, bucket_name, prefix):
-    status = bucket.get_objects(resources, bucket_name, prefix)
-    status = list_objects(status)
-    for obj in status:
-        if "Key" in obj and obj["Key"][-1] != "/":
-            bucket.download_object(resources, bucket_name, obj["Key"])
-        if "directory" in obj:
-            file_download(resources, bucket_name, obj["directory"])
-
+def attachment(filename):
+    """Return Content-Disposition header with an ASCII fallback filename.
 
-def archive(dir_name):
-    with zipfile.ZipFile(f"{dir_name[:-1]}.zip", "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for root, dirs, files in os.walk("."):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if "zip" not in file:
-                    zip_file.write(file_path, file_path.replace(dir_name, ""))
-    return f"{dir_name[:-1]}.zip"
+    Non-ASCII filenames are sent as RFC 5987 `filename*` too.
+    """
+    ascii_name = unicodedata.normalize("NFKD", filename)
+    ascii_name = ascii_name.encode("ascii", "ignore").decode("ascii")
+    quoted_name = quote_header_value(ascii_name, allow_token=False)
+    disposition = f"attachment; filename={quoted_name}"
+    if ascii_name != filename:
+        disposition += f"; filename*=UTF-8''{url_quote(filename, safe='')}"
+    return {"Content-Disposition": disposition}
 
 
 class download_object(Resource):
@@ -270,64 +397,224 @@ class download_object(Resource):
         parser.add_argument("object_name", type=str, default="")
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
+        object_name = args["object_name"]
 
-        with tempfile.TemporaryDirectory() as tempdir:
-            try:
-                os.chdir(tempdir)
+        try:
+            resources = get_resources(args["access_key"], secret_key)
+            if object_name and not object_name.endswith("/"):
+                chunks = archive.object_chunks(resources, bucket_name, object_name)
+                # fetch the object before responding, a missing one fails here
+                first = next(chunks, b"")
+                return Response(
+                    stream_with_context(itertools.chain([first], chunks)),
+                    mimetype="application/octet-stream",
+                    headers=attachment(os.path.basename(object_name)),
+                )
 
-                resources = get_resources(args["access_key"], secret_key)
-                file_download(resources, bucket_name, args["object_name"])
+            entries = archive.prefix_entries(resources, bucket_name, object_name)
+            first = next(entries, None)
+            if first is None:
+                return response(404, f"Object not exists: {object_name}")
 
-                if args["object_name"] == "":
-                    name = archive(bucket_name + "/")
-                elif args["object_name"][-1] == "/":
-                    name = archive(args["object_name"])
-                else:
-                    name = args["object_name"]
-                file = send_from_directory(tempdir, name, as_attachment=True)
-                return file
-            except Exception as e:
-                current_app.logger.error(f"{e}", exc_info=1)
-                return response(500, f"{e}")
+            name = os.path.basename(object_name.rstrip("/")) or bucket_name
+            content = archive.iter_zip(
+                resources, bucket_name, itertools.chain([first], entries)
+            )
+            return Response(
+                stream_with_context(content),
+                mimetype="application/zip",
+                headers=attachment(f"{name}.zip"),
+            )
+        except Exception as e:
+            current_app.logger.error(f"{e}", exc_info=1)
+            return response(500, f"{e}")
 
 
-class upload_object(Resource):
-    def post(self, bucket_name):
-        parser = reqparse.RequestParser()
-        parser.add_argument("access_key", type=str, required=True)
-        parser.add_argument("secret_key", type=str, required=True)
-        parser.add_argument("object_name", type=str)
-        parser.add_argument("acl", type=str)
-        args = parser.parse_args()
-        secret_key = args["secret_key"].replace(" ", "+")
+class UploadStream:
+    """Werkzeug file container writing into a multipart upload."""
+
+    def __init__(self, upload):
+        self.upload = upload
+        self.write = upload.write
+
+    def seek(self, offset):
+        # werkzeug rewinds the container once the file part ends
+        pass
+
+
+def form_boundary():
+    """Return boundary of a multipart form request, None for other bodies."""
+    _, options = parse_options_header(request.content_type)
+    return options.get("boundary")
+
+
+def iter_form_parts(stream_factory, boundary):
+    """Yield `("form" | "file", (name, value))` parts while the body is read.
+
+    Unlike `request.form` and `request.files`, file content goes into
+    containers made by `stream_factory` as it arrives, and form fields
+    are yielded as soon as they end.
+    """
+    parser = MultiPartParser(stream_factory)
+    return parser.parse_parts(request.stream, boundary.encode(), request.content_length)
+
+
+def object_key(name):
+    regex = r"[\"\{}^%`\]\[~<>|#]|[^\x00-\x7F]"
+    return re.sub(regex, "", name)
+
+
+def upload_name(fields, filename):
+    return object_key(fields.get("object_name") or secure_filename(filename))
+
+
+def upload_stream_factory(bucket_name, fields, uploads):
+    """Return werkzeug stream factory piping file parts into multipart uploads.
+
+    Files are spooled instead when credentials are not known yet.
+    """
+
+    def stream_factory(total_content_length, filename, content_type, **kwargs):
+        if not (fields.get("access_key") and fields.get("secret_key")):
+            return tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+        secret_key = fields["secret_key"].replace(" ", "+")
+        resources = get_resources(fields["access_key"], secret_key)
+        extra_args = {"ContentType": content_type} if content_type else {}
+        upload = transfer.MultipartUpload(
+            resources.meta.client,
+            bucket_name,
+            upload_name(fields, filename),
+            size=total_content_length,
+            **extra_args,
+        )
+        uploads.append(upload)
+        return UploadStream(upload)
+
+    return stream_factory
+
+
+def read_upload_form(stream_factory, boundary, fields):
+    """Read form fields into `fields` and return the `files` field or None."""
+    file = None
+    for kind, (name, value) in iter_form_parts(stream_factory, boundary):
+        if kind == "form":
+            fields.setdefault(name, value)
+        elif name == "files":
+            file = value
+    return file
 
-        file = request.files["files"]
-        filename = secure_filename(file.filename)
-        object_name = args["object_name"] if args["object_name"] else filename
 
+def missing_upload_field(fields, file):
+    for field in ("access_key", "secret_key"):
+        if not fields.get(field):
+            return field
+    if file is None:
+        return "files"
+    return None
+
+
+def complete_streamed(fields, file, uploads):
+    """Complete the upload a file was streamed into.
+
+    :return: Object name and upload result, or None if `object_name` came after `files`
+    """
+    upload = file.stream.upload
+    if upload_name(fields, file.filename) != upload.object_name:
+        return None
+    result = upload.complete()
+    uploads.remove(upload)
+    return upload.object_name, result
+
+
+def upload_spooled(resources, bucket_name, fields, file):
+    """Upload a file received as a whole.
+
+    :return: Object name and upload result
+    """
+    object_name = upload_name(fields, file.filename)
+    result = bucket.upload_bin_object(
+        resource=resources,
+        bucket_name=bucket_name,
+        fileobj=file,
+        object_name=object_name,
+        content_type=file.content_type,
+    )
+    return object_name, result
+
+
+def abort_uploads(uploads):
+    """Abort uploads of extra file fields or interrupted ones."""
+    for upload in uploads:
         try:
-            regex = r"[\"\{}^%`\]\[~<>|#]|[^\x00-\x7F]"
-            object_name = re.sub(regex, "", object_name)
+            upload.abort()
+        except Exception as e:
+            current_app.logger.error(f"{e}")
 
-            result = bucket.upload_bin_object(
-                resource=get_resources(args["access_key"], secret_key),
-                bucket_name=bucket_name,
-                fileobj=file,
-                object_name=object_name,
-                content_type=file.content_type,
-            )
-            if args["acl"]:
+
+class upload_object(Resource):
+    def post(self, bucket_name):
+        """Upload the `files` field of a multipart form.
+
+        When credentials are in the query string or in fields sent before
+        `files`, the file is piped into an upload as it arrives. Its name
+        must be known by then too, an `object_name` field sent after
+        `files` is rejected. Otherwise it is spooled and uploaded once the
+        form is read.
+        """
+        boundary = form_boundary()
+        if not boundary:
+            return response(400, "Request body must be multipart/form-data")
+
+        fields = request.args.to_dict()
+        uploads = []
+        stream_factory = upload_stream_factory(bucket_name, fields, uploads)
+        try:
+            file = read_upload_form(stream_factory, boundary, fields)
+            missing = missing_upload_field(fields, file)
+            if missing:
+                return response(400, f"Missing required parameter: {missing}")
+
+            secret_key = fields["secret_key"].replace(" ", "+")
+            resources = get_resources(fields["access_key"], secret_key)
+            if isinstance(file.stream, UploadStream):
+                uploaded = complete_streamed(fields, file, uploads)
+                if uploaded is None:
+                    return response(400, "object_name must be sent before files")
+            else:
+                uploaded = upload_spooled(resources, bucket_name, fields, file)
+            object_name, result = uploaded
+            listing.invalidate(bucket_name, object_name)
+
+            if fields.get("acl"):
                 bucket.set_acl(
-                    resource=get_resources(args["access_key"], secret_key),
+                    resource=resources,
                     bucket_name=bucket_name,
                     object_name=object_name,
                     acl_type="object",
-                    acl=args["acl"],
+                    acl=fields["acl"],
                 )
             return response(201, f"Object {object_name} uploaded successfully.", result)
         except Exception as e:
+            # client disconnected or a part failed
             current_app.logger.error(f"{e}", exc_info=1)
             return response(500, f"{e}")
+        finally:
+            abort_uploads(uploads)
+
+
+def usage_records(usages):
+    """Yield a record per scanned bucket, then the total usage."""
+    total_usage = 0
+    for bucket_name, usage, error in usages:
+        if error:
+            current_app.logger.error(f"{bucket_name}: {error}")
+            yield {"name": bucket_name, "message": f"{error}"}
+            continue
+        total_size, total_objects = usage
+        total_usage += total_size
+        yield {"name": bucket_name, "size": total_size, "objects": total_objects}
+    yield {"total_usage": f"{total_usage}"}
 
 
 class usage(Resource):
@@ -336,24 +623,50 @@ class usage(Resource):
         parser.add_argument("access_key", type=str, required=True)
         parser.add_argument("secret_key", type=str, required=True)
         parser.add_argument("bucket_name", type=str)
+        parser.add_argument("prefix", type=str, default="")
+        parser.add_argument("depth", type=int)
+        parser.add_argument("format", type=str, default="json", choices=FORMATS)
         args = parser.parse_args()
         secret_key = args["secret_key"].replace(" ", "+")
 
         try:
             if args["bucket_name"]:
-                total_size, total_objects = bucket.bucket_usage(
-                    get_resources(args["access_key"], secret_key), args["bucket_name"]
+                total_size, total_objects, subtotals = bucket.scan_usage(
+                    get_resources(args["access_key"], secret_key),
+                    args["bucket_name"],
+                    args["prefix"],
+                    depth=args["depth"],
+                    workers=utils.DEFAULT_WORKERS,
                 )
                 bucket_usage = {
                     "name": args["bucket_name"],
                     "size": total_size,
                     "objects": total_objects,
                 }
+                if args["depth"]:
+                    bucket_usage["prefixes"] = [
+                        {"prefix": dir_, "size": size, "objects": objects}
+                        for dir_, (size, objects) in sorted(subtotals.items())
+                    ]
+                if args["format"] == "ndjson":
+                    return ndjson_response(200, [bucket_usage])
                 return response(200, data=bucket_usage)
 
+            if args["format"] == "ndjson":
+                usages = bucket.iter_disk_usage(
+                    get_resources(args["access_key"], secret_key)
+                )
+                return ndjson_response(200, usage_records(usages))
+
             disk_usage = {"bucket": [], "total_usage": 0}
+            errors = []
+
+            def on_error(bucket_name, exc):
+                current_app.logger.error(f"{bucket_name}: {exc}")
+                errors.append({"name": bucket_name, "message": f"{exc}"})
+
             disk_usages = bucket.disk_usage(
-                get_resources(args["access_key"], secret_key)
+                get_resources(args["access_key"], secret_key), on_error=on_error
             )
             for usage in disk_usages:
                 bucket_name = usage[0]
@@ -363,6 +676,8 @@ class usage(Resource):
                     {"name": bucket_name, "size": total_size, "objects": total_objects}
                 )
             disk_usage["total_usage"] = f"{disk_usage['total_usage']}"
+            if errors:
+                disk_usage["errors"] = errors
             return response(200, data=disk_usage)
         except Exception as e:
             current_app.logger.error(f"{e}")
@@ -414,6 +729,7 @@ class presign(Resource):
                 bucket_name,
                 object_name,
                 args["expire"],
+                credential=auth.credential_id(args["access_key"], secret_key),
             )
             return response(200, data=url)
         except Exception as e:
@@ -421,6 +737,35 @@ class presign(Resource):
             return response(500, f"{e}")
 
 
+class presign_batch(Resource):
+    def post(self, bucket_name):
+        parser = reqparse.RequestParser()
+        parser.add_argument("expire", type=int)
+        parser.add_argument("access_key", type=str, required=True)
+        parser.add_argument("secret_key", type=str, required=True)
+        parser.add_argument(
+            "object_names", type=str, action="append", location="json", required=True
+        )
+        args = parser.parse_args()
+        secret_key = args["secret_key"].replace(" ", "+")
+
+        if len(args["object_names"]) > BATCH_LIMIT:
+            return response(400, f"At most {BATCH_LIMIT} objects are allowed.")
+
+        try:
+            urls = bucket.generate_urls(
+                get_resources(args["access_key"], secret_key),
+                bucket_name,
+                args["object_names"],
+                args["expire"],
+                credential=auth.credential_id(args["access_key"], secret_key),
+            )
+            return response(200, data=urls)
+        except Exception as e:
+            current_app.logger.error(f"{e}")
+            return response(500, f"{e}")
+
+
 class mkdir(Resource):
     def post(self, bucket_name):
         parser = reqparse.RequestParser()
@@ -436,6 +781,7 @@ class mkdir(Resource):
                 bucket_name,
                 args["directory"],
             )
+            listing.invalidate(bucket_name, args["directory"])
             return response(
                 201, f"Directory {args['directory']} added successfully.", result
             )
@@ -444,6 +790,48 @@ class mkdir(Resource):
             return response(500, f"{e}")
 
 
+def invalidate_operation(operation):
+    """Drop cached listings a batch operation may have changed."""
+    if not isinstance(operation, dict) or not operation.get("bucket_name"):
+        return
+    name = operation.get("object_name") or operation.get("directory") or ""
+    if operation.get("op") in ("delete", "move", "mkdir"):
+        listing.invalidate(operation["bucket_name"], name)
+    dest_bucket = operation.get("copy_to") or operation.get("move_to")
+    if operation.get("op") in ("copy", "move") and dest_bucket:
+        listing.invalidate(dest_bucket, name)
+
+
+class batch(Resource):
+    def post(self):
+        parser = reqparse.RequestParser()
+        parser.add_argument("access_key", type=str, required=True)
+        parser.add_argument("secret_key", type=str, required=True)
+        parser.add_argument(
+            "operations", type=dict, action="append", location="json", required=True
+        )
+        args = parser.parse_args()
+        secret_key = args["secret_key"].replace(" ", "+")
+
+        operations = args["operations"]
+        if len(operations) > BATCH_LIMIT:
+            return response(400, f"At most {BATCH_LIMIT} operations are allowed.")
+
+        try:
+            results = batch_lib.run_batch(
+                get_resources(args["access_key"], secret_key), operations
+            )
+            for item in results:
+                invalidate_operation(item["operation"])
+            succeeded = len([item for item in results if item["status"] == "success"])
+            return response(
+                200, f"{succeeded} of {len(results)} operations succeeded.", results
+            )
+        except Exception as e:
+            current_app.logger.error(f"{e}")
+            return response(500, f"{e}")
+
+
 class gmt_policy(Resource):
     def get(self):
         try:
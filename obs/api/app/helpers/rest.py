@@ -1,8 +1,34 @@
-from flask import Response
+from flask import Response, current_app, stream_with_context
 import json
 
+success_status = {
+    200: "Operation succeeded",
+    201: "Created",
+    202: "Accepted",
+    204: "Reply does not contain additional content",
+    304: "Not modified",
+}
 
-def response(status_code, message=None, data=None):
+failure_status = {
+    400: "Internal error occurred - unexpected error caused by request data",
+    401: "Unauthorized operation",
+    403: "Forbidden operation",
+    404: "Specified object not found",
+    405: "Method Not Allowed, for example, resource doesn't support DELETE method",
+    406: "Method Not Acceptable",
+    409: "Conflict",
+    423: "Locked",
+    426: "Upgrade Required",
+    500: "Internal Server Error - unexpected server-side error",
+    501: "Not Implemented - functionality is not implemented on the server side",
+    503: "Service is unavailable",
+}
+
+# flush streamed output once this many bytes are buffered
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def response(status_code, message=None, data=None, **extra):
     """Response data helper
 
     Arguments:
@@ -11,39 +37,18 @@ def response(status_code, message=None, data=None):
     Keyword Arguments:
         message {string} -- response message (default: {None})
         data {dict} -- data to be appended to response (default: {None})
+        extra {dict} -- fields added next to data on success, e.g. a cursor
 
     Returns:
         dict -- response data
     """
-    success_status = {
-        200: "Operation succeeded",
-        201: "Created",
-        202: "Accepted",
-        204: "Reply does not contain additional content",
-        304: "Not modified",
-    }
-
-    failure_status = {
-        400: "Internal error occurred - unexpected error caused by request data",
-        401: "Unauthorized operation",
-        403: "Forbidden operation",
-        404: "Specified object not found",
-        405: "Method Not Allowed, for example, resource doesn't support DELETE method",
-        406: "Method Not Acceptable",
-        409: "Conflict",
-        423: "Locked",
-        426: "Upgrade Required",
-        500: "Internal Server Error - unexpected server-side error",
-        501: "Not Implemented - functionality is not implemented on the server side",
-        503: "Service is unavailable",
-    }
-
     status = {}
     status["code"] = status_code
 
     if status_code in success_status:
         status["count"] = len(data) if data else 0
         status["data"] = data if data else None
+        status.update(extra)
         status["status"] = "success"
         status["message"] = message if message else success_status[status_code]
     elif status_code in failure_status:
@@ -58,3 +63,117 @@ def response(status_code, message=None, data=None):
     )
 
     return response
+
+
+def stream_response(status_code, records, message=None):
+    """Streaming response data helper
+
+    Records are encoded and sent while `records` is consumed, so the
+    payload is never held in memory as a whole. Status and count are
+    written after the data, an error raised while iterating is reported
+    there as well.
+
+    Arguments:
+        status_code {int} -- http status code
+        records {iterable} -- records to be sent as response data
+
+    Keyword Arguments:
+        message {string} -- response message (default: {None})
+
+    Returns:
+        Response -- chunked response
+    """
+
+    def generate():
+        count = 0
+        status = "success"
+        msg = message if message else success_status[status_code]
+        buffer = [f'{{"code": {status_code}, "data": [']
+        size = 0
+        try:
+            for record in records:
+                chunk = json.dumps(record)
+                buffer.append(f", {chunk}" if count else chunk)
+                count += 1
+                size += len(chunk)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+        except Exception as e:
+            current_app.logger.error(f"{e}")
+            status = "error"
+            msg = f"{e}"
+
+        buffer.append(
+            f'], "count": {count}, "status": {json.dumps(status)}, '
+            f'"message": {json.dumps(msg)}}}'
+        )
+        yield "".join(buffer)
+
+    response = Response(
+        stream_with_context(generate()), status=status_code, mimetype="application/json"
+    )
+
+    return response
+
+
+def ndjson_response(status_code, records):
+    """Newline delimited JSON response helper
+
+    Every record is sent as one JSON line while `records` is consumed.
+    An error raised while iterating is logged and sent as a last line
+    with an `error` key.
+
+    Arguments:
+        status_code {int} -- http status code
+        records {iterable} -- records to be sent
+
+    Returns:
+        Response -- chunked response
+    """
+
+    def generate():
+        buffer = []
+        size = 0
+        try:
+            for record in records:
+                line = f"{json.dumps(record)}\n"
+                buffer.append(line)
+                size += len(line)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+        except Exception as e:
+            current_app.logger.error(f"{e}")
+            buffer.append(f"{json.dumps({'error': f'{e}'})}\n")
+        if buffer:
+            yield "".join(buffer)
+
+    response = Response(
+        stream_with_context(generate()),
+        status=status_code,
+        mimetype="application/x-ndjson",
+    )
+
+    return response
+
+
+def records_response(status_code, records, format="json", message=None):
+    """Streaming response of `records` in the requested format
+
+    Arguments:
+        status_code {int} -- http status code
+        records {iterable} -- records to be sent
+
+    Keyword Arguments:
+        format {string} -- "json" for a chunked JSON document or "ndjson" (default: {"json"})
+        message {string} -- response message of JSON document (default: {None})
+
+    Returns:
+        Response -- chunked response
+    """
+    if format == "ndjson":
+        return ndjson_response(status_code, records)
+    return stream_response(status_code, records, message)
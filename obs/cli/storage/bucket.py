@@ -1,7 +1,10 @@
+import json
+import time
 import click
 import bitmath
 
 from obs.libs import bucket as bucket_lib
+from obs.libs import sync as sync_lib
 from obs.libs import utils
 
 
@@ -28,9 +31,9 @@ def create_bucket(**kwargs):
         )
 
 
-def remove_bucket(resource, bucket_name):
+def remove_bucket(resource, bucket_name, force=False):
     try:
-        bucket_lib.remove_bucket(resource, bucket_name)
+        bucket_lib.remove_bucket(resource, bucket_name, force=force)
         click.secho(f'Bucket "{bucket_name}" deleted successfully.', fg="green")
     except Exception as exc:
         click.secho(f"{exc}", fg="yellow", bold=True, err=True)
@@ -39,23 +42,23 @@ def remove_bucket(resource, bucket_name):
 def get_objects(resource, uri):
     try:
         bucket_name, prefix = utils.get_bucket_key(uri)
-        response = bucket_lib.get_objects(resource, bucket_name, prefix)
-        if not response:
-            click.secho(f'Bucket "{bucket_name}" is empty', fg="green")
-
-        if response["CommonPrefixes"]:
-            for prefix in response["CommonPrefixes"]:
+        is_empty = True
+        for entry in bucket_lib.iter_objects(resource, bucket_name, prefix):
+            is_empty = False
+            if "Prefix" in entry:
                 dir_ = "DIR".rjust(12)
-                click.secho(f"{dir_} {bucket_name}/{prefix['Prefix']}")
+                click.secho(f"{dir_} {bucket_name}/{entry['Prefix']}")
+                continue
 
-        if response["Contents"]:
-            for content in response["Contents"]:
-                key = content["Key"]
-                size = utils.sizeof_fmt(content["Size"])
-                last_modified = content["LastModified"]
-                click.secho(
-                    f"{last_modified:%Y-%m-%d %H:%M:%S}, {size}, {bucket_name}/{key}"
-                )
+            key = entry["Key"]
+            size = utils.sizeof_fmt(entry["Size"])
+            last_modified = entry["LastModified"]
+            click.secho(
+                f"{last_modified:%Y-%m-%d %H:%M:%S}, {size}, {bucket_name}/{key}"
+            )
+
+        if is_empty:
+            click.secho(f'Bucket "{bucket_name}" is empty', fg="green")
 
     except Exception as exc:
         click.secho(f"{exc}", fg="yellow", bold=True, err=True)
@@ -69,7 +72,29 @@ def remove_object(resource, bucket_name, object_name):
         click.secho(f"Object removal failed. \n{exc}", fg="yellow", bold=True, err=True)
 
 
-def download_object(resource, bucket_name, object_name):
+def remove_prefix(resource, bucket_name, prefix, workers):
+    try:
+        removed, errors = bucket_lib.remove_prefix(
+            resource, bucket_name, prefix, workers=workers
+        )
+        for error in errors:
+            click.secho(
+                f'Object "{error["Key"]}" removal failed. {error.get("Code")}: {error.get("Message")}',
+                fg="yellow",
+                err=True,
+            )
+        click.secho(
+            f'{removed} objects removed from "{bucket_name}/{prefix}"', fg="green"
+        )
+    except Exception as exc:
+        click.secho(
+            f"Objects removal failed. \n{exc}", fg="yellow", bold=True, err=True
+        )
+
+
+def download_object(
+    resource, bucket_name, object_name, local_dir="", options=None, ranged=False
+):
     if object_name.endswith("/"):
         click.secho(
             f"Object download failed. \nExpecting filename", fg="yellow", bold=True
@@ -77,7 +102,9 @@ def download_object(resource, bucket_name, object_name):
         return
 
     try:
-        bucket_lib.download_object(resource, bucket_name, object_name)
+        bucket_lib.download_object(
+            resource, bucket_name, object_name, local_dir, options, ranged
+        )
         click.secho(f'Object "{object_name}" downloaded successfully', fg="green")
     except Exception as exc:
         click.secho(
@@ -85,6 +112,43 @@ def download_object(resource, bucket_name, object_name):
         )
 
 
+def transfer_summary(action, stats, elapsed):
+    human_bytes = bitmath.Byte(stats["bytes"]).best_prefix()
+    human_rate = bitmath.Byte(stats["bytes"] / max(elapsed, 0.001)).best_prefix()
+    return (
+        f'{action} {stats["transferred"]} objects, '
+        f'{human_bytes.format("{value:.2f} {unit}")} in {elapsed:.1f}s '
+        f'({human_rate.format("{value:.2f} {unit}")}/s), '
+        f'{stats["skipped"]} skipped, {stats["failed"]} failed'
+    )
+
+
+def download_prefix(resource, bucket_name, prefix, local_dir, workers, options=None):
+    try:
+        start = time.monotonic()
+        stats = bucket_lib.download_prefix(
+            resource,
+            bucket_name,
+            prefix,
+            local_dir or ".",
+            workers=workers,
+            options=options,
+        )
+        elapsed = time.monotonic() - start
+
+        for error in stats["errors"]:
+            click.secho(
+                f'Object "{error["Key"]}" download failed. {error["Message"]}',
+                fg="yellow",
+                err=True,
+            )
+        click.secho(transfer_summary("Downloaded", stats, elapsed), fg="green")
+    except Exception as exc:
+        click.secho(
+            f"Objects download failed. \n{exc}", fg="yellow", bold=True, err=True
+        )
+
+
 def upload_object(**kwargs):
     filename = kwargs.get("local_path")
     try:
@@ -99,6 +163,72 @@ def upload_object(**kwargs):
         )
 
 
+def upload_prefix(resource, bucket_name, local_dir, prefix, workers, options=None):
+    try:
+        start = time.monotonic()
+        stats = bucket_lib.upload_prefix(
+            resource, bucket_name, local_dir, prefix, workers=workers, options=options
+        )
+        elapsed = time.monotonic() - start
+
+        for error in stats["errors"]:
+            click.secho(
+                f'File "{error["Key"]}" upload failed. {error["Message"]}',
+                fg="yellow",
+                err=True,
+            )
+        click.secho(transfer_summary("Uploaded", stats, elapsed), fg="green")
+    except Exception as exc:
+        click.secho(
+            f'Directory "{local_dir}" upload failed. \n{exc}',
+            fg="yellow",
+            bold=True,
+            err=True,
+        )
+
+
+def sync(resource, src, dest, delete, full, workers, options=None):
+    try:
+        start = time.monotonic()
+        if src.startswith("s3://"):
+            bucket_name, prefix = utils.get_bucket_key(src)
+            stats = sync_lib.pull(
+                resource,
+                bucket_name,
+                dest,
+                prefix,
+                delete=delete,
+                workers=workers,
+                options=options,
+            )
+            action = "Downloaded"
+        else:
+            bucket_name, prefix = utils.get_bucket_key(dest)
+            stats = sync_lib.push(
+                resource,
+                src,
+                bucket_name,
+                prefix,
+                delete=delete,
+                full=full,
+                workers=workers,
+                options=options,
+            )
+            action = "Uploaded"
+        elapsed = time.monotonic() - start
+
+        for error in stats["errors"]:
+            click.secho(
+                f'"{error["Key"]}" sync failed. {error["Message"]}',
+                fg="yellow",
+                err=True,
+            )
+        summary = transfer_summary(action, stats, elapsed)
+        click.secho(f'{summary}, {stats["deleted"]} deleted', fg="green")
+    except Exception as exc:
+        click.secho(f"Sync failed. \n{exc}", fg="yellow", bold=True, err=True)
+
+
 def copy_object(resource, src_bucket, src_object_name, dest_bucket, dest_object_name):
     if src_object_name.endswith("/") or not src_object_name:
         click.secho(f"Object copy failed. \nExpecting filename", fg="yellow", bold=True)
@@ -113,12 +243,73 @@ def copy_object(resource, src_bucket, src_object_name, dest_bucket, dest_object_
         click.secho(f"Object copy failed. \n{exc}", fg="yellow", bold=True, err=True)
 
 
-def bucket_usage(resource, bucket_name):
+def copy_prefix(
+    resource, src_bucket, prefix, dest_bucket, dest_prefix, workers, move=False
+):
+    action = "move" if move else "copy"
     try:
-        total_size, total_objects = bucket_lib.bucket_usage(resource, bucket_name)
+        start = time.monotonic()
+        stats = bucket_lib.copy_prefix(
+            resource,
+            src_bucket,
+            prefix,
+            dest_bucket,
+            dest_prefix,
+            move=move,
+            workers=workers,
+        )
+        elapsed = time.monotonic() - start
+
+        for error in stats["errors"]:
+            click.secho(
+                f'Object "{error["Key"]}" {action} failed. {error["Message"]}',
+                fg="yellow",
+                err=True,
+            )
+        summary = transfer_summary("Moved" if move else "Copied", stats, elapsed)
+        click.secho(summary, fg="green")
+    except Exception as exc:
+        click.secho(
+            f"Objects {action} failed. \n{exc}", fg="yellow", bold=True, err=True
+        )
+
+
+def show_progress(pages, total_size, total_objects):
+    human_total_size = bitmath.Byte(total_size).best_prefix()
+    click.secho(
+        f'\rScanned {pages} pages, {total_objects} objects, {human_total_size.format("{value:.2f} {unit}")}',
+        nl=False,
+        err=True,
+    )
+
+
+def bucket_usage(
+    resource, bucket_name, prefix="", depth=None, progress=False, workers=1
+):
+    try:
+        total_size, total_objects, subtotals = bucket_lib.scan_usage(
+            resource,
+            bucket_name,
+            prefix,
+            depth=depth,
+            progress=show_progress if progress else None,
+            workers=workers,
+        )
+        if progress:
+            click.secho(err=True)
+
+        for dir_, (size, objects) in sorted(subtotals.items()):
+            human_size = bitmath.Byte(size).best_prefix()
+            click.secho(
+                f'{human_size.format("{value:.2f} {unit}")}, {objects} objects in "{bucket_name}/{dir_}"'
+            )
+        if subtotals:
+            click.secho("---")
+
         human_total_size = bitmath.Byte(total_size).best_prefix()
+        name = f"{bucket_name}/{prefix}" if prefix else bucket_name
         click.secho(
-            f'{human_total_size.format("{value:.2f} {unit}")}, {total_objects} objects in "{bucket_name}" bucket'
+            f'{human_total_size.format("{value:.2f} {unit}")}, {total_objects} objects in "{name}" bucket'
         )
     except Exception as exc:
         click.secho(
@@ -126,9 +317,20 @@ def bucket_usage(resource, bucket_name):
         )
 
 
-def disk_usage(resource):
+def warn_bucket_usage(bucket_name, exc):
+    click.secho(
+        f'Bucket "{bucket_name}" usage fetching failed. \n{exc}',
+        fg="yellow",
+        bold=True,
+        err=True,
+    )
+
+
+def disk_usage(resource, workers):
     try:
-        disk_usages = bucket_lib.disk_usage(resource)
+        disk_usages = bucket_lib.disk_usage(
+            resource, workers=workers, on_error=warn_bucket_usage
+        )
         total_usage = 0
         for usage in disk_usages:
             bucket_name = usage[0]
@@ -166,18 +368,20 @@ def move_object(resource, src_bucket, src_object_name, dest_bucket, dest_object_
         click.secho(f"Object move failed. \n{exc}", fg="yellow", bold=True, err=True)
 
 
-def bucket_info(resource, bucket_name, auth):
+def bucket_info(resource, bucket_name, auth, fields=None):
+    labels = {
+        "Location": "Location",
+        "Expiration": "Expiration Rule",
+        "Policy": "Policy",
+        "CORS": "CORS",
+    }
     try:
-        info = bucket_lib.bucket_info(resource, bucket_name, auth)
-        msg = (
-            f"Location: {info['Location']}\n"
-            f"Expiration Rule: {info['Expiration']}\n"
-            f"Policy: {info['Policy']}\n"
-            f"CORS: {info['CORS']}"
-        )
-        click.secho(msg)
+        info = bucket_lib.bucket_info(resource, bucket_name, auth, fields)
+        for field, label in labels.items():
+            if field in info:
+                click.secho(f"{label}: {info[field]}")
 
-        for grant in info["ACL"]:
+        for grant in info.get("ACL", []):
             click.secho(f"ACL: {grant[0]} : {grant[1]}")
 
         if "GmtPolicy" in info:
@@ -207,6 +411,22 @@ def object_info(resource, bucket_name, object_name):
         click.secho(f"Info fetching failed. \n{exc}", fg="yellow", bold=True, err=True)
 
 
+def objects_info(resource, bucket_name, prefix, workers):
+    try:
+        for info in bucket_lib.objects_info(resource, bucket_name, prefix, workers):
+            if "Error" in info:
+                click.secho(
+                    f'Object "{info["Key"]}" info fetching failed. {info["Error"]}',
+                    fg="yellow",
+                    err=True,
+                )
+                continue
+            info["LastModified"] = f"{info['LastModified']:%Y-%m-%d %H:%M:%S}"
+            click.secho(json.dumps(info))
+    except Exception as exc:
+        click.secho(f"Info fetching failed. \n{exc}", fg="yellow", bold=True, err=True)
+
+
 def set_acl(**kwargs):
     try:
         bucket_lib.set_acl(**kwargs)
@@ -223,6 +443,15 @@ def generate_url(resource, bucket_name, object_name, expire):
         click.secho(f"URL generation failed. \n{exc}", fg="yellow", bold=True, err=True)
 
 
+def generate_urls(resource, bucket_name, object_names, expire):
+    try:
+        urls = bucket_lib.generate_urls(resource, bucket_name, object_names, expire)
+        for object_name in object_names:
+            click.secho(f"{urls[object_name]}")
+    except Exception as exc:
+        click.secho(f"URL generation failed. \n{exc}", fg="yellow", bold=True, err=True)
+
+
 def mkdir(resource, bucket_name, dir_name):
     try:
         bucket_lib.mkdir(resource, bucket_name, dir_name)
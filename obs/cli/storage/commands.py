@@ -6,6 +6,7 @@ from obs.cli.storage import bucket
 from obs.cli.storage import gmt
 from obs.libs import utils
 from obs.libs import config
+from obs.libs import transfer
 
 
 def warn_inexsit_config():
@@ -38,6 +39,41 @@ def get_plain_auth():
         sys.exit(1)
 
 
+def transfer_flags(func):
+    """Add multipart transfer options to a command."""
+    flags = [
+        click.option(
+            "--multipart-threshold",
+            "multipart_threshold",
+            help="Size from which multipart transfer is used, e.g. 64MiB",
+        ),
+        click.option(
+            "--multipart-chunksize",
+            "multipart_chunksize",
+            help='Part size of multipart transfer, e.g. 64MiB, or "auto"',
+        ),
+        click.option(
+            "--max-concurrency",
+            "max_concurrency",
+            type=click.IntRange(min=1),
+            help="Number of concurrent parts per object",
+        ),
+    ]
+    for flag in reversed(flags):
+        func = flag(func)
+    return func
+
+
+def get_transfer_options(multipart_threshold, multipart_chunksize, max_concurrency):
+    """Return transfer options, using values from config file if not given."""
+    try:
+        return transfer.transfer_options(
+            multipart_threshold, multipart_chunksize, max_concurrency
+        )
+    except ValueError as exc:
+        raise click.BadParameter(f"{exc}")
+
+
 @click.group()
 def storage():
     """Manage user storage."""
@@ -56,13 +92,38 @@ def list(uri):
 
 @storage.command("rm")
 @click.argument("uri")
-def remove(uri):
+@click.option(
+    "-r",
+    "--recursive",
+    "recursive",
+    is_flag=True,
+    help="Remove all objects under prefix",
+)
+@click.option(
+    "--force", "force", is_flag=True, help="Remove bucket along with its objects"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of concurrent removal requests",
+)
+def remove(uri, recursive, force, jobs):
     """Remove bucket or object."""
     s3_resource = get_resources()
     bucket_name, prefix = utils.get_bucket_key(uri)
 
+    if recursive:
+        bucket.remove_prefix(
+            s3_resource, bucket_name=bucket_name, prefix=prefix, workers=jobs
+        )
+        return
+
     if not prefix:
-        bucket.remove_bucket(s3_resource, bucket_name=bucket_name)
+        bucket.remove_bucket(s3_resource, bucket_name=bucket_name, force=force)
     if bucket_name and prefix:
         bucket.remove_object(s3_resource, bucket_name=bucket_name, object_name=prefix)
 
@@ -101,76 +162,289 @@ def make_bucket(bucket_name, acl, policy_id, random_name):
 
 @storage.command("get")
 @click.argument("uri")
-def get_object(uri):
+@click.argument("local_dir", default="", required=False)
+@click.option(
+    "-r",
+    "--recursive",
+    "recursive",
+    is_flag=True,
+    help="Download all objects under prefix",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of concurrent downloads",
+)
+@click.option(
+    "--ranged",
+    "ranged",
+    is_flag=True,
+    help="Fetch byte ranges of the object concurrently and verify its ETag",
+)
+@transfer_flags
+def get_object(uri, local_dir, recursive, jobs, ranged, **transfer_args):
     """Download object in bucket."""
     s3_resource = get_resources()
+    options = get_transfer_options(**transfer_args)
     bucket_name, prefix = utils.get_bucket_key(uri)
-    bucket.download_object(s3_resource, bucket_name=bucket_name, object_name=prefix)
+
+    if recursive:
+        bucket.download_prefix(
+            s3_resource,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            local_dir=local_dir,
+            workers=jobs,
+            options=options,
+        )
+        return
+
+    bucket.download_object(
+        s3_resource,
+        bucket_name=bucket_name,
+        object_name=prefix,
+        local_dir=local_dir,
+        options=options,
+        ranged=ranged,
+    )
 
 
 @storage.command("put")
 @click.argument("local_path", default="")
 @click.argument("uri")
-def put_object(local_path, uri):
+@click.option(
+    "-r",
+    "--recursive",
+    "recursive",
+    is_flag=True,
+    help="Upload all files inside LOCAL_PATH directory",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of concurrent uploads",
+)
+@transfer_flags
+def put_object(local_path, uri, recursive, jobs, **transfer_args):
     """Upload object to bucket."""
     s3_resource = get_resources()
+    options = get_transfer_options(**transfer_args)
     bucket_name, prefix = utils.get_bucket_key(uri)
+
+    if recursive:
+        bucket.upload_prefix(
+            s3_resource,
+            bucket_name=bucket_name,
+            local_dir=local_path,
+            prefix=prefix,
+            workers=jobs,
+            options=options,
+        )
+        return
     bucket.upload_object(
         resource=s3_resource,
         bucket_name=bucket_name,
         local_path=local_path,
         object_name=prefix,
+        options=options,
+    )
+
+
+@storage.command("sync")
+@click.argument("src")
+@click.argument("dest")
+@click.option(
+    "--delete",
+    "delete",
+    is_flag=True,
+    help="Remove files in DEST that don't exist in SRC",
+)
+@click.option(
+    "--full",
+    "full",
+    is_flag=True,
+    help="Compare with bucket listing instead of the last sync manifest",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of concurrent transfers",
+)
+@transfer_flags
+def sync(src, dest, delete, full, jobs, **transfer_args):
+    """Sync local directory and bucket prefix.
+
+    Either SRC or DEST must be an s3:// URI. Only files that changed
+    since the last sync are transferred.
+    """
+    if src.startswith("s3://") == dest.startswith("s3://"):
+        raise click.UsageError("Exactly one of SRC and DEST must be an s3:// URI")
+
+    s3_resource = get_resources()
+    options = get_transfer_options(**transfer_args)
+    bucket.sync(
+        s3_resource, src, dest, delete=delete, full=full, workers=jobs, options=options
     )
 
 
 @storage.command("cp")
 @click.argument("src_uri", default="")
 @click.argument("dest_uri", default="")
-def copy_object(src_uri, dest_uri):
+@click.option(
+    "-r", "--recursive", "recursive", is_flag=True, help="Copy all objects under prefix"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of objects copied concurrently",
+)
+def copy_object(src_uri, dest_uri, recursive, jobs):
     """Copy object to other bucket."""
     s3_resource = get_resources()
 
     src_bucket, src_prefix = utils.get_bucket_key(src_uri)
     dest_bucket, dest_prefix = utils.get_bucket_key(dest_uri)
+    if recursive:
+        bucket.copy_prefix(
+            s3_resource, src_bucket, src_prefix, dest_bucket, dest_prefix, jobs
+        )
+        return
+
     bucket.copy_object(s3_resource, src_bucket, src_prefix, dest_bucket, dest_prefix)
 
 
 @storage.command("mv")
 @click.argument("src_uri", default="")
 @click.argument("dest_uri", default="")
-def move_object(src_uri, dest_uri):
+@click.option(
+    "-r", "--recursive", "recursive", is_flag=True, help="Move all objects under prefix"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of objects moved concurrently",
+)
+def move_object(src_uri, dest_uri, recursive, jobs):
     """Move object into other bucket."""
     s3_resource = get_resources()
 
     src_bucket, src_prefix = utils.get_bucket_key(src_uri)
     dest_bucket, dest_prefix = utils.get_bucket_key(dest_uri)
+    if recursive:
+        bucket.copy_prefix(
+            s3_resource,
+            src_bucket,
+            src_prefix,
+            dest_bucket,
+            dest_prefix,
+            jobs,
+            move=True,
+        )
+        return
 
     bucket.move_object(s3_resource, src_bucket, src_prefix, dest_bucket, dest_prefix)
 
 
 @storage.command("du")
 @click.argument("uri", default="", required=False)
-def du(uri):
+@click.option(
+    "-d",
+    "--depth",
+    "depth",
+    type=int,
+    help="Show subtotals of directories up to DEPTH levels deep",
+)
+@click.option(
+    "--progress", "progress", is_flag=True, help="Report scanned pages to stderr"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of buckets or key ranges scanned concurrently",
+)
+def du(uri, depth, progress, jobs):
     """Show disk or bucket usage."""
     s3_resource = get_resources()
 
     bucket_name, prefix = utils.get_bucket_key(uri)
     if bucket_name:
-        bucket.bucket_usage(s3_resource, bucket_name=bucket_name)
+        bucket.bucket_usage(
+            s3_resource,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            depth=depth,
+            progress=progress,
+            workers=jobs,
+        )
     else:
-        bucket.disk_usage(s3_resource)
+        bucket.disk_usage(s3_resource, workers=jobs)
 
 
 @storage.command("info")
 @click.argument("uri")
-def info(uri):
+@click.option(
+    "-f",
+    "--fields",
+    "fields",
+    default="",
+    help="Comma separated bucket info to show, e.g. ACL,Location",
+)
+@click.option(
+    "-r",
+    "--recursive",
+    "recursive",
+    is_flag=True,
+    help="Show info of all objects under prefix as JSON lines",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=utils.DEFAULT_WORKERS,
+    show_default=True,
+    help="Number of objects fetched concurrently",
+)
+def info(uri, fields, recursive, jobs):
     """Display bucket or object info."""
     s3_resource = get_resources()
-    plain_auth = get_plain_auth()
-
     bucket_name, prefix = utils.get_bucket_key(uri)
+    if recursive:
+        bucket.objects_info(s3_resource, bucket_name, prefix, workers=jobs)
+        return
+
+    plain_auth = get_plain_auth()
     if not prefix:
-        bucket.bucket_info(s3_resource, bucket_name=bucket_name, auth=plain_auth)
+        bucket.bucket_info(
+            s3_resource,
+            bucket_name=bucket_name,
+            auth=plain_auth,
+            fields=utils.split_fields(fields),
+        )
     if bucket_name and prefix:
         bucket.object_info(s3_resource, bucket_name=bucket_name, object_name=prefix)
 
@@ -200,12 +474,24 @@ def set_acl(uri, acl):
 @storage.command("presign")
 @click.argument("uri")
 @click.option("--expire", "expire", type=int, help="Set expiration time [default:3600]")
-def url(uri, expire):
+@click.option(
+    "--stdin",
+    "from_stdin",
+    is_flag=True,
+    help="Read object names from stdin, one per line, and print their URLs in order",
+)
+def url(uri, expire, from_stdin):
     """Generate presign URL for object."""
     s3_resource = get_resources()
 
     s3_resource = get_resources()
     bucket_name, prefix = utils.get_bucket_key(uri)
+    if from_stdin:
+        names = (line.rstrip("\n") for line in sys.stdin)
+        object_names = [f"{prefix}{name}" for name in names if name]
+        bucket.generate_urls(s3_resource, bucket_name, object_names, expire)
+        return
+
     bucket.generate_url(
         resource=s3_resource, bucket_name=bucket_name, object_name=prefix, expire=expire
     )
@@ -40,6 +40,22 @@ def run_configure():
             "Use HTTPS protocol",
             "All communication is protected when enabled, but it's slower than plain HTTP.",
         ),
+        (
+            "multipart_threshold",
+            "Multipart Threshold",
+            "Files from this size are transferred in parts, e.g. 8MiB.",
+        ),
+        (
+            "multipart_chunksize",
+            "Multipart Chunk Size",
+            "Size of each part, e.g. 64MiB. Use 'auto' to pick it from file size.",
+        ),
+        ("max_concurrency", "Max Concurrency", "Number of parts transferred at once."),
+        (
+            "addressing_style",
+            "Addressing Style",
+            "Use 'path' to send requests of all buckets to the endpoint host instead of 'virtual' bucket hosts.",
+        ),
     ]
     try:
         while True:
@@ -0,0 +1,85 @@
+import zipfile
+
+from obs.libs import bucket as bucket_lib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StreamSink:
+    """Unseekable file object collecting bytes written by `zipfile`.
+
+    Without `tell` and `seek` zipfile writes sizes and CRC in data
+    descriptors after each entry, so an archive can be produced in one
+    pass and sent while it is written.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget bytes written so far."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def object_chunks(resource, bucket_name, object_name, chunk_size=CHUNK_SIZE):
+    """Yield body of an object in chunks as it arrives."""
+    response = resource.meta.client.get_object(Bucket=bucket_name, Key=object_name)
+    body = response["Body"]
+    try:
+        yield from iter(lambda: body.read(chunk_size), b"")
+    finally:
+        body.close()
+
+
+def prefix_entries(resource, bucket_name, prefix=""):
+    """Yield `(name, object)` of every object under prefix from one listing.
+
+    Names are relative to the "directory" of prefix, as the archive
+    holds its content.
+    """
+    base = prefix[: prefix.rfind("/") + 1]
+    for obj in bucket_lib.iter_files(resource, bucket_name, prefix):
+        name = obj["Key"][len(base) :]
+        if name:
+            yield name, obj
+
+
+def _zip_chunks(resource, bucket_name, entries):
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED, allowZip64=True) as zip_file:
+        for name, obj in entries:
+            info = zipfile.ZipInfo(name, obj["LastModified"].timetuple()[:6])
+            if name.endswith("/"):
+                # directory placeholder
+                zip_file.writestr(info, b"")
+                continue
+
+            info.file_size = obj["Size"]
+            with zip_file.open(info, "w") as dest:
+                for chunk in object_chunks(resource, bucket_name, obj["Key"]):
+                    dest.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_zip(resource, bucket_name, entries):
+    """Yield ZIP64 archive of objects in `entries` chunk by chunk.
+
+    Object bodies are fetched one at a time while the archive is
+    consumed, so memory use doesn't depend on object sizes and nothing
+    is staged on disk. Entries are stored uncompressed.
+
+    :param entries: Iterable of `(name, object)` as yielded by `prefix_entries`
+    """
+    # an empty chunk would end a chunked HTTP response
+    return (chunk for chunk in _zip_chunks(resource, bucket_name, entries) if chunk)
@@ -1,25 +1,124 @@
 import os
 import boto3
+import socket
+import hashlib
+import requests
+import functools
+import itertools
+import threading
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from distutils.util import strtobool
 from cloudianapi.client import CloudianAPIClient
 from requests_aws4auth import AWS4Auth
 
+from obs.libs import cache
+
+_resource_pool = None
+_resource_pool_lock = threading.Lock()
+_http_session = None
+_http_session_lock = threading.Lock()
+_dns_cache = None
+_dns_cache_lock = threading.Lock()
+_getaddrinfo = socket.getaddrinfo
+
+
+@functools.lru_cache(maxsize=16)
+def _endpoint_settings(user_url, admin_url, use_https, addressing_style):
+    ssl = strtobool(use_https)
+    protocol = f"http{ssl and 's' or ''}://"
+    hostname = {"storage": user_url, "admin": admin_url}
+    return protocol, hostname, addressing_style == "path"
+
+
+def addressing_style():
+    """Return "path" or "virtual" addressing style from `OBS_ADDRESSING_STYLE`."""
+    style = (os.environ.get("OBS_ADDRESSING_STYLE") or "virtual").lower()
+    return "path" if style == "path" else "virtual"
+
+
+def endpoint_settings():
+    """Return protocol, hostnames and addressing style of endpoints.
+
+    Settings are parsed once per distinct `OBS_USER_URL`, `OBS_ADMIN_URL`,
+    `OBS_USE_HTTPS` and `OBS_ADDRESSING_STYLE` values, so a reloaded
+    config file is still picked up.
+
+    :return: Tuple of protocol, dict of hostnames and whether path style is used
+    """
+    return _endpoint_settings(
+        os.environ.get("OBS_USER_URL"),
+        os.environ.get("OBS_ADMIN_URL"),
+        os.environ.get("OBS_USE_HTTPS"),
+        addressing_style(),
+    )
+
 
 def get_endpoint(url, bucket=None):
     """generate endpoint.
 
     Use `http` if ssl False otherwise `https`
-    Use `example.com` if bucket False otherwise `bucketname.example.com`
+    Use `example.com` if bucket False otherwise `bucketname.example.com`,
+    or `example.com/bucketname` with path style addressing
     """
-    hostname = {
-        "storage": os.environ.get("OBS_USER_URL"),
-        "admin": os.environ.get("OBS_ADMIN_URL"),
-    }
-    ssl = strtobool(os.environ.get("OBS_USE_HTTPS"))
-    protocol = f"http{ssl and 's' or ''}://"
-    bucket_name = f"{bucket and bucket or ''}{bucket and '.' or ''}"
-    endpoint = f"{protocol}{bucket_name}{hostname[url]}"
-    return endpoint
+    protocol, hostname, path_style = endpoint_settings()
+    if not bucket:
+        return f"{protocol}{hostname[url]}"
+    if path_style:
+        return f"{protocol}{hostname[url]}/{bucket}"
+    return f"{protocol}{bucket}.{hostname[url]}"
+
+
+def cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """`socket.getaddrinfo` answering repeated lookups from the DNS cache.
+
+    Cached addresses are rotated on every lookup, so connections keep
+    spreading over all addresses of a round-robin DNS name.
+    """
+    key = (host, port, family, type, proto, flags)
+    addresses, lookups = _dns_cache.get_or_set(
+        key, lambda: (_getaddrinfo(*key), itertools.count())
+    )
+    if not addresses:
+        return addresses
+    offset = next(lookups) % len(addresses)
+    return addresses[offset:] + addresses[:offset]
+
+
+def enable_dns_cache():
+    """Cache name resolution of the process for `OBS_DNS_CACHE_TTL` seconds.
+
+    Virtual hosted addressing resolves every bucket host separately, the
+    cache saves a lookup for each new connection. It replaces
+    `socket.getaddrinfo` for the whole process, so it is disabled unless
+    `OBS_DNS_CACHE_TTL` is set above 0. Failed lookups are not cached.
+    """
+    global _dns_cache
+    with _dns_cache_lock:
+        if _dns_cache is not None:
+            return
+        ttl = int(os.environ.get("OBS_DNS_CACHE_TTL", 0))
+        if ttl <= 0:
+            return
+        _dns_cache = cache.TTLCache(maxsize=1024, ttl=ttl)
+        socket.getaddrinfo = cached_getaddrinfo
+
+
+def client_config():
+    """Return botocore config for S3 resources.
+
+    The connection pool is sized by `OBS_MAX_POOL_CONNECTIONS`, so
+    concurrent operations don't wait for a free connection. With
+    `OBS_ADDRESSING_STYLE=path` requests of all buckets go to the
+    endpoint host and share its connections.
+    """
+    enable_dns_cache()
+    max_pool_connections = int(os.environ.get("OBS_MAX_POOL_CONNECTIONS", 32))
+    return Config(
+        max_pool_connections=max_pool_connections,
+        s3={"addressing_style": addressing_style()},
+    )
 
 
 def resource():
@@ -32,11 +131,87 @@ def resource():
     endpoint = get_endpoint("storage")
 
     sess = boto3.Session(aws_access_key_id=access_key, aws_secret_access_key=secret_key)
-    s3_resource = sess.resource("s3", endpoint_url=endpoint)
+    s3_resource = sess.resource("s3", endpoint_url=endpoint, config=client_config())
 
     return s3_resource
 
 
+def resource_pool():
+    """Return process-wide pool of boto3 resources.
+
+    Size and lifetime are taken from `OBS_RESOURCE_POOL_SIZE` and
+    `OBS_RESOURCE_POOL_TTL` (seconds) on first use.
+    """
+    global _resource_pool
+    with _resource_pool_lock:
+        if _resource_pool is None:
+            maxsize = int(os.environ.get("OBS_RESOURCE_POOL_SIZE", 64))
+            ttl = int(os.environ.get("OBS_RESOURCE_POOL_TTL", 900))
+            _resource_pool = cache.TTLCache(maxsize=maxsize, ttl=ttl)
+    return _resource_pool
+
+
+def credential_id(access_key, secret_key):
+    """Return access key, secret digest and storage endpoint of a credential.
+
+    Identifies what a credential signs without keeping its secret, e.g.
+    to key caches shared by clients of the same credential.
+    """
+    secret_digest = hashlib.sha256(secret_key.encode()).hexdigest()
+    return access_key, secret_digest, get_endpoint("storage")
+
+
+def pooled_resource(access_key, secret_key):
+    """Take credential and return a warm boto resource from the pool.
+
+    Resources are keyed by access key, secret digest and endpoint, so
+    repeated calls with the same credential reuse one session and its
+    connection pool.
+
+    :return: resource service client.
+    """
+    endpoint = get_endpoint("storage")
+    key = credential_id(access_key, secret_key)
+
+    def create():
+        sess = boto3.Session(
+            aws_access_key_id=access_key, aws_secret_access_key=secret_key
+        )
+        return sess.resource("s3", endpoint_url=endpoint, config=client_config())
+
+    return resource_pool().get_or_set(key, create)
+
+
+def http_session():
+    """Return process-wide `requests` session for SigV4 signed calls.
+
+    Connections are kept alive and pooled per host, so repeated calls
+    skip the TCP and TLS handshakes. Pool size and retries of failed
+    connections and 5xx responses are taken from `OBS_HTTP_POOL_SIZE`
+    and `OBS_HTTP_RETRIES` on first use.
+    """
+    global _http_session
+    enable_dns_cache()
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = int(os.environ.get("OBS_HTTP_POOL_SIZE", 32))
+            retries = Retry(
+                total=int(os.environ.get("OBS_HTTP_RETRIES", 3)),
+                backoff_factor=0.2,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False,
+            )
+            # every bucket is a separate host unless path style is used
+            adapter = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_session = session
+    return _http_session
+
+
 def plain_auth():
     """Sign S3 the auth manually"""
     access_key = os.environ.get("OBS_USER_ACCESS_KEY")
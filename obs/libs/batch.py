@@ -0,0 +1,104 @@
+import collections
+
+from obs.libs import utils
+from obs.libs import bucket as bucket_lib
+
+# required fields of every operation besides `op`
+OPERATIONS = {
+    "delete": ("bucket_name", "object_name"),
+    "copy": ("bucket_name", "object_name", "copy_to"),
+    "move": ("bucket_name", "object_name", "move_to"),
+    "acl": ("bucket_name", "acl"),
+    "mkdir": ("bucket_name", "directory"),
+}
+
+
+def validate(operation):
+    """Raise ValueError if an operation is unknown or misses a field."""
+    if not isinstance(operation, dict):
+        raise ValueError(f"Invalid operation: {operation}")
+
+    op = operation.get("op")
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {op}")
+    missing = [field for field in OPERATIONS[op] if not operation.get(field)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)} of {op} operation")
+
+
+def run_operation(resource, operation):
+    """Run a single operation, moves are only copied here."""
+    op = operation["op"]
+    bucket_name = operation["bucket_name"]
+    if op in ("copy", "move"):
+        dest_bucket = operation.get("copy_to") or operation.get("move_to")
+        bucket_lib.copy_object(
+            resource, bucket_name, operation["object_name"], dest_bucket, None
+        )
+    elif op == "acl":
+        object_name = operation.get("object_name")
+        bucket_lib.set_acl(
+            resource=resource,
+            bucket_name=bucket_name,
+            object_name=object_name,
+            acl_type="object" if object_name else "bucket",
+            acl=operation["acl"],
+        )
+    elif op == "mkdir":
+        bucket_lib.mkdir(resource, bucket_name, operation["directory"])
+
+
+def result(operation, error=None):
+    if error is None:
+        return {"operation": operation, "status": "success"}
+    return {"operation": operation, "status": "error", "message": f"{error}"}
+
+
+def run_batch(resource, operations, workers=utils.DEFAULT_WORKERS):
+    """Run a list of storage operations under one credential.
+
+    Copies, ACL changes and directory creations run concurrently with
+    at most `workers` in flight. Deletes, and the removal of moved
+    objects once copied, are coalesced into `DeleteObjects` requests of
+    up to 1000 keys per bucket, so they run after the other operations.
+
+    :param operations: List of dicts with `op` of delete, copy, move, acl or mkdir and its fields
+    :return: List of results in the order of operations, with status and error message
+    """
+    results = [None] * len(operations)
+    deletes = collections.defaultdict(list)
+    pending = []
+    for index, operation in enumerate(operations):
+        try:
+            validate(operation)
+        except ValueError as exc:
+            results[index] = result(operation, exc)
+            continue
+
+        if operation["op"] == "delete":
+            deletes[operation["bucket_name"]].append(index)
+        else:
+            pending.append(index)
+
+    run = lambda index: run_operation(resource, operations[index])
+    for index, _, error in utils.run_concurrently(run, pending, workers):
+        operation = operations[index]
+        if error is None and operation["op"] == "move":
+            deletes[operation["bucket_name"]].append(index)
+            continue
+        results[index] = result(operation, error)
+
+    for bucket_name, indexes in deletes.items():
+        object_names = [operations[index]["object_name"] for index in indexes]
+        _, errors = bucket_lib.remove_objects(
+            resource, bucket_name, object_names, workers
+        )
+        failed = {error["Key"]: error for error in errors}
+        for index in indexes:
+            operation = operations[index]
+            error = failed.get(operation["object_name"])
+            if error is not None:
+                error = f"{error.get('Code')}: {error.get('Message')}"
+            results[index] = result(operation, error)
+
+    return results
@@ -1,10 +1,22 @@
 import uuid
 import os
-import requests
+import queue
+import string
+import functools
+import threading
+from concurrent import futures
+from botocore.exceptions import ClientError
 
 from obs.libs import gmt
+from obs.libs import cache
+from obs.libs import utils
+from obs.libs import transfer
 from obs.libs import auth as auth_lib
 
+# presigned URLs are handed out again for this part of their lifetime
+URL_REUSE_RATIO = 0.5
+_url_cache = cache.TTLCache(maxsize=4096, ttl=None)
+
 
 def buckets(resource):
     """Return all available buckets object."""
@@ -39,37 +51,304 @@ def create_bucket(**kwargs):
     endpoint = auth_lib.get_endpoint("storage", bucket_name)
     headers = {"x-gmt-policyid": policy_id, "x-amz-acl": acl}
 
-    response = requests.put(endpoint, auth=auth, headers=headers)
+    response = auth_lib.http_session().put(endpoint, auth=auth, headers=headers)
     return response
 
 
-def remove_bucket(resource, bucket_name):
-    """Remove a bucket."""
+def remove_bucket(resource, bucket_name, force=False):
+    """Remove a bucket.
+
+    :param force: Remove all objects inside the bucket first, defaults to False
+    """
+    if force:
+        _, errors = remove_prefix(resource, bucket_name)
+        if errors:
+            raise ValueError(
+                f"{len(errors)} objects in {bucket_name} could not be removed"
+            )
+
     response = resource.Bucket(bucket_name).delete()
     return response
 
 
+def iter_pages(resource, bucket_name, prefix="", delimiter="/"):
+    """Yield `list_objects_v2` responses of a bucket one page at a time."""
+    client = resource.meta.client
+    params = {"Bucket": bucket_name, "Prefix": prefix}
+    if delimiter:
+        params["Delimiter"] = delimiter
+
+    while True:
+        response = client.list_objects_v2(**params)
+        yield response
+        next_token = response.get("NextContinuationToken")
+
+        if next_token is None:
+            return
+        params["ContinuationToken"] = next_token
+
+
+def iter_objects(resource, bucket_name, prefix=""):
+    """Yield directories and objects inside a bucket page by page.
+
+    Directories are yielded as `{"Prefix": ...}` items and objects as
+    `list_objects_v2` contents, so only one page is held in memory.
+    """
+    for page in iter_pages(resource, bucket_name, prefix):
+        yield from page.get("CommonPrefixes") or []
+        yield from page.get("Contents") or []
+
+
+def list_page(
+    resource,
+    bucket_name,
+    prefix="",
+    max_keys=1000,
+    continuation_token=None,
+    start_after=None,
+):
+    """Return one page of directories and objects inside a bucket.
+
+    :param continuation_token: Token of the page returned by the previous call, defaults to None
+    :param start_after: List keys after this one, defaults to None
+    :return: Tuple of entries as yielded by `iter_objects` and token of the next page or None
+    """
+    params = {
+        "Bucket": bucket_name,
+        "Prefix": prefix,
+        "Delimiter": "/",
+        "MaxKeys": max_keys,
+    }
+    if continuation_token:
+        params["ContinuationToken"] = continuation_token
+    if start_after:
+        params["StartAfter"] = start_after
+
+    response = resource.meta.client.list_objects_v2(**params)
+    entries = (response.get("CommonPrefixes") or []) + (response.get("Contents") or [])
+    return entries, response.get("NextContinuationToken")
+
+
+# characters used to split a flat keyspace that has no common prefixes
+KEYSPACE_CHARS = "!-.0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+# sorts after any character of a key
+MAX_CHAR = "\U0010ffff"
+
+# listing pages buffered per key range before its thread waits
+PREFETCH_PAGES = 4
+
+# maximum number of keys accepted by a DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+BUCKET_INFO_FIELDS = ("ACL", "CORS", "Policy", "Expiration", "Location", "GmtPolicy")
+
+
+def _has_keys_after(client, bucket_name, prefix, key):
+    """Check with a single key listing if any key under prefix sorts after key."""
+    response = client.list_objects_v2(
+        Bucket=bucket_name, Prefix=prefix, StartAfter=key, MaxKeys=1
+    )
+    return bool(response.get("Contents"))
+
+
+def _last_true(items, predicate):
+    """Return index of the last item for which predicate holds, or -1.
+
+    Predicate must hold for a leading run of items only, so it is
+    bisected with a logarithmic number of calls.
+    """
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(items[middle]):
+            low = middle + 1
+        else:
+            high = middle
+    return low - 1
+
+
+def _char_class(key, index):
+    """Return sorted characters likely found at `index` of keys like key."""
+    char = key[index : index + 1]
+    for chars in (string.digits, string.ascii_uppercase, string.ascii_lowercase):
+        if char and char in chars:
+            return chars
+    return KEYSPACE_CHARS
+
+
+def flat_boundaries(client, bucket_name, prefix, start_after):
+    """Return keys splitting a flat keyspace after `start_after`.
+
+    Keys left to list share a longer prefix with `start_after` than
+    prefix, such as `log-2026-01-0` of timestamped keys. That prefix
+    and the last character following it are found by bisecting with
+    single key listings, then split on the next two characters.
+    """
+    has_keys_after = functools.partial(_has_keys_after, client, bucket_name, prefix)
+    # longest prefix of start_after shared by all keys left to list
+    depths = range(len(prefix), len(start_after) + 1)
+    shared = _last_true(
+        depths, lambda depth: not has_keys_after(start_after[:depth] + MAX_CHAR)
+    )
+    depth = depths[max(shared, 0)]
+    common = start_after[:depth]
+
+    # characters following it, up to the last one found in a key
+    first_char = start_after[depth : depth + 1]
+    chars = [char for char in _char_class(start_after, depth) if char >= first_char]
+    beyond = _last_true(chars, lambda char: has_keys_after(common + char + MAX_CHAR))
+    chars = chars[: beyond + 2]
+    next_chars = _char_class(start_after, depth + 1)
+    return [
+        f"{common}{char}{next_char}"
+        for char in chars
+        for next_char in next_chars
+        if f"{common}{char}{next_char}" > start_after
+    ]
+
+
+def keyspace_boundaries(
+    resource, bucket_name, prefix="", partitions=16, start_after=None
+):
+    """Return sorted keys splitting objects under prefix into ranges.
+
+    Common prefixes listed after `start_after` are used as boundaries
+    when there are any. Otherwise the keyspace is split with
+    `flat_boundaries`, or on the character following prefix when there
+    is no `start_after`. Range `n` holds keys after boundary `n - 1` up
+    to and including boundary `n`, so every key belongs to exactly one
+    range.
+    """
+    client = resource.meta.client
+    params = {"Bucket": bucket_name, "Prefix": prefix, "Delimiter": "/"}
+    if start_after:
+        params["StartAfter"] = start_after
+
+    response = client.list_objects_v2(**params)
+    candidates = [dir_["Prefix"] for dir_ in response.get("CommonPrefixes") or []]
+    candidates = [key for key in candidates if key > (start_after or "")]
+    if len(candidates) < 2 and start_after:
+        candidates = flat_boundaries(client, bucket_name, prefix, start_after)
+    elif len(candidates) < 2:
+        candidates = [f"{prefix}{char}" for char in KEYSPACE_CHARS]
+
+    if len(candidates) < partitions:
+        return candidates
+
+    step = len(candidates) / partitions
+    return sorted({candidates[int(step * index)] for index in range(1, partitions)})
+
+
+def _put_page(pages, page, stopped):
+    """Put page into a bounded queue unless listing has been stopped."""
+    while not stopped.is_set():
+        try:
+            pages.put(page, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _list_range(client, bucket_name, prefix, start_after, end, pages, stopped):
+    """List keys after `start_after` up to `end` into `pages` queue."""
+    params = {"Bucket": bucket_name, "Prefix": prefix}
+    if start_after:
+        params["StartAfter"] = start_after
+
+    try:
+        while not stopped.is_set():
+            response = client.list_objects_v2(**params)
+            contents = response.get("Contents") or []
+            next_token = response.get("NextContinuationToken")
+            if end is not None and contents and contents[-1]["Key"] > end:
+                contents = [obj for obj in contents if obj["Key"] <= end]
+                next_token = None
+
+            if contents and not _put_page(pages, {"Contents": contents}, stopped):
+                return
+            if next_token is None:
+                break
+            params["ContinuationToken"] = next_token
+    except Exception as exc:
+        _put_page(pages, exc, stopped)
+    finally:
+        _put_page(pages, None, stopped)
+
+
+def iter_pages_parallel(
+    resource, bucket_name, prefix="", workers=utils.DEFAULT_WORKERS, partitions=None
+):
+    """Yield listing pages of all objects under prefix, in key order.
+
+    The first page is listed on its own, so small listings cost a single
+    request. When it is truncated, the rest of the keyspace is split with
+    `keyspace_boundaries` and the ranges are listed concurrently by
+    `workers` threads. Pages are yielded range by range, each range
+    buffering at most `PREFETCH_PAGES` pages.
+    """
+    client = resource.meta.client
+    response = client.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
+    contents = response.get("Contents") or []
+    if contents:
+        yield {"Contents": contents}
+    if not (response.get("IsTruncated") or response.get("NextContinuationToken")):
+        return
+
+    start_after = contents[-1]["Key"]
+    boundaries = keyspace_boundaries(
+        resource, bucket_name, prefix, partitions or workers * 4, start_after
+    )
+    ranges = zip([start_after] + boundaries, boundaries + [None])
+    stopped = threading.Event()
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        range_pages = []
+        for start_after, end in ranges:
+            pages = queue.Queue(maxsize=PREFETCH_PAGES)
+            range_pages.append(pages)
+            executor.submit(
+                _list_range,
+                client,
+                bucket_name,
+                prefix,
+                start_after,
+                end,
+                pages,
+                stopped,
+            )
+
+        try:
+            for pages in range_pages:
+                for page in iter(pages.get, None):
+                    if isinstance(page, Exception):
+                        raise page
+                    yield page
+        finally:
+            stopped.set()
+
+
+def walk_pages(resource, bucket_name, prefix="", workers=1):
+    """Yield listing pages of all objects under prefix, in key order.
+
+    Recursive operations use this, listing key ranges concurrently when
+    `workers` is more than one and the listing spans several pages.
+    """
+    if workers > 1:
+        return iter_pages_parallel(resource, bucket_name, prefix, workers)
+    return iter_pages(resource, bucket_name, prefix, delimiter=None)
+
+
 def get_objects(resource, bucket_name, prefix=""):
     """List objects inside a bucket"""
-    client = resource.meta.client
-    next_token = ""
     content = []
     directory = []
     add_list = lambda keys, values: keys.extend(values) if values is not None else None
 
-    while True:
-        response = client.list_objects_v2(
-            Bucket=bucket_name,
-            Prefix=prefix,
-            Delimiter="/",
-            ContinuationToken=next_token,
-        )
-        add_list(content, response.get("Contents"))
-        add_list(directory, response.get("CommonPrefixes"))
-        next_token = response.get("NextContinuationToken")
+    for page in iter_pages(resource, bucket_name, prefix):
+        add_list(content, page.get("Contents"))
+        add_list(directory, page.get("CommonPrefixes"))
 
-        if next_token is None:
-            return {"Contents": content, "CommonPrefixes": directory}
+    return {"Contents": content, "CommonPrefixes": directory}
 
 
 def get_files(resource, bucket_name, prefix=""):
@@ -82,14 +361,29 @@ def get_files(resource, bucket_name, prefix=""):
 
 
 def is_exists(resource, bucket_name, object_name):
-    response = get_objects(resource, bucket_name, prefix=object_name)
-    if not response["Contents"]:
-        return False
+    """Check object existence with a single HEAD request."""
+    client = resource.meta.client
+    try:
+        client.head_object(Bucket=bucket_name, Key=object_name)
+    except ClientError as exc:
+        if exc.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+    return True
 
-    if object_name in [x["Key"] for x in response["Contents"]]:
-        return True
-    else:
-        return False
+
+def objects_exist(resource, bucket_name, object_names, workers=utils.DEFAULT_WORKERS):
+    """Check existence of many objects concurrently.
+
+    :return: Dict of object name and its existence
+    """
+    check = lambda name: is_exists(resource, bucket_name, name)
+    existence = {}
+    for name, exists, error in utils.run_concurrently(check, object_names, workers):
+        if error:
+            raise error
+        existence[name] = exists
+    return existence
 
 
 def remove_object(resource, bucket_name, object_name):
@@ -101,15 +395,187 @@ def remove_object(resource, bucket_name, object_name):
         raise ValueError(f"Object not exists: {object_name}")
 
 
-def download_object(resource, bucket_name, object_name):
-    """Download an object in a bucket."""
-    if not is_exists(resource, bucket_name, object_name):
+def iter_files(resource, bucket_name, prefix="", workers=1):
+    """Yield listing contents of every object under prefix."""
+    for page in walk_pages(resource, bucket_name, prefix, workers):
+        yield from page.get("Contents") or []
+
+
+def iter_keys(resource, bucket_name, prefix="", workers=1):
+    """Yield key of every object under prefix."""
+    for obj in iter_files(resource, bucket_name, prefix, workers):
+        yield obj["Key"]
+
+
+def delete_batch(resource, bucket_name, object_names):
+    """Remove objects with a single DeleteObjects request.
+
+    :return: List of errors of objects that failed to be removed
+    """
+    client = resource.meta.client
+    response = client.delete_objects(
+        Bucket=bucket_name,
+        Delete={"Objects": [{"Key": name} for name in object_names], "Quiet": True},
+    )
+    return response.get("Errors") or []
+
+
+def remove_objects(
+    resource,
+    bucket_name,
+    object_names,
+    workers=utils.DEFAULT_WORKERS,
+    batch_size=DELETE_BATCH_SIZE,
+):
+    """Remove objects in batches, sending several batches concurrently.
+
+    `object_names` can be a lazy iterator, batches are sent as soon as
+    they are filled.
+
+    :return: Tuple of number of removed objects and list of errors
+    """
+    removed = 0
+    errors = []
+    delete = lambda batch: delete_batch(resource, bucket_name, batch)
+    batches = utils.chunks(object_names, batch_size)
+    for batch, batch_errors, error in utils.run_concurrently(delete, batches, workers):
+        if error:
+            batch_errors = [
+                {"Key": name, "Code": type(error).__name__, "Message": f"{error}"}
+                for name in batch
+            ]
+        removed += len(batch) - len(batch_errors)
+        errors.extend(batch_errors)
+
+    return removed, errors
+
+
+def remove_prefix(resource, bucket_name, prefix="", workers=utils.DEFAULT_WORKERS):
+    """Remove every object under prefix.
+
+    A prefix without trailing slash is taken as a directory, so
+    `logs` doesn't remove `logs-archive/` or `logsbook.txt`.
+
+    :return: Tuple of number of removed objects and list of errors
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    object_names = iter_keys(resource, bucket_name, prefix, workers)
+    return remove_objects(resource, bucket_name, object_names, workers)
+
+
+def download_object(
+    resource, bucket_name, object_name, local_dir="", options=None, ranged=False
+):
+    """Download an object in a bucket.
+
+    :param options: Multipart transfer options, defaults to `transfer.transfer_options()`
+    :param ranged: Fetch byte ranges concurrently and verify size and ETag, defaults to False
+    """
+    # ranged download checks existence with its own HEAD request
+    if not ranged and not is_exists(resource, bucket_name, object_name):
         raise ValueError(f"Object not exists: {object_name}")
 
-    if os.path.dirname(object_name):
+    filename = os.path.join(local_dir, object_name)
+    if os.path.dirname(filename):
         # if object contains '/'
-        os.makedirs(os.path.dirname(object_name), exist_ok=True)
-    resource.Object(bucket_name, object_name).download_file(f"{object_name}")
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    if ranged:
+        client = resource.meta.client
+        transfer.download_ranges(client, bucket_name, object_name, filename, options)
+        return
+
+    obj = resource.Object(bucket_name, object_name)
+    obj.download_file(
+        filename, Config=transfer.transfer_config(obj.content_length, options)
+    )
+
+
+def local_path(local_dir, object_name):
+    """Return path of an object inside local_dir.
+
+    Raise ValueError for object names escaping local_dir, e.g. `../foo`.
+    """
+    base = os.path.abspath(local_dir)
+    path = os.path.abspath(os.path.join(base, object_name))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"Object path is outside {local_dir}: {object_name}")
+    return path
+
+
+def is_synced(path, obj):
+    """Check if local file has the same size and modification time as object."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    last_modified = int(obj["LastModified"].timestamp())
+    return stat.st_size == obj["Size"] and int(stat.st_mtime) == last_modified
+
+
+def download_file(resource, bucket_name, obj, path, skip_synced=True, options=None):
+    """Download an object listed by `iter_files` into path.
+
+    The local file gets the object modification time, so it is skipped
+    next time by `is_synced`.
+
+    :return: Downloaded size, None if the object is skipped
+    """
+    if obj["Key"].endswith("/"):
+        # directory placeholder
+        os.makedirs(path, exist_ok=True)
+        return None
+
+    if skip_synced and is_synced(path, obj):
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    config = transfer.transfer_config(obj["Size"], options)
+    resource.meta.client.download_file(bucket_name, obj["Key"], path, Config=config)
+    last_modified = obj["LastModified"].timestamp()
+    os.utime(path, (last_modified, last_modified))
+    return obj["Size"]
+
+
+def download_prefix(
+    resource,
+    bucket_name,
+    prefix="",
+    local_dir=".",
+    workers=utils.DEFAULT_WORKERS,
+    skip_synced=True,
+    options=None,
+):
+    """Download every object under prefix concurrently.
+
+    Objects keep their key as path below local_dir, as `download_object`
+    does. Files with matching size and modification time are skipped.
+    A prefix without trailing slash is taken as a directory.
+
+    :return: Dict of transferred, skipped and failed counts, transferred bytes and errors
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    stats = {"transferred": 0, "skipped": 0, "failed": 0, "bytes": 0, "errors": []}
+    options = options or transfer.transfer_options()
+
+    def download(obj):
+        path = local_path(local_dir, obj["Key"])
+        return download_file(resource, bucket_name, obj, path, skip_synced, options)
+
+    objects = iter_files(resource, bucket_name, prefix, workers)
+    for obj, size, error in utils.run_concurrently(download, objects, workers):
+        if error:
+            stats["failed"] += 1
+            stats["errors"].append({"Key": obj["Key"], "Message": f"{error}"})
+        elif size is None:
+            stats["skipped"] += 1
+        else:
+            stats["transferred"] += 1
+            stats["bytes"] += size
+
+    return stats
 
 
 def upload_object(**kwargs):
@@ -123,13 +589,18 @@ def upload_object(**kwargs):
 
     resource = kwargs.get("resource")
     bucket_name = kwargs.get("bucket_name")
+    config = transfer.transfer_config(
+        os.path.getsize(local_path), kwargs.get("options")
+    )
     resource_upload = resource.Object(bucket_name, filename)
     if kwargs.get("content_type"):
         resource_upload.upload_file(
-            Filename=local_path, ExtraArgs={"ContentType": kwargs.get("content_type")}
+            Filename=local_path,
+            ExtraArgs={"ContentType": kwargs.get("content_type")},
+            Config=config,
         )
     else:
-        resource_upload.upload_file(Filename=local_path)
+        resource_upload.upload_file(Filename=local_path, Config=config)
 
 
 def upload_bin_object(**kwargs):
@@ -139,14 +610,99 @@ def upload_bin_object(**kwargs):
 
     resource = kwargs.get("resource")
     bucket_name = kwargs.get("bucket_name")
+    config = transfer.transfer_config(fileobj_size(fileobj), kwargs.get("options"))
     resource_upload = resource.Object(bucket_name, filename)
 
     if kwargs.get("content_type"):
         resource_upload.upload_fileobj(
-            Fileobj=fileobj, ExtraArgs={"ContentType": kwargs.get("content_type")}
+            Fileobj=fileobj,
+            ExtraArgs={"ContentType": kwargs.get("content_type")},
+            Config=config,
         )
     else:
-        resource_upload.upload_fileobj(Fileobj=fileobj)
+        resource_upload.upload_fileobj(Fileobj=fileobj, Config=config)
+
+
+def fileobj_size(fileobj):
+    """Return remaining size of a seekable file object, None otherwise."""
+    if not fileobj.seekable():
+        return None
+    position = fileobj.tell()
+    size = fileobj.seek(0, os.SEEK_END) - position
+    fileobj.seek(position)
+    return size
+
+
+def walk_local(local_dir):
+    """Yield path and stat result of every file below local_dir."""
+    dirs = [local_dir]
+    while dirs:
+        with os.scandir(dirs.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, entry.stat()
+
+
+def upload_file(resource, bucket_name, local_path, object_name, size, options=None):
+    """Upload a local file, using multipart upload only for large files.
+
+    :param options: Multipart transfer options, defaults to `transfer.transfer_options()`
+    :return: ETag of uploaded object, None for multipart upload
+    """
+    client = resource.meta.client
+    options = options or transfer.transfer_options()
+    if size < options["multipart_threshold"]:
+        with open(local_path, "rb") as file_:
+            response = client.put_object(
+                Bucket=bucket_name, Key=object_name, Body=file_
+            )
+        return response.get("ETag")
+
+    config = transfer.transfer_config(size, options)
+    client.upload_file(local_path, bucket_name, object_name, Config=config)
+    return None
+
+
+def upload_prefix(
+    resource,
+    bucket_name,
+    local_dir,
+    prefix="",
+    workers=utils.DEFAULT_WORKERS,
+    options=None,
+):
+    """Upload every file below local_dir concurrently.
+
+    Files are uploaded under prefix with their path relative to
+    local_dir as key. All workers share the connection pool of
+    `resource`.
+
+    :return: Dict of transferred and failed counts, transferred bytes and errors
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    options = options or transfer.transfer_options()
+
+    def upload(file_):
+        path, stat = file_
+        relative_path = os.path.relpath(path, local_dir).replace(os.sep, "/")
+        object_name = f"{prefix}{relative_path}"
+        upload_file(resource, bucket_name, path, object_name, stat.st_size, options)
+        return stat.st_size
+
+    stats = {"transferred": 0, "skipped": 0, "failed": 0, "bytes": 0, "errors": []}
+    files = walk_local(local_dir)
+    for (path, _), size, error in utils.run_concurrently(upload, files, workers):
+        if error:
+            stats["failed"] += 1
+            stats["errors"].append({"Key": path, "Message": f"{error}"})
+        else:
+            stats["transferred"] += 1
+            stats["bytes"] += size
+
+    return stats
 
 
 def copy_object(resource, src_bucket, src_object_name, dest_bucket, dest_object_name):
@@ -168,25 +724,192 @@ def move_object(resource, src_bucket, src_object_name, dest_bucket, dest_object_
     remove_object(resource, src_bucket, src_object_name)
 
 
-def bucket_usage(resource, bucket_name):
-    """Calculate bucket usage."""
-    objects = get_files(resource, bucket_name)
-    total_objects = len(objects)
+def copy_listed_object(
+    resource, src_bucket, obj, dest_bucket, dest_object_name, options=None
+):
+    """Copy an object from a listing server side.
+
+    The listed size picks a single `CopyObject` request or a multipart
+    copy for objects over 5 GiB, without another HEAD request.
+    """
+    client = resource.meta.client
+    if obj["Size"] > transfer.MAX_COPY_SIZE:
+        transfer.copy_multipart(
+            client,
+            src_bucket,
+            obj["Key"],
+            dest_bucket,
+            dest_object_name,
+            obj["Size"],
+            options,
+        )
+        return
+
+    copy_source = {"Bucket": src_bucket, "Key": obj["Key"]}
+    client.copy_object(CopySource=copy_source, Bucket=dest_bucket, Key=dest_object_name)
+
+
+def copy_prefixes(src_bucket, prefix, dest_bucket, dest_prefix=None):
+    """Return source and destination prefixes of a copy as directories.
+
+    :param dest_prefix: Prefix of copied objects, defaults to prefix
+    :raise ValueError: If destination is inside the source in the same bucket
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    if dest_prefix is None:
+        dest_prefix = prefix
+    if dest_prefix and not dest_prefix.endswith("/"):
+        dest_prefix = f"{dest_prefix}/"
+    if src_bucket == dest_bucket and dest_prefix.startswith(prefix):
+        # copies would show up in the listing being copied
+        raise ValueError(f"Destination {dest_prefix} is inside {prefix}")
+    return prefix, dest_prefix
+
+
+def copy_prefix(
+    resource,
+    src_bucket,
+    prefix,
+    dest_bucket,
+    dest_prefix=None,
+    move=False,
+    workers=utils.DEFAULT_WORKERS,
+    options=None,
+):
+    """Copy or move every object under prefix server side.
+
+    Objects are copied concurrently while the source is listed, so no
+    data passes through the client and memory stays flat whatever the
+    number of objects. Keys keep their path relative to prefix under
+    `dest_prefix`. With `move`, copied objects are removed in batches
+    of 1000 as copies complete, objects that failed to be copied are
+    kept.
+
+    :param dest_prefix: Prefix of copied objects, defaults to prefix
+    :param move: Remove source objects once copied, defaults to False
+    :return: Dict of transferred, failed and deleted counts, copied bytes and errors
+    """
+    prefix, dest_prefix = copy_prefixes(src_bucket, prefix, dest_bucket, dest_prefix)
+
+    def copy(obj):
+        dest_object_name = f"{dest_prefix}{obj['Key'][len(prefix):]}"
+        copy_listed_object(
+            resource, src_bucket, obj, dest_bucket, dest_object_name, options
+        )
+
+    stats = {
+        "transferred": 0,
+        "skipped": 0,
+        "failed": 0,
+        "deleted": 0,
+        "bytes": 0,
+        "errors": [],
+    }
+
+    def copied_keys():
+        objects = iter_files(resource, src_bucket, prefix, workers)
+        for obj, _, error in utils.run_concurrently(copy, objects, workers):
+            if error:
+                stats["failed"] += 1
+                stats["errors"].append({"Key": obj["Key"], "Message": f"{error}"})
+                continue
+            stats["transferred"] += 1
+            stats["bytes"] += obj["Size"]
+            yield obj["Key"]
+
+    if move:
+        removed, errors = remove_objects(resource, src_bucket, copied_keys(), workers)
+        stats["deleted"] = removed
+        stats["failed"] += len(errors)
+        stats["errors"].extend(errors)
+    else:
+        for _ in copied_keys():
+            pass
+
+    return stats
+
+
+def usage_prefix(object_name, prefix="", depth=1):
+    """Return directory of an object, `depth` levels below `prefix`."""
+    dirs = object_name[len(prefix) :].split("/")[:-1][:depth]
+    return prefix + "".join(f"{dir_}/" for dir_ in dirs)
+
+
+def scan_usage(resource, bucket_name, prefix="", depth=None, progress=None, workers=1):
+    """Calculate usage of objects under prefix.
+
+    Sizes are summed while listing pages arrive, so memory stays flat
+    regardless of the number of objects.
+
+    :param depth: Group subtotals by directories this many levels below prefix, defaults to None (no subtotals)
+    :param progress: Callable receiving pages, total size and total objects scanned so far, defaults to None
+    :param workers: Number of key ranges listed concurrently, defaults to 1
+    :return: Tuple of total size, total objects and dict of directory subtotals
+    """
     total_size = 0
-    for obj in objects:
-        total_size += obj.size
+    total_objects = 0
+    subtotals = {}
+
+    pages = walk_pages(resource, bucket_name, prefix, workers)
+    for page_number, page in enumerate(pages, 1):
+        for obj in page.get("Contents") or []:
+            total_size += obj["Size"]
+            total_objects += 1
+            if depth:
+                dir_ = usage_prefix(obj["Key"], prefix, depth)
+                size, objects = subtotals.get(dir_, (0, 0))
+                subtotals[dir_] = (size + obj["Size"], objects + 1)
+
+        if progress:
+            progress(page_number, total_size, total_objects)
+
+    return total_size, total_objects, subtotals
+
+
+def bucket_usage(resource, bucket_name, prefix="", progress=None, workers=1):
+    """Calculate bucket usage."""
+    total_size, total_objects, _ = scan_usage(
+        resource, bucket_name, prefix, progress=progress, workers=workers
+    )
     return total_size, total_objects
 
 
-def disk_usage(resource):
-    """Calculate disk usage."""
-    all_buckets = buckets(resource)
-    bucket_names = [bucket.name for bucket in all_buckets]
+def iter_disk_usage(resource, bucket_names=None, workers=utils.DEFAULT_WORKERS):
+    """Yield `(bucket_name, (size, objects), error)` as each bucket is scanned.
+
+    Buckets are scanned concurrently and yielded in completion order.
+
+    :param bucket_names: Buckets to scan, defaults to all buckets
+    """
+    if bucket_names is None:
+        bucket_names = [bucket.name for bucket in buckets(resource)]
+    scan = lambda bucket_name: bucket_usage(resource, bucket_name)
+    return utils.run_concurrently(scan, bucket_names, workers)
+
+
+def disk_usage(resource, workers=utils.DEFAULT_WORKERS, on_error=None):
+    """Calculate disk usage.
+
+    Buckets are scanned concurrently by `workers` threads. If `on_error`
+    is given, a bucket that fails is left out of the result and passed
+    to it with the exception, otherwise the exception is raised.
+    """
+    bucket_names = [bucket.name for bucket in buckets(resource)]
+
+    usages = {}
+    for bucket_name, usage, error in iter_disk_usage(resource, bucket_names, workers):
+        if error:
+            if on_error is None:
+                raise error
+            on_error(bucket_name, error)
+            continue
+        usages[bucket_name] = usage
 
     disk_usages = []
     for bucket_name in bucket_names:
-        usage = bucket_usage(resource, bucket_name)
-        disk_usages.append([bucket_name, usage])
+        if bucket_name in usages:
+            disk_usages.append([bucket_name, usages[bucket_name]])
 
     return disk_usages
 
@@ -236,7 +959,11 @@ def get_grant_name(grant):
 
 def get_grants(obj):
     """Get grants info of bucket or object."""
-    grants = obj.Acl().grants
+    return grants_info(obj.Acl().grants)
+
+
+def grants_info(grants):
+    """Get grantee name and permission pairs of ACL grants."""
     grantees = []
 
     for grant in grants:
@@ -255,21 +982,40 @@ def bucket_gmt_policy(bucket_name, auth):
     return description
 
 
-def bucket_info(resource, bucket_name, auth):
-    """Info of bucket."""
+def bucket_info(resource, bucket_name, auth, fields=None):
+    """Info of bucket.
+
+    Every field is a separate request, they are sent concurrently so
+    the latency is that of the slowest one.
+
+    :param fields: Names of fields to fetch, defaults to `BUCKET_INFO_FIELDS`
+    """
     bucket = resource.Bucket(bucket_name)
     client = resource.meta.client
-
-    gmt_policy = bucket_gmt_policy(bucket_name, auth)
-    info = {
-        "ACL": get_grants(bucket),
-        "CORS": get_cors(bucket),
-        "Policy": get_policy(bucket),
-        "Expiration": get_expiration(client, bucket_name),
-        "Location": get_location(client, bucket_name),
+    getters = {
+        "ACL": lambda: get_grants(bucket),
+        "CORS": lambda: get_cors(bucket),
+        "Policy": lambda: get_policy(bucket),
+        "Expiration": lambda: get_expiration(client, bucket_name),
+        "Location": lambda: get_location(client, bucket_name),
+        "GmtPolicy": lambda: bucket_gmt_policy(bucket_name, auth),
     }
-    if gmt_policy:
-        info["GmtPolicy"] = gmt_policy
+
+    fields = fields or BUCKET_INFO_FIELDS
+    for field in fields:
+        if field not in getters:
+            raise ValueError(f"Unknown bucket info field: {field}")
+
+    values = {}
+    fetch = lambda field: getters[field]()
+    for field, value, error in utils.run_concurrently(fetch, fields, len(fields)):
+        if error:
+            raise error
+        values[field] = value
+
+    info = {field: values[field] for field in fields}
+    if not info.get("GmtPolicy"):
+        info.pop("GmtPolicy", None)
 
     return info
 
@@ -292,6 +1038,42 @@ def object_info(resource, bucket_name, object_name):
     return info
 
 
+def listed_object_info(resource, bucket_name, obj):
+    """Info of an object listed by `iter_files`, as returned by `object_info`.
+
+    Size, modification time, ETag and storage class come from the
+    listing, so only a HEAD and an ACL request are sent.
+    """
+    client = resource.meta.client
+    head = client.head_object(Bucket=bucket_name, Key=obj["Key"])
+    acl = client.get_object_acl(Bucket=bucket_name, Key=obj["Key"])
+    return {
+        "Key": obj["Key"],
+        "ACL": grants_info(acl["Grants"]),
+        "Size": obj["Size"],
+        "LastModified": obj["LastModified"],
+        "MD5": obj["ETag"],
+        "MimeType": head.get("ContentType"),
+        "StorageClass": obj.get("StorageClass"),
+    }
+
+
+def objects_info(resource, bucket_name, prefix="", workers=utils.DEFAULT_WORKERS):
+    """Yield info of every object under prefix.
+
+    Objects are fetched `workers` at a time and yielded in completion
+    order. An object whose info can't be fetched is yielded as a dict of
+    its `Key` and `Error` message.
+    """
+    fetch = lambda obj: listed_object_info(resource, bucket_name, obj)
+    objects = iter_files(resource, bucket_name, prefix, workers)
+    for obj, info, error in utils.run_concurrently(fetch, objects, workers):
+        if error:
+            yield {"Key": obj["Key"], "Error": f"{error}"}
+        else:
+            yield info
+
+
 def set_acl(**kwargs):
     """Set ACL of object or object."""
     resource = kwargs.get("resource")
@@ -307,17 +1089,43 @@ def set_acl(**kwargs):
     return response
 
 
-def generate_url(resource, bucket_name, object_name, expire=3600):
-    """Generate URL for bucket or object."""
-    client = resource.meta.client
-    url = client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket_name, "Key": object_name},
-        ExpiresIn=expire,
-    )
+def generate_url(resource, bucket_name, object_name, expire=3600, credential=None):
+    """Generate URL for bucket or object.
+
+    URLs are signed locally. Given the `credential` identity, such as
+    `auth.credential_id`, they are cached per credential, bucket, key and
+    expiry. The same URL is returned again during the first half of its
+    lifetime, so it's always valid for at least half of `expire`.
+    """
+    expire = expire or 3600
+    key = (credential, bucket_name, object_name, expire)
+    url = _url_cache.get(key) if credential else None
+    if url is None:
+        url = resource.meta.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket_name, "Key": object_name},
+            ExpiresIn=expire,
+        )
+        reuse = int(expire * URL_REUSE_RATIO)
+        if credential and reuse > 0:
+            _url_cache.set(key, url, ttl=reuse)
     return url
 
 
+def generate_urls(resource, bucket_name, object_names, expire=3600, credential=None):
+    """Generate URLs of many objects in one pass with a single client.
+
+    :param credential: Identity of the credential to cache URLs by, defaults to None
+    :return: Dict of object name and its URL
+    """
+    return {
+        object_name: generate_url(
+            resource, bucket_name, object_name, expire, credential
+        )
+        for object_name in object_names
+    }
+
+
 def mkdir(resource, bucket_name, dir_name):
     """Create directory inside bucket"""
     client = resource.meta.client
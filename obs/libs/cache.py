@@ -0,0 +1,98 @@
+import time
+import threading
+import collections
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    Once `maxsize` entries are stored, the least recently used one is
+    evicted. `hits` and `misses` count lookups for monitoring.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _expired(self, expire_at):
+        return expire_at is not None and expire_at <= self.timer()
+
+    def get(self, key, default=None):
+        """Return cached value of `key` or `default` if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item[1]):
+                self._data.pop(key, None)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, ttl=None):
+        """Store `value` under `key`, evicting the least recently used entry.
+
+        :param ttl: Lifetime of this entry in seconds, defaults to `self.ttl`
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = self.timer() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """Return cached value of `key`, creating it with `factory` on a miss.
+
+        `factory` runs outside the lock so a slow build doesn't block
+        lookups of other keys.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        value = factory()
+        self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def discard_if(self, predicate):
+        """Remove entries whose key matches `predicate`.
+
+        :return: Number of removed entries
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -20,6 +20,10 @@ class Config:
     admin_username = ""
     admin_password = ""
     use_https = "true"
+    multipart_threshold = "8MiB"
+    multipart_chunksize = "auto"
+    max_concurrency = "10"
+    addressing_style = "virtual"
 
     def dump_config(self, options, cfg):
         cfg_file = config_file()
@@ -1,9 +1,12 @@
 import os
 import yaml
-import requests
+import threading
 
 from obs.libs import auth as auth_lib
 
+_cache = {}
+_cache_lock = threading.Lock()
+
 
 def policies_file():
     policy_file = os.environ.get("OBS_USER_GMT_POLICY")
@@ -15,21 +18,59 @@ def is_policy_exists():
     return os.path.isfile(policy_file)
 
 
+def load_policies(policy_file):
+    with open(policy_file) as fp:
+        return yaml.safe_load(fp)
+
+
+def index_policies(policies):
+    """Map policy id to its description."""
+    index = {}
+    for policy in policies.values():
+        index[policy["id"]] = policy.get("description") or "No description"
+    return index
+
+
+def policy_table():
+    """Return parsed policies and their index, "notset" if there are none.
+
+    The file is parsed again only when its path, mtime or size changes,
+    so edits are picked up without restarting the process.
+    """
+    policy_file = policies_file()
+    if policy_file == "notset" or not is_policy_exists():
+        return "notset", {}
+
+    stat = os.stat(policy_file)
+    key = (policy_file, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cache.get("key") == key:
+            return _cache["policies"], _cache["index"]
+
+    policies = load_policies(policy_file)
+    index = index_policies(policies)
+    with _cache_lock:
+        _cache.update(key=key, policies=policies, index=index)
+    return policies, index
+
+
 def get_policies():
     """Get policies."""
-    policy_file = policies_file()
-    if policy_file != "notset" and is_policy_exists():
-        policies = yaml.safe_load(open(policy_file))
-        return policies
-    else:
-        return "notset"
+    policies, _ = policy_table()
+    return policies
+
+
+def policy_index():
+    """Get description of every policy id."""
+    _, index = policy_table()
+    return index
 
 
 def policy_id(bucket_name, auth):
     """Get GMT-Policy id from S3 API response headers."""
 
     endpoint = auth_lib.get_endpoint("storage", bucket_name)
-    response = requests.get(endpoint, auth=auth)
+    response = auth_lib.http_session().get(endpoint, auth=auth)
     policy_id = response.headers.get("x-gmt-policyid")
 
     return policy_id
@@ -37,21 +78,6 @@ def policy_id(bucket_name, auth):
 
 def policy_description(policy_id):
     """Get GMT-Policy description."""
-    policies = get_policies()
     # id not found also will return None
     # so gmt policy will not be shown
-    description = None
-
-    if policies == "notset":
-        return
-
-    for zone in policies:
-        policyid, _description, _ = policies[zone].values()
-        if policyid == policy_id:
-            description = _description
-            break
-
-    if description == "":
-        description = "No description"
-
-    return description
+    return policy_index().get(policy_id)
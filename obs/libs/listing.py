@@ -0,0 +1,94 @@
+import os
+import hashlib
+import threading
+
+from obs.libs import cache
+
+# listings with more entries are streamed without being cached
+MAX_CACHED_ENTRIES = 10000
+
+_cache = None
+_cache_lock = threading.Lock()
+# bumped by every invalidation, listings started before it aren't stored
+_generation = 0
+
+
+def listing_cache():
+    """Return process-wide cache of listings.
+
+    Size and lifetime are taken from `OBS_LIST_CACHE_SIZE` and
+    `OBS_LIST_CACHE_TTL` (seconds) on first use. The cache is disabled
+    by the default TTL of 0, as writes only invalidate listings of the
+    process that made them and other worker processes would serve stale
+    listings.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            maxsize = int(os.environ.get("OBS_LIST_CACHE_SIZE", 256))
+            ttl = int(os.environ.get("OBS_LIST_CACHE_TTL", 0))
+            _cache = cache.TTLCache(maxsize=maxsize, ttl=ttl)
+    return _cache
+
+
+def listing_key(access_key, secret_key, bucket_name=None, prefix=""):
+    """Return cache key of a listing, `bucket_name` None for bucket list."""
+    secret_digest = hashlib.sha256(secret_key.encode()).hexdigest()
+    return (access_key, secret_digest, bucket_name, prefix)
+
+
+def cached_listing(key):
+    """Return cached entries of a listing or None."""
+    listings = listing_cache()
+    if not listings.ttl:
+        return None
+    return listings.get(key)
+
+
+def caching(key, entries):
+    """Yield `entries`, storing them once fully consumed.
+
+    Listings that fail midway, exceed `MAX_CACHED_ENTRIES` or overlap
+    with an invalidation are not stored.
+    """
+    generation = _generation
+    stored = []
+    for entry in entries:
+        if stored is not None:
+            stored.append(entry)
+            if len(stored) > MAX_CACHED_ENTRIES:
+                stored = None
+        yield entry
+
+    listings = listing_cache()
+    if stored is None or not listings.ttl:
+        return
+    with _cache_lock:
+        if generation == _generation:
+            listings.set(key, stored)
+
+
+def overlaps(prefix, key_or_prefix):
+    """Check if writing `key_or_prefix` can change the listing of prefix."""
+    return key_or_prefix.startswith(prefix) or prefix.startswith(key_or_prefix)
+
+
+def invalidate(bucket_name, key_or_prefix=""):
+    """Drop cached listings of every credential affected by a write.
+
+    :param key_or_prefix: Written object or prefix, defaults to the whole bucket
+    """
+    global _generation
+    with _cache_lock:
+        _generation += 1
+    listing_cache().discard_if(
+        lambda key: key[2] == bucket_name and overlaps(key[3], key_or_prefix)
+    )
+
+
+def invalidate_buckets():
+    """Drop cached bucket lists after a bucket is created or removed."""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+    listing_cache().discard_if(lambda key: key[2] is None)
@@ -0,0 +1,320 @@
+import os
+import json
+import hashlib
+import pathlib
+import functools
+
+from obs.libs import utils
+from obs.libs import transfer
+from obs.libs import bucket as bucket_lib
+
+
+def manifest_dir():
+    home = os.path.expanduser("~")
+    return os.path.join(home, ".config", "neo-obs", "sync")
+
+
+def manifest_file(local_dir, bucket_name, prefix=""):
+    """Return manifest path of a local directory and bucket prefix pair."""
+    pair = f"{os.path.abspath(local_dir)}:{bucket_name}/{prefix}"
+    digest = hashlib.sha1(pair.encode()).hexdigest()
+    return os.path.join(manifest_dir(), f"{digest}.json")
+
+
+def load_manifest(path):
+    """Load manifest of synced files, empty if not synced yet.
+
+    :return: Dict of relative path and its size, mtime and ETag
+    """
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    pathlib.Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as fp:
+        json.dump(manifest, fp)
+    os.replace(temp_path, path)
+
+
+def manifest_entry(size, mtime, etag):
+    return {"size": size, "mtime": int(mtime), "etag": etag}
+
+
+def is_recorded(entry, stat):
+    """Check if local file is unchanged since it was recorded in manifest."""
+    return (
+        entry is not None
+        and entry["size"] == stat.st_size
+        and entry["mtime"] == int(stat.st_mtime)
+    )
+
+
+def new_stats():
+    return {
+        "transferred": 0,
+        "skipped": 0,
+        "failed": 0,
+        "deleted": 0,
+        "bytes": 0,
+        "errors": [],
+    }
+
+
+def remote_files(resource, bucket_name, prefix, workers):
+    """Return listing contents under prefix keyed by path relative to prefix."""
+    files = {}
+    for obj in bucket_lib.iter_files(resource, bucket_name, prefix, workers):
+        if not obj["Key"].endswith("/"):
+            files[obj["Key"][len(prefix) :]] = obj
+    return files
+
+
+def local_name(local_dir, file_path):
+    """Return path of a local file relative to local_dir, with `/` separators."""
+    return os.path.relpath(file_path, local_dir).replace(os.sep, "/")
+
+
+def is_pushed(entry, stat, listed):
+    """Check if local file is synced with its manifest entry.
+
+    Entries made from a bucket listing match files with the same size
+    and an older mtime than the object.
+    """
+    if listed:
+        return (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] >= stat.st_mtime
+        )
+    return is_recorded(entry, stat)
+
+
+def changed_files(local_dir, manifest, listed, local_names, stats):
+    """Yield local files to upload, recording names of all files walked."""
+    for file_path, stat in bucket_lib.walk_local(local_dir):
+        name = local_name(local_dir, file_path)
+        local_names.add(name)
+        entry = manifest.get(name)
+        if is_pushed(entry, stat, listed):
+            manifest[name] = manifest_entry(stat.st_size, stat.st_mtime, entry["etag"])
+            stats["skipped"] += 1
+            continue
+        yield name, file_path, stat
+
+
+def upload_changed(resource, bucket_name, prefix, options, file_):
+    """Upload a changed file and return ETag of its object."""
+    name, file_path, stat = file_
+    object_name = f"{prefix}{name}"
+    etag = bucket_lib.upload_file(
+        resource, bucket_name, file_path, object_name, stat.st_size, options
+    )
+    if etag is None:
+        response = resource.meta.client.head_object(Bucket=bucket_name, Key=object_name)
+        etag = response["ETag"]
+    return etag
+
+
+def run_transfers(transfer_func, items, workers, stats, record, error_key):
+    """Run `transfer_func` on items concurrently and count results in stats.
+
+    :param record: Called with item and result of a transfer, returns transferred size
+    :param error_key: Called with item of a failed transfer, returns key to report
+    """
+    for item, result, error in utils.run_concurrently(transfer_func, items, workers):
+        if error:
+            stats["failed"] += 1
+            stats["errors"].append({"Key": error_key(item), "Message": f"{error}"})
+            continue
+        stats["transferred"] += 1
+        stats["bytes"] += record(item, result)
+
+
+def delete_remote(resource, bucket_name, prefix, manifest, local_names, stats, workers):
+    """Remove objects whose local file no longer exists."""
+    extraneous = [name for name in manifest if name not in local_names]
+    object_names = [f"{prefix}{name}" for name in extraneous]
+    removed, errors = bucket_lib.remove_objects(
+        resource, bucket_name, object_names, workers
+    )
+    failed = {error["Key"] for error in errors}
+    for name in extraneous:
+        if f"{prefix}{name}" not in failed:
+            manifest.pop(name)
+    stats["deleted"] += removed
+    stats["failed"] += len(errors)
+    stats["errors"].extend(errors)
+
+
+def push(
+    resource,
+    local_dir,
+    bucket_name,
+    prefix="",
+    delete=False,
+    full=False,
+    workers=utils.DEFAULT_WORKERS,
+    options=None,
+):
+    """Upload local files changed since the last sync.
+
+    Files are compared by size and mtime with the manifest, so the bucket
+    is only listed on the first sync or when `full` is set. In that case
+    files with the same size and an older mtime than the object are
+    considered synced.
+
+    :param delete: Remove objects whose local file no longer exists, defaults to False
+    :return: Dict of transferred, skipped, failed and deleted counts, transferred bytes and errors
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+
+    path = manifest_file(local_dir, bucket_name, prefix)
+    manifest = {} if full else load_manifest(path)
+    listed = not manifest
+    if listed:
+        remote = remote_files(resource, bucket_name, prefix, workers)
+        manifest = {
+            name: manifest_entry(
+                obj["Size"], obj["LastModified"].timestamp(), obj["ETag"]
+            )
+            for name, obj in remote.items()
+        }
+
+    stats = new_stats()
+    local_names = set()
+    options = options or transfer.transfer_options()
+
+    def record(file_, etag):
+        name, _, stat = file_
+        manifest[name] = manifest_entry(stat.st_size, stat.st_mtime, etag)
+        return stat.st_size
+
+    try:
+        run_transfers(
+            functools.partial(upload_changed, resource, bucket_name, prefix, options),
+            changed_files(local_dir, manifest, listed, local_names, stats),
+            workers,
+            stats,
+            record,
+            error_key=lambda file_: file_[0],
+        )
+        if delete:
+            delete_remote(
+                resource, bucket_name, prefix, manifest, local_names, stats, workers
+            )
+    finally:
+        save_manifest(path, manifest)
+
+    return stats
+
+
+def local_stat(file_path):
+    """Return stat of a local file or None if it doesn't exist."""
+    try:
+        return os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+
+def is_pulled(entry, file_path, stat, obj):
+    """Check if an existing local file is synced with its object.
+
+    Files are compared with the manifest entry while the object ETag is
+    unchanged, otherwise with the object itself.
+    """
+    if entry is not None and entry["etag"] == obj["ETag"]:
+        return is_recorded(entry, stat)
+    return bucket_lib.is_synced(file_path, obj)
+
+
+def changed_objects(local_dir, remote, manifest, stats):
+    """Yield objects to download with their local path."""
+    for name, obj in remote.items():
+        try:
+            file_path = bucket_lib.local_path(local_dir, name)
+        except ValueError as exc:
+            stats["failed"] += 1
+            stats["errors"].append({"Key": obj["Key"], "Message": f"{exc}"})
+            continue
+
+        stat = local_stat(file_path)
+        if stat is not None and is_pulled(manifest.get(name), file_path, stat, obj):
+            manifest[name] = manifest_entry(stat.st_size, stat.st_mtime, obj["ETag"])
+            stats["skipped"] += 1
+            continue
+        yield name, file_path, obj
+
+
+def download_changed(resource, bucket_name, options, item):
+    """Download a changed object and return its size."""
+    _, file_path, obj = item
+    return bucket_lib.download_file(
+        resource, bucket_name, obj, file_path, skip_synced=False, options=options
+    )
+
+
+def delete_local(local_dir, remote, manifest, stats):
+    """Remove local files whose object no longer exists."""
+    for file_path, _ in bucket_lib.walk_local(local_dir):
+        name = local_name(local_dir, file_path)
+        if name not in remote:
+            os.remove(file_path)
+            manifest.pop(name, None)
+            stats["deleted"] += 1
+
+
+def pull(
+    resource,
+    bucket_name,
+    local_dir,
+    prefix="",
+    delete=False,
+    workers=utils.DEFAULT_WORKERS,
+    options=None,
+):
+    """Download objects changed since the last sync.
+
+    Objects are compared by ETag with the manifest and local files by
+    size and mtime, so unchanged files are never re-hashed. Without a
+    manifest entry, files with the same size and mtime as the object
+    are considered synced.
+
+    :param delete: Remove local files whose object no longer exists, defaults to False
+    :return: Dict of transferred, skipped, failed and deleted counts, transferred bytes and errors
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+
+    path = manifest_file(local_dir, bucket_name, prefix)
+    manifest = load_manifest(path)
+    remote = remote_files(resource, bucket_name, prefix, workers)
+    stats = new_stats()
+    options = options or transfer.transfer_options()
+
+    def record(item, size):
+        name, _, obj = item
+        mtime = obj["LastModified"].timestamp()
+        manifest[name] = manifest_entry(obj["Size"], mtime, obj["ETag"])
+        return size
+
+    try:
+        run_transfers(
+            functools.partial(download_changed, resource, bucket_name, options),
+            changed_objects(local_dir, remote, manifest, stats),
+            workers,
+            stats,
+            record,
+            error_key=lambda item: item[2]["Key"],
+        )
+        if delete:
+            delete_local(local_dir, remote, manifest, stats)
+    finally:
+        save_manifest(path, manifest)
+
+    return stats
@@ -0,0 +1,444 @@
+import os
+import hashlib
+import threading
+import contextlib
+from concurrent import futures
+
+import bitmath
+from boto3.s3.transfer import TransferConfig
+
+from obs.libs import utils
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MIN_CHUNKSIZE = 5 * 1024 * 1024
+MAX_CHUNKSIZE = 5 * 1024 * 1024 * 1024
+MAX_CONCURRENCY = 10
+# limits of a multipart upload
+MAX_PARTS = 10000
+# largest object a single CopyObject request can copy
+MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
+# number of parts auto chunk size aims to stay below
+AUTO_PARTS = 1000
+# source object headers kept by a multipart copy
+COPY_HEADERS = (
+    "ContentType",
+    "Metadata",
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "Expires",
+)
+READ_SIZE = 1024 * 1024
+
+
+def parse_size(value):
+    """Return size in bytes of e.g. `8388608`, `8MiB` or `64 MB`."""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(bitmath.parse_string_unsafe(value).bytes)
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}")
+
+
+def auto_chunksize(size):
+    """Return part size splitting `size` bytes into at most `AUTO_PARTS` parts.
+
+    The part size starts at `MULTIPART_CHUNKSIZE` and doubles up to
+    5 GiB, so a 100 GiB object is uploaded in 128 MiB parts instead of
+    12800 parts of 8 MiB.
+    """
+    chunksize = MULTIPART_CHUNKSIZE
+    while chunksize < MAX_CHUNKSIZE and size > chunksize * AUTO_PARTS:
+        chunksize *= 2
+    return min(chunksize, MAX_CHUNKSIZE)
+
+
+def transfer_options(
+    multipart_threshold=None, multipart_chunksize=None, max_concurrency=None
+):
+    """Return multipart transfer options.
+
+    Options that are not given are read from `OBS_MULTIPART_THRESHOLD`,
+    `OBS_MULTIPART_CHUNKSIZE` and `OBS_MAX_CONCURRENCY` environment
+    variables.
+
+    :param multipart_chunksize: Part size or "auto" to pick it from object size, defaults to "auto"
+    :return: Dict of threshold and chunk size in bytes, or "auto", and concurrency
+    """
+    threshold = (
+        multipart_threshold
+        or os.environ.get("OBS_MULTIPART_THRESHOLD")
+        or MULTIPART_THRESHOLD
+    )
+    chunksize = (
+        multipart_chunksize or os.environ.get("OBS_MULTIPART_CHUNKSIZE") or "auto"
+    )
+    concurrency = (
+        max_concurrency or os.environ.get("OBS_MAX_CONCURRENCY") or MAX_CONCURRENCY
+    )
+
+    if f"{chunksize}".lower() == "auto":
+        chunksize = "auto"
+    else:
+        chunksize = parse_size(chunksize)
+    return {
+        "multipart_threshold": parse_size(threshold),
+        "multipart_chunksize": chunksize,
+        "max_concurrency": int(concurrency),
+    }
+
+
+def transfer_config(size=None, options=None):
+    """Return boto3 `TransferConfig` for an object of `size` bytes.
+
+    :param options: Result of `transfer_options`, defaults to options from environment
+    """
+    options = options or transfer_options()
+    chunksize = options["multipart_chunksize"]
+    if chunksize == "auto":
+        chunksize = auto_chunksize(size or 0)
+
+    return TransferConfig(
+        multipart_threshold=options["multipart_threshold"],
+        multipart_chunksize=chunksize,
+        max_concurrency=options["max_concurrency"],
+    )
+
+
+def byte_ranges(size, chunksize):
+    """Yield `(start, end)` inclusive byte ranges covering `size` bytes."""
+    for start in range(0, size, chunksize):
+        yield start, min(start + chunksize, size) - 1
+
+
+def preallocate(fd, size):
+    """Reserve `size` bytes for a file so ranges can be written in any order."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # not supported by platform or file system
+        os.ftruncate(fd, size)
+
+
+def file_md5(fd, size):
+    """Return MD5 digest of the first `size` bytes of a file."""
+    digest = hashlib.md5()
+    for start in range(0, size, READ_SIZE):
+        digest.update(os.pread(fd, min(READ_SIZE, size - start), start))
+    return digest
+
+
+def multipart_etag(part_digests):
+    """Return ETag S3 computes for a multipart object from part MD5 digests."""
+    digest = hashlib.md5(b"".join(part_digests))
+    return f'"{digest.hexdigest()}-{len(part_digests)}"'
+
+
+def part_ranges(client, bucket_name, object_name, etag, options):
+    """Return byte ranges of every part of a multipart object.
+
+    The part count is the suffix of the multipart ETag and part sizes are
+    read with concurrent HEAD requests, as parts may differ in size.
+    """
+    part_count = int(etag.strip('"').rsplit("-", 1)[1])
+    head_part = lambda part_number: client.head_object(
+        Bucket=bucket_name, Key=object_name, PartNumber=part_number, IfMatch=etag
+    )
+
+    sizes = {}
+    part_numbers = range(1, part_count + 1)
+    heads = utils.run_concurrently(head_part, part_numbers, options["max_concurrency"])
+    with contextlib.closing(heads):
+        for part_number, part, error in heads:
+            if error:
+                raise error
+            sizes[part_number] = part["ContentLength"]
+
+    ranges = []
+    start = 0
+    for part_number in part_numbers:
+        ranges.append((start, start + sizes[part_number] - 1))
+        start += sizes[part_number]
+    return ranges
+
+
+def verify_download(fd, object_name, head, part_digests):
+    """Raise IOError if a downloaded file doesn't match size and ETag of head.
+
+    The ETag of objects encrypted with SSE-KMS is not a digest of their
+    data, only their size is verified.
+
+    :param part_digests: MD5 digests of parts of a multipart object in order
+    """
+    size = head["ContentLength"]
+    etag = head["ETag"]
+    if os.fstat(fd).st_size != size:
+        raise IOError(f"Size mismatch of {object_name}")
+    if head.get("ServerSideEncryption") == "aws:kms":
+        return
+
+    if "-" in etag:
+        actual_etag = multipart_etag(part_digests)
+    else:
+        actual_etag = f'"{file_md5(fd, size).hexdigest()}"'
+    if actual_etag != etag:
+        raise IOError(f"ETag mismatch of {object_name}: {actual_etag} != {etag}")
+
+
+def download_ranges(client, bucket_name, object_name, path, options=None):
+    """Download an object by fetching byte ranges concurrently.
+
+    The file is preallocated and every range is written at its offset
+    with `pwrite`, so no range waits for the ones before it. All ranges
+    are requested with the ETag of the first HEAD request, a change of
+    the object in the middle of the download fails instead of mixing
+    two versions. Ranges of multipart objects follow part boundaries,
+    read from a HEAD request per part, so the multipart ETag is verified
+    from part digests without reading the file again, see
+    `verify_download`. Data is written to `path.part` which replaces
+    `path` once verified.
+
+    :param options: Multipart transfer options, defaults to `transfer_options()`
+    :return: Downloaded size
+    """
+    options = options or transfer_options()
+    head = client.head_object(Bucket=bucket_name, Key=object_name)
+    size = head["ContentLength"]
+    etag = head["ETag"]
+
+    if "-" in etag:
+        ranges = part_ranges(client, bucket_name, object_name, etag, options)
+    else:
+        chunksize = transfer_config(size, options).multipart_chunksize
+        ranges = list(byte_ranges(size, chunksize))
+
+    temp_path = f"{path}.part"
+    fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    def fetch(byte_range):
+        start, end = byte_range
+        response = client.get_object(
+            Bucket=bucket_name,
+            Key=object_name,
+            Range=f"bytes={start}-{end}",
+            IfMatch=etag,
+        )
+        digest = hashlib.md5()
+        offset = start
+        for data in iter(lambda: response["Body"].read(READ_SIZE), b""):
+            os.pwrite(fd, data, offset)
+            digest.update(data)
+            offset += len(data)
+        if offset != end + 1:
+            raise IOError(f"Incomplete range {start}-{end} of {object_name}")
+        return digest.digest()
+
+    try:
+        preallocate(fd, size)
+        digests = {}
+        fetched = utils.run_concurrently(fetch, ranges, options["max_concurrency"])
+        # wait for ranges in flight before the file is closed on error
+        with contextlib.closing(fetched):
+            for byte_range, digest, error in fetched:
+                if error:
+                    raise error
+                digests[byte_range] = digest
+
+        verify_download(fd, object_name, head, [digests[key] for key in ranges])
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+
+    os.close(fd)
+    os.replace(temp_path, path)
+    return size
+
+
+class MultipartUpload:
+    """Writable file object sending written bytes as multipart upload parts.
+
+    The multipart upload is only created once a full part is buffered,
+    smaller objects are sent with a single `PutObject` request. Parts
+    are uploaded concurrently while writing continues. `write` blocks
+    once `max_concurrency` parts are in flight, so at most one more part
+    is buffered and memory use is bounded whatever the object size.
+    Call `complete` when done or `abort` to discard the uploaded parts.
+    """
+
+    def __init__(
+        self, client, bucket_name, object_name, size=None, options=None, **kwargs
+    ):
+        """
+        :param size: Expected object size to pick "auto" part size, defaults to None
+        :param options: Multipart transfer options, defaults to `transfer_options()`
+        :param kwargs: Extra arguments of `create_multipart_upload` or `put_object`, e.g. ContentType
+        """
+        options = options or transfer_options()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.upload_id = None
+        chunksize = transfer_config(size, options).multipart_chunksize
+        self.part_size = max(chunksize, MIN_CHUNKSIZE, -(-(size or 0) // MAX_PARTS))
+        self.size = 0
+        self._extra_args = kwargs
+        self._buffer = bytearray()
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(options["max_concurrency"])
+        self._executor = futures.ThreadPoolExecutor(options["max_concurrency"])
+
+    def _upload_part(self, part_number, data):
+        response = self.client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.object_name,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _submit(self, data):
+        part_number = len(self._parts) + 1
+        if part_number > MAX_PARTS:
+            raise ValueError(
+                f"Object {self.object_name} exceeds {MAX_PARTS} parts"
+                f" of {self.part_size} bytes"
+            )
+        if self.upload_id is None:
+            response = self.client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.object_name, **self._extra_args
+            )
+            self.upload_id = response["UploadId"]
+
+        self._slots.acquire()
+        for part in self._parts:
+            if part.done() and part.exception():
+                self._slots.release()
+                raise part.exception()
+
+        part = self._executor.submit(self._upload_part, part_number, data)
+        # released once the result is set, so failures are seen by the next part
+        part.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(part)
+
+    def write(self, data):
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._submit(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def complete(self):
+        """Upload the remaining bytes and complete the upload.
+
+        :return: Response of `complete_multipart_upload`, or of `put_object` if no part was uploaded
+        """
+        if not self._parts:
+            self._executor.shutdown()
+            return self.client.put_object(
+                Bucket=self.bucket_name,
+                Key=self.object_name,
+                Body=bytes(self._buffer),
+                **self._extra_args,
+            )
+
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+
+        try:
+            parts = [part.result() for part in self._parts]
+        finally:
+            self._executor.shutdown()
+        return self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.object_name,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def abort(self):
+        """Stop pending parts and discard the uploaded ones."""
+        for part in self._parts:
+            part.cancel()
+        self._executor.shutdown()
+        self._buffer = bytearray()
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.object_name, UploadId=self.upload_id
+            )
+
+
+def copy_multipart(
+    client,
+    src_bucket,
+    src_object_name,
+    dest_bucket,
+    dest_object_name,
+    size,
+    options=None,
+):
+    """Copy an object server side with concurrent `UploadPartCopy` requests.
+
+    Needed for objects over `MAX_COPY_SIZE`, which `CopyObject` rejects.
+    No data passes through the client. Content type, metadata and the
+    other `COPY_HEADERS` of the source are kept, like `CopyObject` does.
+    The upload is aborted if a part fails.
+
+    :param size: Size of the source object
+    :param options: Multipart transfer options, defaults to `transfer_options()`
+    :return: Response of `complete_multipart_upload`
+    """
+    options = options or transfer_options()
+    chunksize = transfer_config(size, options).multipart_chunksize
+    chunksize = max(chunksize, MIN_CHUNKSIZE, -(-size // MAX_PARTS))
+    numbered_ranges = enumerate(byte_ranges(size, chunksize), 1)
+    copy_source = {"Bucket": src_bucket, "Key": src_object_name}
+
+    head = client.head_object(Bucket=src_bucket, Key=src_object_name)
+    headers = {name: head[name] for name in COPY_HEADERS if name in head}
+    response = client.create_multipart_upload(
+        Bucket=dest_bucket, Key=dest_object_name, **headers
+    )
+    upload_id = response["UploadId"]
+
+    def copy_part(numbered_range):
+        part_number, (start, end) = numbered_range
+        response = client.upload_part_copy(
+            Bucket=dest_bucket,
+            Key=dest_object_name,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource=copy_source,
+            CopySourceRange=f"bytes={start}-{end}",
+        )
+        return response["CopyPartResult"]["ETag"]
+
+    try:
+        parts = []
+        copied = utils.run_concurrently(
+            copy_part, numbered_ranges, options["max_concurrency"]
+        )
+        with contextlib.closing(copied):
+            for (part_number, _), etag, error in copied:
+                if error:
+                    raise error
+                parts.append({"PartNumber": part_number, "ETag": etag})
+
+        parts.sort(key=lambda part: part["PartNumber"])
+        return client.complete_multipart_upload(
+            Bucket=dest_bucket,
+            Key=dest_object_name,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        client.abort_multipart_upload(
+            Bucket=dest_bucket, Key=dest_object_name, UploadId=upload_id
+        )
+        raise
@@ -35,6 +35,29 @@ def list_user(client, group_id, user_type="all", user_status="active", limit="")
     return users
 
 
+def iter_users(client, group_id, user_type="all", user_status="active", page_size=100):
+    """Yield users of a group, fetching `page_size` users per request.
+
+    The admin API starts a page at the `offset` user id, so one more
+    user is requested to know where the next page starts.
+    """
+    offset = None
+    while True:
+        params = {"limit": page_size + 1}
+        if offset:
+            params["offset"] = offset
+        users = client.user.list(
+            groupId=group_id, userType=user_type, userStatus=user_status, **params
+        )
+        if "reason" in users:
+            raise ValueError(users["reason"])
+
+        yield from users[:page_size]
+        if len(users) <= page_size:
+            return
+        offset = users[page_size]["userId"]
+
+
 def info(client, user_id, group_id):
     """Get user info"""
     user = client.user(userId=user_id, groupId=group_id)
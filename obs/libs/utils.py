@@ -1,7 +1,12 @@
 import sys
 import tzlocal
 import xmltodict
+import itertools
 from datetime import datetime
+from concurrent import futures
+
+# default number of threads for concurrent S3 calls
+DEFAULT_WORKERS = 10
 
 
 def get_bucket_key(uri):
@@ -59,3 +64,44 @@ def human_date(unixtime):
     local_time = datetime.fromtimestamp(unix_timestamp, local_timezone)
     human_datetime = local_time.strftime("%Y-%m-%d %H:%M:%S%z (%Z)")
     return human_datetime
+
+
+def split_fields(fields):
+    """Split comma separated field names, None if there are none."""
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    return names or None
+
+
+def chunks(items, size):
+    """Yield lists of `size` items from an iterable of any length."""
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_concurrently(func, items, workers=DEFAULT_WORKERS):
+    """Call `func` for every item using a bounded pool of threads.
+
+    At most twice `workers` calls are queued at once, so `items` can be
+    a lazy iterator of any length. Yield `(item, result, error)` tuples
+    in completion order, where `error` is the raised exception or None.
+    """
+    items = iter(items)
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for item in itertools.islice(items, workers * 2):
+            pending[executor.submit(func, item)] = item
+
+        while pending:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                result = None if error else future.result()
+                yield item, result, error
+
+            for item in itertools.islice(items, len(done)):
+                pending[executor.submit(func, item)] = item
@@ -3,10 +3,13 @@ import pathlib
 
 from dotenv import load_dotenv
 from obs.api.app import create_app
+from obs.libs import listing
 
 
 @pytest.fixture
-def client():
+def client(monkeypatch):
+    # listings must not leak between tests
+    monkeypatch.setattr(listing, "_cache", None)
     app = create_app()
     client = app.test_client()
 
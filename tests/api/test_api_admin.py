@@ -1,3 +1,4 @@
+import json
 import pytest
 import mock
 
@@ -66,6 +67,21 @@ def test_list(client, monkeypatch):
     ]
 
 
+def test_list_ndjson(client, monkeypatch):
+    def fake_iter_users(client, group_id, user_type, user_status):
+        yield from fake_list_users(client, group_id)
+
+    monkeypatch.setattr(user, "iter_users", fake_iter_users)
+
+    result = client.get("/api/admin/user", data={"groupId": "test", "format": "ndjson"})
+    assert result.mimetype == "application/x-ndjson"
+    lines = result.data.decode().splitlines()
+    assert [json.loads(line)["userId"] for line in lines] == [
+        "jerrygarcia",
+        "johnthompson",
+    ]
+
+
 def fake_qos_info(client, user_id, group_id):
     qos = {
         "groupId": "testing",
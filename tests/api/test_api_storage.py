@@ -1,12 +1,15 @@
-import requests
+import json
+import io
+import zipfile
 import pytest
 import mock
 import tempfile
 import os
 
 from datetime import datetime
+from obs.libs import auth
 from obs.libs import bucket
-from werkzeug.datastructures import FileStorage
+from obs.libs import transfer
 from obs.api.app.controllers.api import storage
 
 
@@ -49,30 +52,154 @@ def test_list(client, monkeypatch):
     ]
 
 
-def fake_list_objects(resource, bucket_name, prefix=""):
-    content = {
-        "Contents": [
-            {
-                "Key": "foo.txt",
-                "LastModified": datetime(2019, 9, 24, 1, 1, 0, 0),
-                "ETag": '"d41d8cd98f00b204e9800998ecffake"',
-                "Size": 36,
-                "StorageClass": "STANDARD",
-            }
-        ],
-        "CommonPrefixes": [{"Prefix": "a/b/"}],
+def fake_iter_objects(resource, bucket_name, prefix=""):
+    yield {"Prefix": "a/b/"}
+    yield {
+        "Key": "foo.txt",
+        "LastModified": datetime(2019, 9, 24, 1, 1, 0, 0),
+        "ETag": '"d41d8cd98f00b204e9800998ecffake"',
+        "Size": 36,
+        "StorageClass": "STANDARD",
     }
-    return content
 
 
 def test_list_object(client, monkeypatch):
-    monkeypatch.setattr(bucket, "get_objects", fake_list_objects)
+    monkeypatch.setattr(bucket, "iter_objects", fake_iter_objects)
 
     result = client.get(
         "api/storage/list",
         data={"bucket_name": "test", "access_key": "123", "secret_key": "123"},
     )
-    assert {"directory": "a/b/"} in result.get_json()["data"]
+    assert result.get_json()["data"] == [
+        {"directory": "a/b/"},
+        {
+            "Key": "foo.txt",
+            "LastModified": "2019-09-24 01:01:00",
+            "ETag": '"d41d8cd98f00b204e9800998ecffake"',
+            "Size": 36,
+            "StorageClass": "STANDARD",
+        },
+    ]
+    assert result.get_json()["count"] == 2
+    assert result.get_json()["status"] == "success"
+
+
+def test_list_cached(client, monkeypatch):
+    calls = []
+
+    def counting_iter_objects(resource, bucket_name, prefix):
+        calls.append(prefix)
+        return fake_iter_objects(resource, bucket_name, prefix)
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "iter_objects", counting_iter_objects)
+    monkeypatch.setattr(bucket, "mkdir", lambda resource, bucket_name, name: None)
+    monkeypatch.setenv("OBS_LIST_CACHE_TTL", "30")
+    credential = {"access_key": "123", "secret_key": "123"}
+
+    for _ in range(2):
+        result = client.get(
+            "api/storage/list", data={"bucket_name": "test/a/", **credential}
+        )
+        assert result.get_json()["count"] == 2
+    assert calls == ["a/"]
+
+    client.post("/api/storage/mkdir/test", data={"directory": "a/new", **credential})
+    result = client.get(
+        "api/storage/list", data={"bucket_name": "test/a/", **credential}
+    )
+    assert result.get_json()["data"][1]["LastModified"] == "2019-09-24 01:01:00"
+    assert calls == ["a/", "a/"]
+
+
+def test_list_page(client, monkeypatch):
+    def fake_list_page(
+        resource, bucket_name, prefix, max_keys, continuation_token, start_after
+    ):
+        assert (prefix, max_keys, continuation_token) == ("a/", 2, "1+token=")
+        return [*fake_iter_objects(resource, bucket_name, prefix)], "2+token="
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "list_page", fake_list_page)
+
+    result = client.get(
+        "api/storage/list",
+        query_string="bucket_name=test/a/&access_key=123&secret_key=123"
+        "&max_keys=2&continuation_token=1+token=",
+    )
+    assert result.get_json()["count"] == 2
+    assert result.get_json()["data"][1]["LastModified"] == "2019-09-24 01:01:00"
+    assert result.get_json()["next_continuation_token"] == "2+token="
+
+
+def test_list_page_max_keys(client):
+    for max_keys in [5000, 0, -1]:
+        result = client.get(
+            "api/storage/list",
+            data={
+                "bucket_name": "test",
+                "access_key": "123",
+                "secret_key": "123",
+                "max_keys": max_keys,
+            },
+        )
+        assert result.status_code == 400
+
+
+def test_list_ndjson(client, monkeypatch):
+    monkeypatch.setattr(bucket, "iter_objects", fake_iter_objects)
+
+    result = client.get(
+        "api/storage/list",
+        data={
+            "bucket_name": "test",
+            "access_key": "123",
+            "secret_key": "123",
+            "format": "ndjson",
+        },
+    )
+    assert result.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in result.data.decode().splitlines()] == [
+        {"directory": "a/b/"},
+        {
+            "Key": "foo.txt",
+            "LastModified": "2019-09-24 01:01:00",
+            "ETag": '"d41d8cd98f00b204e9800998ecffake"',
+            "Size": 36,
+            "StorageClass": "STANDARD",
+        },
+    ]
+
+
+def test_usage_ndjson(client, monkeypatch):
+    def fake_iter_disk_usage(resource):
+        yield "bucket-one", (100, 2), None
+        yield "bucket-two", None, ValueError("Access Denied")
+        yield "bucket-three", (50, 1), None
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "iter_disk_usage", fake_iter_disk_usage)
+
+    result = client.get(
+        "api/storage/usage",
+        data={"access_key": "123", "secret_key": "123", "format": "ndjson"},
+    )
+    assert [json.loads(line) for line in result.data.decode().splitlines()] == [
+        {"name": "bucket-one", "size": 100, "objects": 2},
+        {"name": "bucket-two", "message": "Access Denied"},
+        {"name": "bucket-three", "size": 50, "objects": 1},
+        {"total_usage": "150"},
+    ]
+
+
+def test_list_empty_object(client, monkeypatch):
+    monkeypatch.setattr(bucket, "iter_objects", lambda res, name, prefix: iter([]))
+
+    result = client.get(
+        "api/storage/list",
+        data={"bucket_name": "test", "access_key": "123", "secret_key": "123"},
+    )
+    assert result.get_json()["message"] == "Bucket is Empty."
 
 
 def test_remove_bucket(client, monkeypatch):
@@ -97,53 +224,137 @@ def test_remove_object(client, monkeypatch):
     assert result.get_json()["message"] == f"Object object.png deleted successfully."
 
 
-def fake_object(resource, bucket_name, prefix=""):
-    content = {
-        "Contents": [
-            {
-                "Key": "obj1.jpg",
-                "LastModified": datetime(2019, 9, 24, 1, 1, 0, 0),
-                "ETag": '"d41d8cd98f00b204e9800998ecffake"',
-                "Size": 36,
-                "StorageClass": "STANDARD",
-            }
-        ],
-        "CommonPrefixes": None,
-    }
-    return content
+def test_objects_info(client, monkeypatch):
+    def fake_objects_info(resource, bucket_name, prefix, workers):
+        yield {"Key": "img/a.png", "LastModified": datetime(2019, 9, 24)}
+        yield {"Key": "img/b.png", "Error": "Access Denied"}
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "objects_info", fake_objects_info)
+
+    result = client.get(
+        "/api/storage/object/name",
+        data={
+            "access_key": "123",
+            "secret_key": "123",
+            "object_name": "img/",
+            "recursive": "true",
+        },
+    )
+    assert result.mimetype == "application/x-ndjson"
+    assert result.data.decode().splitlines() == [
+        '{"Key": "img/a.png", "LastModified": "2019-09-24 00:00:00"}',
+        '{"Key": "img/b.png", "Error": "Access Denied"}',
+    ]
+
+
+def test_except_objects_info(client, monkeypatch):
+    def fake_objects_info(resource, bucket_name, prefix, workers):
+        raise ValueError("Access Denied")
+        yield
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "objects_info", fake_objects_info)
+
+    result = client.get(
+        "/api/storage/object/name",
+        data={
+            "access_key": "123",
+            "secret_key": "123",
+            "object_name": "img/",
+            "recursive": "true",
+        },
+    )
+    assert result.status_code == 500
+    assert result.get_json()["message"] == "Access Denied"
+
 
+def fake_get_object(Bucket, Key):
+    return {"Body": io.BytesIO(f"content of {Key}".encode())}
 
-def test_download(client, monkeypatch, fs):
+
+def test_download(client, monkeypatch):
     def download(access_key, secret_key):
         resource = mock.Mock()
-        resource.Object.return_value.download_file.side_effect = lambda name: None
+        resource.meta.client.get_object.side_effect = fake_get_object
         return resource
 
-    def fake_download(resource, bucket_name, prefix):
-        fs.create_file("obj1.jpg")
-
-    monkeypatch.setattr(bucket, "get_objects", fake_object)
-    monkeypatch.setattr(storage, "file_download", fake_download)
     monkeypatch.setattr(storage, "get_resources", download)
 
     result = client.get(
         "/api/storage/object/download/tes_bucket",
-        data={"access_key": "123", "secret_key": "123", "object_name": "obj1.jpg"},
+        data={"access_key": "123", "secret_key": "123", "object_name": "a/obj1.jpg"},
     )
 
-    assert "obj1.jpg" in result.headers["Content-Disposition"]
+    assert 'filename="obj1.jpg"' in result.headers["Content-Disposition"]
     assert result.status_code == 200
+    assert result.data == b"content of a/obj1.jpg"
+
+
+def test_attachment():
+    assert storage.attachment('a"b.jpg') == {
+        "Content-Disposition": 'attachment; filename="a\\"b.jpg"'
+    }
+    assert storage.attachment("résumé.pdf") == {
+        "Content-Disposition": 'attachment; filename="resume.pdf"; '
+        "filename*=UTF-8''r%C3%A9sum%C3%A9.pdf"
+    }
 
 
-def test_upload(client, monkeypatch, fs):
-    fs.create_file("upload/obj1.png")
-    file = FileStorage(
-        filename="obj1.png",
-        content_type="image/png",
-        stream=open("upload/obj1.png", "rb"),
+def test_download_zip(client, monkeypatch):
+    def download(access_key, secret_key):
+        resource = mock.Mock()
+        resource.meta.client.get_object.side_effect = fake_get_object
+        return resource
+
+    def fake_iter_files(resource, bucket_name, prefix):
+        modified = datetime(2019, 9, 24, 1, 1, 0, 0)
+        for key in ["img/", "img/a.png", "img/b/c.png"]:
+            size = len(f"content of {key}")
+            yield {"Key": key, "Size": size, "LastModified": modified}
+
+    monkeypatch.setattr(storage, "get_resources", download)
+    monkeypatch.setattr(bucket, "iter_files", fake_iter_files)
+
+    result = client.get(
+        "/api/storage/object/download/tes_bucket",
+        data={"access_key": "123", "secret_key": "123", "object_name": "img/"},
     )
 
+    assert 'filename="img.zip"' in result.headers["Content-Disposition"]
+    with zipfile.ZipFile(io.BytesIO(result.data)) as zip_file:
+        assert zip_file.namelist() == ["a.png", "b/c.png"]
+        assert zip_file.read("b/c.png") == b"content of img/b/c.png"
+
+
+def test_download_zip_empty(client, monkeypatch):
     monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "iter_files", lambda res, name, prefix: iter([]))
+
+    result = client.get(
+        "/api/storage/object/download/tes_bucket",
+        data={"access_key": "123", "secret_key": "123", "object_name": "img/"},
+    )
+    assert result.status_code == 404
+
+
+def fake_multipart(access_key, secret_key):
+    resource = mock.Mock()
+    client = resource.meta.client
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f'"{kwargs["PartNumber"]}"'
+    }
+    client.complete_multipart_upload.return_value = {"ETag": '"abc-1"'}
+    client.put_object.return_value = {"ETag": '"abc"'}
+    return resource
+
+
+def test_upload(client, monkeypatch):
+    resource = fake_multipart("123", "123")
+    set_acl = mock.Mock()
+    monkeypatch.setattr(storage, "get_resources", lambda *args: resource)
+    monkeypatch.setattr(bucket, "set_acl", set_acl)
 
     result = client.post(
         "/api/storage/object/upload/name",
@@ -152,16 +363,121 @@ def test_upload(client, monkeypatch, fs):
             "secret_key": "123",
             "object_name": "/folder/obj1.jpg",
             "acl": "public",
-            "files": file,
+            "files": (io.BytesIO(b"x" * 1024), "obj1.png", "image/png"),
         },
         content_type="multipart/form-data",
     )
-    assert "obj1.png" in os.listdir("/upload")
     assert (
         result.get_json()["message"]
         == f"Object /folder/obj1.jpg uploaded successfully."
     )
 
+    s3 = resource.meta.client
+    s3.put_object.assert_called_once_with(
+        Bucket="name", Key="/folder/obj1.jpg", Body=b"x" * 1024, ContentType="image/png"
+    )
+    s3.create_multipart_upload.assert_not_called()
+    set_acl.assert_called_once_with(
+        resource=resource,
+        bucket_name="name",
+        object_name="/folder/obj1.jpg",
+        acl_type="object",
+        acl="public",
+    )
+
+
+def test_upload_multipart(client, monkeypatch):
+    resource = fake_multipart("123", "123")
+    monkeypatch.setattr(storage, "get_resources", lambda *args: resource)
+    monkeypatch.setattr(transfer, "MIN_CHUNKSIZE", 512)
+    monkeypatch.setenv("OBS_MULTIPART_CHUNKSIZE", "512")
+
+    result = client.post(
+        "/api/storage/object/upload/name?access_key=123&secret_key=123",
+        data={"files": (io.BytesIO(b"x" * 1024), "obj1.png", "image/png")},
+        content_type="multipart/form-data",
+    )
+    assert result.status_code == 201
+
+    s3 = resource.meta.client
+    s3.create_multipart_upload.assert_called_once_with(
+        Bucket="name", Key="obj1.png", ContentType="image/png"
+    )
+    assert s3.upload_part.call_args[1]["Body"] == b"x" * 512
+    s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="name",
+        Key="obj1.png",
+        UploadId="up-1",
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": 1, "ETag": '"1"'},
+                {"PartNumber": 2, "ETag": '"2"'},
+            ]
+        },
+    )
+    s3.abort_multipart_upload.assert_not_called()
+
+
+def test_upload_abort(client, monkeypatch):
+    resource = fake_multipart("123", "123")
+    resource.meta.client.upload_part.side_effect = ValueError("Access Denied")
+    monkeypatch.setattr(storage, "get_resources", lambda *args: resource)
+    monkeypatch.setattr(transfer, "MIN_CHUNKSIZE", 512)
+    monkeypatch.setenv("OBS_MULTIPART_CHUNKSIZE", "512")
+
+    result = client.post(
+        "/api/storage/object/upload/name?access_key=123&secret_key=123",
+        data={"files": (io.BytesIO(b"x" * 2048), "obj1.png")},
+        content_type="multipart/form-data",
+    )
+    assert result.status_code == 500
+    assert result.get_json()["message"] == "Access Denied"
+    resource.meta.client.abort_multipart_upload.assert_called_once_with(
+        Bucket="name", Key="obj1.png", UploadId="up-1"
+    )
+
+
+def test_upload_name_after_files(client, monkeypatch):
+    resource = fake_multipart("123", "123")
+    monkeypatch.setattr(storage, "get_resources", lambda *args: resource)
+    boundary = "boundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="files"; filename="obj1.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+        "content\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="object_name"\r\n\r\n'
+        "wanted/name.png\r\n"
+        f"--{boundary}--\r\n"
+    )
+
+    result = client.post(
+        "/api/storage/object/upload/name?access_key=123&secret_key=123",
+        data=body,
+        content_type=f"multipart/form-data; boundary={boundary}",
+    )
+    assert result.status_code == 400
+    resource.meta.client.put_object.assert_not_called()
+
+
+def test_upload_not_multipart(client):
+    result = client.post(
+        "/api/storage/object/upload/name?access_key=123&secret_key=123",
+        data=b"content",
+        content_type="application/octet-stream",
+    )
+    assert result.status_code == 400
+
+
+def test_upload_missing_key(client):
+    result = client.post(
+        "/api/storage/object/upload/name",
+        data={"files": (io.BytesIO(b"x"), "obj1.png")},
+        content_type="multipart/form-data",
+    )
+    assert result.status_code == 400
+
 
 def fake_acl(access_key, secret_key):
     acl = mock.Mock()
@@ -209,7 +525,8 @@ def fake_create_bucket(*args, **kwargs):
 
 
 def test_create_bucket(client, monkeypatch):
-    monkeypatch.setattr(requests, "put", fake_create_bucket)
+    session = mock.Mock(put=fake_create_bucket)
+    monkeypatch.setattr(auth, "http_session", lambda: session)
 
     result = client.post(
         "/api/storage/bucket/bucket-name",
@@ -231,3 +548,100 @@ def test_copy(client, monkeypatch):
         },
     )
     assert result.get_json()["message"] == f"Object obj.png copied successfully."
+
+
+def test_copy_recursive(client, monkeypatch):
+    def fake_copy_prefix(resource, bucket_name, prefix, dest_bucket, dest_prefix, move):
+        assert (prefix, dest_bucket, dest_prefix, move) == ("img/", "b2", "bak/", False)
+        return {"transferred": 2, "errors": [{"Key": "img/c", "Message": "Denied"}]}
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "copy_prefix", fake_copy_prefix)
+
+    result = client.post(
+        "/api/storage/object/copy/bucket_name",
+        data={
+            "access_key": "123",
+            "secret_key": "123",
+            "object_name": "img/",
+            "copy_to": "b2",
+            "recursive": "true",
+            "dest_prefix": "bak/",
+        },
+    )
+    assert result.status_code == 201
+    assert (
+        result.get_json()["message"] == "2 objects under img/ copied. 1 objects failed."
+    )
+    assert result.get_json()["data"] == [{"Key": "img/c", "Message": "Denied"}]
+
+
+def test_batch(client, monkeypatch):
+    def fake_run_batch(resource, operations):
+        return [
+            {"operation": operations[0], "status": "success"},
+            {"operation": operations[1], "status": "error", "message": "Denied"},
+        ]
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(storage.batch_lib, "run_batch", fake_run_batch)
+
+    operations = [
+        {"op": "delete", "bucket_name": "satu", "object_name": "a.png"},
+        {"op": "mkdir", "bucket_name": "satu", "directory": "img"},
+    ]
+    result = client.post(
+        "/api/storage/batch",
+        json={"access_key": "123", "secret_key": "123", "operations": operations},
+    )
+    assert result.status_code == 200
+    assert result.get_json()["message"] == "1 of 2 operations succeeded."
+    assert result.get_json()["data"][1]["message"] == "Denied"
+
+
+def test_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+
+    operations = [{"op": "mkdir"}] * (storage.BATCH_LIMIT + 1)
+    result = client.post(
+        "/api/storage/batch",
+        json={"access_key": "123", "secret_key": "123", "operations": operations},
+    )
+    assert result.status_code == 400
+
+
+def test_presign_batch(client, monkeypatch):
+    def fake_generate_urls(resource, bucket_name, object_names, expire, credential):
+        assert credential == auth.credential_id("123", "123")
+        return {name: f"https://bucket.net/{name}" for name in object_names}
+
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(bucket, "generate_urls", fake_generate_urls)
+
+    result = client.post(
+        "/api/storage/presign/bucket_name",
+        json={
+            "access_key": "123",
+            "secret_key": "123",
+            "object_names": ["a.png", "b.png"],
+        },
+    )
+    assert result.get_json()["data"] == {
+        "a.png": "https://bucket.net/a.png",
+        "b.png": "https://bucket.net/b.png",
+    }
+
+
+def test_presign_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(storage, "get_resources", fake_resource)
+    monkeypatch.setattr(storage, "BATCH_LIMIT", 2)
+
+    result = client.post(
+        "/api/storage/presign/bucket_name",
+        json={
+            "access_key": "123",
+            "secret_key": "123",
+            "object_names": ["a.png", "b.png", "c.png"],
+        },
+    )
+    assert result.status_code == 400
@@ -0,0 +1,40 @@
+import io
+import mock
+import zipfile
+from datetime import datetime
+
+from obs.libs import archive
+from obs.libs import bucket
+
+
+def fake_iter_files(resource, bucket_name, prefix):
+    modified = datetime(2020, 5, 27, 1, 1, 0)
+    for key in ["img/", "img/a.png", "img/b/", "img/b/c.png"]:
+        if key.startswith(prefix):
+            yield {"Key": key, "Size": len(key), "LastModified": modified}
+
+
+def test_prefix_entries(monkeypatch):
+    monkeypatch.setattr(bucket, "iter_files", fake_iter_files)
+
+    names = [name for name, _ in archive.prefix_entries(None, "satu", "img/b")]
+    assert names == ["b/", "b/c.png"]
+    names = [name for name, _ in archive.prefix_entries(None, "satu")]
+    assert names == ["img/", "img/a.png", "img/b/", "img/b/c.png"]
+
+
+def test_iter_zip(monkeypatch):
+    monkeypatch.setattr(bucket, "iter_files", fake_iter_files)
+    resource = mock.Mock()
+    resource.meta.client.get_object.side_effect = lambda Bucket, Key: {
+        "Body": io.BytesIO(Key.encode())
+    }
+
+    entries = archive.prefix_entries(resource, "satu", "img/")
+    chunks = list(archive.iter_zip(resource, "satu", entries))
+    assert all(chunks)
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+        assert zip_file.namelist() == ["a.png", "b/", "b/c.png"]
+        assert zip_file.read("b/c.png") == b"img/b/c.png"
+        assert zip_file.getinfo("a.png").date_time == (2020, 5, 27, 1, 1, 0)
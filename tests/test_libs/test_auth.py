@@ -19,3 +19,125 @@ def test_resource(monkeypatch):
     monkeypatch.setattr(boto3, "Session", fake_session)
     monkeypatch.setattr(auth, "get_endpoint", lambda url: None)
     assert auth.resource() == "s3_resource"
+
+
+def test_pooled_resource(monkeypatch):
+    sessions = []
+
+    def counting_session(**kwargs):
+        sessions.append(kwargs)
+        return fake_session(**kwargs)
+
+    monkeypatch.setattr(boto3, "Session", counting_session)
+    monkeypatch.setattr(auth, "get_endpoint", lambda url: "http://foo.net")
+    monkeypatch.setattr(auth, "_resource_pool", None)
+
+    assert auth.pooled_resource("access", "secret") == "s3_resource"
+    assert auth.pooled_resource("access", "secret") == "s3_resource"
+    assert len(sessions) == 1
+
+    auth.pooled_resource("access", "other-secret")
+    assert len(sessions) == 2
+    assert auth.resource_pool().stats()["hits"] == 1
+
+
+def test_credential_id(monkeypatch):
+    monkeypatch.setattr(auth, "get_endpoint", lambda url: "http://foo.net")
+    access_key, secret_digest, endpoint = auth.credential_id("access", "secret")
+    assert (access_key, endpoint) == ("access", "http://foo.net")
+    assert "secret" not in secret_digest
+    assert auth.credential_id("access", "other-secret")[1] != secret_digest
+
+
+def test_http_session(monkeypatch):
+    monkeypatch.setattr(auth, "_http_session", None)
+    monkeypatch.setenv("OBS_HTTP_POOL_SIZE", "8")
+    monkeypatch.setenv("OBS_HTTP_RETRIES", "5")
+
+    session = auth.http_session()
+    assert auth.http_session() is session
+
+    adapter = session.get_adapter("https://bucket.nos.wjv-1.neo.id")
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == 5
+
+
+def test_get_endpoint(monkeypatch):
+    monkeypatch.setenv("OBS_USER_URL", "foo.net")
+    monkeypatch.setenv("OBS_USE_HTTPS", "true")
+    monkeypatch.delenv("OBS_ADDRESSING_STYLE", raising=False)
+    assert auth.get_endpoint("storage") == "https://foo.net"
+    assert auth.get_endpoint("storage", "bucket") == "https://bucket.foo.net"
+
+    monkeypatch.setenv("OBS_ADDRESSING_STYLE", "path")
+    assert auth.get_endpoint("storage", "bucket") == "https://foo.net/bucket"
+    assert auth.client_config().s3 == {"addressing_style": "path"}
+
+    monkeypatch.setenv("OBS_USE_HTTPS", "false")
+    assert auth.get_endpoint("storage") == "http://foo.net"
+
+
+def test_endpoint_settings_cached(monkeypatch):
+    calls = []
+
+    def counting_strtobool(value):
+        calls.append(value)
+        return True
+
+    monkeypatch.setattr(auth, "strtobool", counting_strtobool)
+    monkeypatch.setenv("OBS_USER_URL", "cached.net")
+    monkeypatch.setenv("OBS_USE_HTTPS", "yes")
+    auth._endpoint_settings.cache_clear()
+
+    auth.get_endpoint("storage", "bucket")
+    auth.get_endpoint("storage", "other")
+    assert calls == ["yes"]
+
+
+def test_dns_cache(monkeypatch):
+    lookups = []
+
+    def fake_getaddrinfo(host, port, *args):
+        lookups.append(host)
+        if host == "unknown.net":
+            raise OSError("Name or service not known")
+        return [("address", host, port)]
+
+    monkeypatch.setattr(auth, "_getaddrinfo", fake_getaddrinfo)
+    monkeypatch.setattr(auth, "_dns_cache", None)
+    monkeypatch.setattr(auth.socket, "getaddrinfo", auth.socket.getaddrinfo)
+    monkeypatch.setenv("OBS_DNS_CACHE_TTL", "60")
+
+    auth.enable_dns_cache()
+    assert auth.socket.getaddrinfo("foo.net", 443) == [("address", "foo.net", 443)]
+    assert auth.socket.getaddrinfo("foo.net", 443) == [("address", "foo.net", 443)]
+    assert lookups == ["foo.net"]
+
+    for _ in range(2):
+        try:
+            auth.socket.getaddrinfo("unknown.net", 443)
+        except OSError:
+            pass
+    assert lookups == ["foo.net", "unknown.net", "unknown.net"]
+
+
+def test_dns_cache_round_robin(monkeypatch):
+    addresses = [("address", "10.0.0.1"), ("address", "10.0.0.2")]
+    monkeypatch.setattr(auth, "_getaddrinfo", lambda *args: addresses)
+    monkeypatch.setattr(auth, "_dns_cache", None)
+    monkeypatch.setattr(auth.socket, "getaddrinfo", auth.socket.getaddrinfo)
+    monkeypatch.setenv("OBS_DNS_CACHE_TTL", "60")
+
+    auth.enable_dns_cache()
+    picked = [auth.socket.getaddrinfo("foo.net", 443)[0] for _ in range(4)]
+    assert picked == [addresses[0], addresses[1], addresses[0], addresses[1]]
+
+
+def test_dns_cache_disabled(monkeypatch):
+    getaddrinfo = auth.socket.getaddrinfo
+    monkeypatch.setattr(auth, "_dns_cache", None)
+    monkeypatch.delenv("OBS_DNS_CACHE_TTL", raising=False)
+
+    auth.enable_dns_cache()
+    assert auth._dns_cache is None
+    assert auth.socket.getaddrinfo is getaddrinfo
@@ -0,0 +1,74 @@
+import mock
+from obs.libs import batch
+from obs.libs import bucket
+
+
+def fake_resource(failing=()):
+    resource = mock.Mock()
+    requests = []
+
+    def delete_objects(Bucket, Delete):
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        requests.append((Bucket, keys))
+        errors = [
+            {"Key": key, "Code": "AccessDenied", "Message": "Access Denied"}
+            for key in keys
+            if key in failing
+        ]
+        return {"Errors": errors}
+
+    resource.meta.client.delete_objects = delete_objects
+    return resource, requests
+
+
+def test_validate():
+    for operation in ["a.png", {"op": "rename"}, {"op": "delete", "bucket_name": "b"}]:
+        try:
+            batch.validate(operation)
+        except ValueError:
+            continue
+        raise AssertionError(f"{operation} is valid")
+
+
+def test_run_batch(monkeypatch):
+    copies = []
+
+    def fake_copy(resource, src_bucket, object_name, dest_bucket, dest_object_name):
+        if object_name == "locked.png":
+            raise ValueError("Access Denied")
+        copies.append((src_bucket, object_name, dest_bucket))
+
+    monkeypatch.setattr(bucket, "copy_object", fake_copy)
+    monkeypatch.setattr(bucket, "mkdir", lambda resource, bucket_name, dir_: None)
+    resource, requests = fake_resource(failing=["b.png"])
+    operations = [
+        {"op": "delete", "bucket_name": "satu", "object_name": "a.png"},
+        {"op": "move", "bucket_name": "satu", "object_name": "c.png", "move_to": "dua"},
+        {"op": "delete", "bucket_name": "satu", "object_name": "b.png"},
+        {"op": "copy", "bucket_name": "satu", "object_name": "locked.png"},
+        {
+            "op": "copy",
+            "bucket_name": "satu",
+            "object_name": "locked.png",
+            "copy_to": "dua",
+        },
+        {"op": "mkdir", "bucket_name": "satu", "directory": "img"},
+    ]
+
+    results = batch.run_batch(resource, operations, workers=2)
+
+    assert [item["status"] for item in results] == [
+        "success",
+        "success",
+        "error",
+        "error",
+        "error",
+        "success",
+    ]
+    assert results[2]["message"] == "AccessDenied: Access Denied"
+    assert results[3]["message"] == "Missing copy_to of copy operation"
+    assert results[4]["message"] == "Access Denied"
+    assert copies == [("satu", "c.png", "dua")]
+    # deletes and moved objects share one request
+    assert len(requests) == 1
+    assert sorted(requests[0][1]) == ["a.png", "b.png", "c.png"]
@@ -1,8 +1,12 @@
+import os
 import pytest
 import mock
 import uuid
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
 from obs.libs import gmt
 from obs.libs import bucket
+from obs.libs import transfer
 
 
 @pytest.fixture
@@ -10,6 +14,44 @@ def resource(self):
     pass
 
 
+class FakeS3Client:
+    """Serve `list_objects_v2` from a list of keys, `page_size` at a time."""
+
+    def __init__(self, keys, page_size=3):
+        self.keys = sorted(keys)
+        self.page_size = page_size
+
+    def list_objects_v2(self, Bucket, Prefix="", Delimiter=None, **kwargs):
+        start_after = kwargs.get("ContinuationToken") or kwargs.get("StartAfter", "")
+        entries = []
+        for key in self.keys:
+            if not key.startswith(Prefix) or key <= start_after:
+                continue
+            rest = key[len(Prefix) :]
+            if Delimiter and Delimiter in rest:
+                dir_ = Prefix + rest[: rest.index(Delimiter) + 1]
+                if dir_ > start_after and {"Prefix": dir_} not in entries:
+                    entries.append({"Prefix": dir_})
+                continue
+            entries.append({"Key": key, "Size": len(key)})
+
+        page = entries[: self.page_size]
+        response = {
+            "Contents": [entry for entry in page if "Key" in entry],
+            "CommonPrefixes": [entry for entry in page if "Prefix" in entry],
+        }
+        if len(entries) > self.page_size:
+            last = page[-1]
+            response["NextContinuationToken"] = last.get("Key") or last["Prefix"]
+        return response
+
+
+def fake_s3(keys, page_size=3):
+    resource = mock.Mock()
+    resource.meta.client = FakeS3Client(keys, page_size)
+    return resource
+
+
 class Testbucket:
     def fake_resource(self):
         resource = mock.Mock()
@@ -39,32 +81,402 @@ class Testbucket:
         monkeypatch.setattr(uuid, "uuid4", lambda: "71e43e94-c10d")
         assert bucket.gen_random_name("awesome") == f"awesome-71e43e94-c10d"
 
-    def fake_get_files(self, resource, bucket_nam, prefix=None):
-        obj1 = mock.Mock()
-        obj1.key = "ddg.png"
-        obj1.size = 234
-
-        obj2 = mock.Mock()
-        obj2.key = "obj.txt"
-        obj2.size = 793
+    def fake_pages(self):
+        resource = mock.Mock()
+        resource.meta.client.list_objects_v2.side_effect = [
+            {
+                "Contents": [{"Key": "a.png"}],
+                "CommonPrefixes": [{"Prefix": "a/"}],
+                "NextContinuationToken": "token",
+            },
+            {"Contents": [{"Key": "b.png"}]},
+        ]
+        return resource
 
-        return [obj1, obj2]
+    def test_iter_objects(self):
+        resource = self.fake_pages()
+        assert list(bucket.iter_objects(resource, "satu")) == [
+            {"Prefix": "a/"},
+            {"Key": "a.png"},
+            {"Key": "b.png"},
+        ]
+        last_call = resource.meta.client.list_objects_v2.call_args
+        assert last_call == mock.call(
+            Bucket="satu", Prefix="", Delimiter="/", ContinuationToken="token"
+        )
 
-    def fake_get_objects(self, resource, bucket_nam, prefix=None):
-        return {
-            "Contents": [{"Key": "ddg.png"}],
-            "CommonPrefixes": [{"Prefix": "a/b/"}],
+    def test_get_objects(self):
+        assert bucket.get_objects(self.fake_pages(), "satu") == {
+            "Contents": [{"Key": "a.png"}, {"Key": "b.png"}],
+            "CommonPrefixes": [{"Prefix": "a/"}],
         }
 
-    def test_exists(self, monkeypatch):
-        monkeypatch.setattr(bucket, "get_objects", self.fake_get_objects)
+    def test_list_page(self):
+        resource = fake_s3(["a/1", "a/2", "b.png", "c.png", "d.png"], page_size=2)
+
+        entries, token = bucket.list_page(resource, "satu", max_keys=2)
+        assert entries == [{"Prefix": "a/"}, {"Key": "b.png", "Size": 5}]
+        entries, token = bucket.list_page(resource, "satu", continuation_token=token)
+        assert [entry["Key"] for entry in entries] == ["c.png", "d.png"]
+        assert token is None
+
+        entries, _ = bucket.list_page(resource, "satu", start_after="c.png")
+        assert entries == [{"Key": "d.png", "Size": 5}]
+
+    def fake_head(self):
+        def head_object(Bucket, Key):
+            if Key != "ddg.png":
+                error = {"Error": {"Code": "404", "Message": "Not Found"}}
+                raise ClientError(error, "HeadObject")
+            return {"ContentLength": 234}
 
+        resource = mock.Mock()
+        resource.meta.client.head_object.side_effect = head_object
+        return resource
+
+    def test_exists(self):
+        resource = self.fake_head()
         assert bucket.is_exists(resource, "satu", "ddg.png") is True
         assert bucket.is_exists(resource, "satu", "ang.png") is False
+        resource.meta.client.list_objects_v2.assert_not_called()
+
+    def test_exists_error(self):
+        resource = mock.Mock()
+        error = {"Error": {"Code": "403", "Message": "Forbidden"}}
+        resource.meta.client.head_object.side_effect = ClientError(error, "HeadObject")
+        with pytest.raises(ClientError):
+            bucket.is_exists(resource, "satu", "ddg.png")
+
+    def test_objects_exist(self):
+        assert bucket.objects_exist(
+            self.fake_head(), "satu", ["ddg.png", "ang.png"], workers=2
+        ) == {"ddg.png": True, "ang.png": False}
+
+    def fake_usage_pages(self, resource, bucket_name, prefix="", workers=1):
+        yield {
+            "Contents": [
+                {"Key": "ddg.png", "Size": 234},
+                {"Key": "img/a/obj.png", "Size": 100},
+            ]
+        }
+        yield {"Contents": [{"Key": "img/obj.txt", "Size": 793}]}
 
     def test_bucket_usage(self, monkeypatch):
-        monkeypatch.setattr(bucket, "get_files", self.fake_get_files)
-        assert bucket.bucket_usage(resource, "bucket-name") == (1027, 2)
+        monkeypatch.setattr(bucket, "walk_pages", self.fake_usage_pages)
+        progress = []
+        usage = bucket.bucket_usage(
+            resource, "bucket-name", progress=lambda *args: progress.append(args)
+        )
+        assert usage == (1127, 3)
+        assert progress == [(1, 334, 2), (2, 1127, 3)]
+
+    def listed_keys(self, pages):
+        return [obj["Key"] for page in pages for obj in page["Contents"]]
+
+    def test_boundaries(self):
+        keys = [f"{dir_}/obj{index}" for dir_ in "abcdef" for index in range(3)]
+        resource = fake_s3(keys, page_size=1000)
+        assert bucket.keyspace_boundaries(resource, "satu", "", 3) == ["c/", "e/"]
+        assert bucket.keyspace_boundaries(resource, "satu", "", 10) == [
+            "a/",
+            "b/",
+            "c/",
+            "d/",
+            "e/",
+            "f/",
+        ]
+
+    def test_flat_boundaries(self):
+        resource = fake_s3(["log-1", "log-2"])
+        boundaries = bucket.keyspace_boundaries(resource, "satu", "log-", 4)
+        assert len(boundaries) == 3
+        assert all(boundary.startswith("log-") for boundary in boundaries)
+
+    def test_flat_boundaries_after_first_page(self):
+        keys = [f"log-2026-01-{index:06}" for index in range(2000)]
+        resource = fake_s3(keys, page_size=100)
+        start_after = keys[99]
+
+        boundaries = bucket.keyspace_boundaries(resource, "satu", "", 40, start_after)
+        ranges = zip([start_after] + boundaries, boundaries + [None])
+        sizes = [
+            len([key for key in keys[100:] if start < key and (not end or key <= end)])
+            for start, end in ranges
+        ]
+        assert sum(sizes) == 1900
+        assert len([size for size in sizes if size]) > 10
+
+        pages = bucket.iter_pages_parallel(resource, "satu", workers=10)
+        assert self.listed_keys(pages) == keys
+
+    def test_iter_pages_parallel(self):
+        keys = [f"{dir_}/obj{index}" for dir_ in "abcdef" for index in range(7)]
+        keys += ["a", "c/", "c0", "zzz", "~tilde"]
+        resource = fake_s3(keys)
+
+        for workers, partitions in [(2, 3), (4, 50), (3, None)]:
+            pages = bucket.iter_pages_parallel(
+                resource, "satu", workers=workers, partitions=partitions
+            )
+            assert self.listed_keys(pages) == sorted(keys)
+
+        flat = [f"log-{index:04}" for index in range(100)]
+        pages = bucket.walk_pages(fake_s3(flat), "satu", "log-", workers=4)
+        assert self.listed_keys(pages) == flat
+
+    def test_iter_pages_parallel_single_page(self):
+        resource = fake_s3(["a/1", "b/1", "c/1"])
+        resource.meta.client = mock.Mock(wraps=resource.meta.client)
+
+        pages = bucket.iter_pages_parallel(resource, "satu", workers=4)
+        assert self.listed_keys(pages) == ["a/1", "b/1", "c/1"]
+        resource.meta.client.list_objects_v2.assert_called_once_with(
+            Bucket="satu", Prefix=""
+        )
+
+    def test_boundaries_start_after(self):
+        keys = [f"{dir_}/obj{index}" for dir_ in "abcdef" for index in range(3)]
+        resource = fake_s3(keys, page_size=1000)
+        boundaries = bucket.keyspace_boundaries(resource, "satu", "", 10, "c/obj1")
+        assert boundaries == ["d/", "e/", "f/"]
+
+    def test_iter_pages_parallel_close(self):
+        keys = [f"{dir_}/obj{index}" for dir_ in "abcdef" for index in range(50)]
+        pages = bucket.iter_pages_parallel(fake_s3(keys), "satu", workers=2)
+        assert next(pages)["Contents"][0]["Key"] == "a/obj0"
+        pages.close()
+
+    def test_iter_pages_parallel_error(self):
+        resource = fake_s3(["a/1", "a/2", "a/3", "b/1", "c/1"])
+        list_objects = resource.meta.client.list_objects_v2
+
+        def failing(**kwargs):
+            if kwargs.get("StartAfter") == "b/":
+                raise ValueError("Access Denied")
+            return list_objects(**kwargs)
+
+        resource.meta.client.list_objects_v2 = failing
+        with pytest.raises(ValueError, match="Access Denied"):
+            list(bucket.iter_pages_parallel(resource, "satu", workers=2))
+
+    def fake_delete(self, failing=()):
+        resource = fake_s3([f"logs/{index:04}" for index in range(25)] + ["keep"])
+        batches = []
+
+        def delete_objects(Bucket, Delete):
+            keys = [obj["Key"] for obj in Delete["Objects"]]
+            batches.append(keys)
+            errors = [
+                {"Key": key, "Code": "AccessDenied", "Message": "Access Denied"}
+                for key in keys
+                if key in failing
+            ]
+            return {"Errors": errors} if errors else {}
+
+        resource.meta.client.delete_objects = delete_objects
+        return resource, batches
+
+    def test_remove_prefix(self):
+        resource, batches = self.fake_delete(failing=["logs/0007"])
+        removed, errors = bucket.remove_prefix(resource, "satu", "logs/", workers=1)
+        assert removed == 24
+        assert errors == [
+            {"Key": "logs/0007", "Code": "AccessDenied", "Message": "Access Denied"}
+        ]
+        assert len(batches) == 1
+        assert "keep" not in batches[0]
+
+    def test_remove_prefix_siblings(self):
+        keys = ["logs/1", "logs/2", "logs-archive/x", "logsbook.txt"]
+        resource = fake_s3(keys)
+        deleted = []
+
+        def delete_objects(Bucket, Delete):
+            deleted.extend(obj["Key"] for obj in Delete["Objects"])
+            return {}
+
+        resource.meta.client.delete_objects = delete_objects
+        removed, errors = bucket.remove_prefix(resource, "satu", "logs", workers=1)
+        assert (removed, errors) == (2, [])
+        assert deleted == ["logs/1", "logs/2"]
+
+    def test_download_prefix_siblings(self, monkeypatch, tmp_path):
+        resource = fake_s3(["logs/1", "logs-archive/x"])
+        downloaded = []
+        monkeypatch.setattr(
+            bucket,
+            "download_file",
+            lambda res, bucket_name, obj, *args: downloaded.append(obj["Key"]),
+        )
+
+        bucket.download_prefix(resource, "satu", "logs", str(tmp_path), workers=1)
+        assert downloaded == ["logs/1"]
+
+    def test_remove_objects_batches(self):
+        resource, batches = self.fake_delete()
+        names = (f"logs/{index:04}" for index in range(25))
+        removed, errors = bucket.remove_objects(
+            resource, "satu", names, workers=3, batch_size=10
+        )
+        assert (removed, errors) == (25, [])
+        assert sorted(len(batch) for batch in batches) == [5, 10, 10]
+
+    def test_remove_objects_request_error(self):
+        resource = mock.Mock()
+        resource.meta.client.delete_objects.side_effect = ValueError("timeout")
+        removed, errors = bucket.remove_objects(resource, "satu", ["a", "b"])
+        assert removed == 0
+        assert [error["Key"] for error in errors] == ["a", "b"]
+
+    def fake_copy(self, failing=()):
+        resource, batches = self.fake_delete()
+        copies = []
+
+        def copy_object(CopySource, Bucket, Key):
+            if CopySource["Key"] in failing:
+                raise ValueError("Access Denied")
+            copies.append((CopySource["Key"], Bucket, Key))
+
+        resource.meta.client.copy_object = copy_object
+        return resource, batches, copies
+
+    def test_copy_prefix(self):
+        resource, batches, copies = self.fake_copy()
+        stats = bucket.copy_prefix(resource, "satu", "logs", "dua", "old", workers=3)
+        assert stats["transferred"] == 25
+        assert ("logs/0003", "dua", "old/0003") in copies
+        assert batches == []
+
+    def test_move_prefix(self):
+        resource, batches, copies = self.fake_copy(failing=["logs/0007"])
+        stats = bucket.copy_prefix(
+            resource, "satu", "logs/", "satu", "archive/", move=True, workers=2
+        )
+        assert (stats["transferred"], stats["deleted"], stats["failed"]) == (24, 24, 1)
+        assert stats["errors"] == [{"Key": "logs/0007", "Message": "Access Denied"}]
+        deleted = [key for batch in batches for key in batch]
+        assert sorted(deleted) == sorted(src for src, _, _ in copies)
+        assert "logs/0007" not in deleted
+
+    def test_copy_prefix_into_root(self):
+        resource, _, copies = self.fake_copy()
+        bucket.copy_prefix(resource, "satu", "logs/", "dua", "", workers=2)
+        assert ("logs/0003", "dua", "0003") in copies
+
+    def test_copy_prefix_into_itself(self):
+        resource, _, copies = self.fake_copy()
+        with pytest.raises(ValueError):
+            bucket.copy_prefix(resource, "satu", "logs/", "satu", "logs/old/")
+        assert copies == []
+
+    def test_copy_listed_object_multipart(self, monkeypatch):
+        copy_multipart = mock.Mock()
+        monkeypatch.setattr(transfer, "copy_multipart", copy_multipart)
+        resource = mock.Mock()
+        obj = {"Key": "big", "Size": transfer.MAX_COPY_SIZE + 1}
+
+        bucket.copy_listed_object(resource, "satu", obj, "dua", "big")
+        copy_multipart.assert_called_once()
+        resource.meta.client.copy_object.assert_not_called()
+
+    def test_remove_bucket_force(self, monkeypatch):
+        resource = mock.Mock()
+        monkeypatch.setattr(bucket, "remove_prefix", lambda res, name: (3, []))
+        bucket.remove_bucket(resource, "satu", force=True)
+        resource.Bucket.return_value.delete.assert_called_once_with()
+
+        monkeypatch.setattr(bucket, "remove_prefix", lambda res, name: (2, ["err"]))
+        with pytest.raises(ValueError, match="1 objects in satu"):
+            bucket.remove_bucket(resource, "satu", force=True)
+
+    def fake_download(self):
+        modified = datetime(2020, 5, 27, 1, 1, 0, tzinfo=timezone.utc)
+        contents = [
+            {"Key": "img/", "Size": 0, "LastModified": modified},
+            {"Key": "img/a.png", "Size": 3, "LastModified": modified},
+            {"Key": "img/b/c.png", "Size": 4, "LastModified": modified},
+            {"Key": "img/../../evil", "Size": 4, "LastModified": modified},
+        ]
+
+        sizes = {obj["Key"]: obj["Size"] for obj in contents}
+
+        def download_file(bucket_name, object_name, filename, Config):
+            with open(filename, "w") as file_:
+                file_.write("x" * sizes[object_name])
+
+        resource = mock.Mock()
+        resource.meta.client.download_file.side_effect = download_file
+        return resource, contents
+
+    def test_download_prefix(self, monkeypatch, tmp_path):
+        resource, contents = self.fake_download()
+        monkeypatch.setattr(
+            bucket, "walk_pages", lambda *args: iter([{"Contents": contents}])
+        )
+
+        stats = bucket.download_prefix(resource, "satu", "img/", str(tmp_path))
+        assert stats["transferred"] == 2
+        assert stats["skipped"] == 1
+        assert stats["bytes"] == 7
+        assert stats["failed"] == 1
+        assert stats["errors"][0]["Key"] == "img/../../evil"
+        assert os.path.isdir(tmp_path / "img")
+        assert os.path.getmtime(tmp_path / "img" / "b" / "c.png") == 1590541260
+
+        stats = bucket.download_prefix(resource, "satu", "img/", str(tmp_path))
+        assert stats["transferred"] == 0
+        assert stats["skipped"] == 3
+        assert resource.meta.client.download_file.call_count == 2
+
+    def test_local_path(self):
+        assert bucket.local_path("/tmp/dl", "a/b.png") == "/tmp/dl/a/b.png"
+        with pytest.raises(ValueError):
+            bucket.local_path("/tmp/dl", "../b.png")
+
+    def test_upload_prefix(self, monkeypatch, tmp_path):
+        (tmp_path / "img" / "b").mkdir(parents=True)
+        (tmp_path / "a.txt").write_text("abc")
+        (tmp_path / "img" / "b" / "c.png").write_text("x" * 20)
+        options = transfer.transfer_options(multipart_threshold=10)
+
+        resource = mock.Mock()
+        stats = bucket.upload_prefix(
+            resource, "satu", str(tmp_path), "backup", options=options
+        )
+        assert (stats["transferred"], stats["failed"], stats["bytes"]) == (2, 0, 23)
+
+        client = resource.meta.client
+        put_call = client.put_object.call_args
+        assert put_call[1]["Key"] == "backup/a.txt"
+        upload_call = client.upload_file.call_args
+        assert upload_call[0] == (
+            str(tmp_path / "img" / "b" / "c.png"),
+            "satu",
+            "backup/img/b/c.png",
+        )
+        assert upload_call[1]["Config"].multipart_threshold == 10
+
+    def test_upload_prefix_error(self, tmp_path):
+        (tmp_path / "a.txt").write_text("abc")
+        resource = mock.Mock()
+        resource.meta.client.put_object.side_effect = ValueError("Access Denied")
+
+        stats = bucket.upload_prefix(resource, "satu", str(tmp_path))
+        assert (stats["transferred"], stats["failed"]) == (0, 1)
+        assert stats["errors"][0]["Message"] == "Access Denied"
+
+    def test_usage_prefix(self):
+        assert bucket.usage_prefix("a/b/c/obj.png", "a/", 1) == "a/b/"
+        assert bucket.usage_prefix("a/b/c/obj.png", "a/", 2) == "a/b/c/"
+        assert bucket.usage_prefix("a/obj.png", "a/", 1) == "a/"
+
+    def test_scan_usage(self, monkeypatch):
+        monkeypatch.setattr(bucket, "walk_pages", self.fake_usage_pages)
+        assert bucket.scan_usage(resource, "bucket-name", depth=1) == (
+            1127,
+            3,
+            {"": (234, 1), "img/": (893, 2)},
+        )
 
     def fake_bucket(self, resource):
         buckets = []
@@ -91,6 +503,24 @@ class Testbucket:
             ["bucket2", (1365, 5)],
         ]
 
+    def test_disk_usage_error(self, monkeypatch):
+        def fake_usage(resource, name):
+            if name == "bucket1":
+                raise ValueError("Access Denied")
+            return self.fake_usage(resource, name)
+
+        monkeypatch.setattr(bucket, "buckets", self.fake_bucket)
+        monkeypatch.setattr(bucket, "bucket_usage", fake_usage)
+        errors = []
+        usages = bucket.disk_usage(
+            "boom", workers=3, on_error=lambda name, exc: errors.append(name)
+        )
+        assert usages == [["bucket0", (819, 3)], ["bucket2", (1365, 5)]]
+        assert errors == ["bucket1"]
+
+        with pytest.raises(ValueError, match="Access Denied"):
+            bucket.disk_usage("boom")
+
     def fake_cors(self):
         fake = mock.Mock()
         fake.Cors.return_value.cors_rules = "1jfe"
@@ -195,6 +625,51 @@ class Testbucket:
             "GmtPolicy": "Replica Data to all nodes",
         }
 
+    def test_bucket_info_fields(self, monkeypatch):
+        monkeypatch.setattr(bucket, "bucket_gmt_policy", lambda name, auth: None)
+        monkeypatch.setattr(bucket, "get_grants", mock.Mock(side_effect=AssertionError))
+        monkeypatch.setattr(bucket, "get_location", lambda client, bucket: "Jakarta")
+
+        info = bucket.bucket_info(
+            self.fake_client(), "bucket-name", "auth", ["Location", "GmtPolicy"]
+        )
+        assert info == {"Location": "Jakarta"}
+        with pytest.raises(ValueError):
+            bucket.bucket_info(self.fake_client(), "bucket-name", "auth", ["Size"])
+
+    def test_objects_info(self, monkeypatch):
+        modified = datetime(2020, 5, 27, 1, 1, 0, tzinfo=timezone.utc)
+        contents = [
+            {"Key": f"img/{name}", "Size": 3, "ETag": '"e"', "LastModified": modified}
+            for name in ["a.png", "b.png", "denied.png"]
+        ]
+        monkeypatch.setattr(bucket, "iter_files", lambda *args: iter(contents))
+
+        def get_object_acl(Bucket, Key):
+            if Key == "img/denied.png":
+                raise ValueError("Access Denied")
+            grant = {"Grantee": {"Type": "CanonicalUser", "DisplayName": "john"}}
+            return {"Grants": [dict(grant, Permission="FULL_CONTROL")]}
+
+        resource = mock.Mock()
+        resource.meta.client.head_object.return_value = {"ContentType": "image/png"}
+        resource.meta.client.get_object_acl.side_effect = get_object_acl
+
+        infos = sorted(
+            bucket.objects_info(resource, "satu", "img/", workers=2),
+            key=lambda info: info["Key"],
+        )
+        assert infos[0] == {
+            "Key": "img/a.png",
+            "ACL": [["john", "FULL_CONTROL"]],
+            "Size": 3,
+            "LastModified": modified,
+            "MD5": '"e"',
+            "MimeType": "image/png",
+            "StorageClass": None,
+        }
+        assert infos[2] == {"Key": "img/denied.png", "Error": "Access Denied"}
+
     def fake_object_resource(self):
         obj = mock.Mock()
         obj.Object.return_value.storage_class = "Group"
@@ -229,3 +704,32 @@ class Testbucket:
             bucket.generate_url(self.fake_url(), "bucket-name", "ddg.png")
             == "https://bucket.net"
         )
+
+    def test_generate_urls_cached(self, monkeypatch):
+        monkeypatch.setattr(bucket, "_url_cache", bucket.cache.TTLCache())
+        credential = ("123", "digest", "https://obs.net")
+        resource = self.fake_url()
+        generate = resource.meta.client.generate_presigned_url
+
+        urls = bucket.generate_urls(
+            resource, "satu", ["a.png", "b.png"], 600, credential=credential
+        )
+        assert urls == {"a.png": "https://bucket.net", "b.png": "https://bucket.net"}
+        bucket.generate_urls(resource, "satu", ["a.png"], 600, credential=credential)
+        assert generate.call_count == 2
+
+        # another client of the same credential reuses cached URLs
+        other = self.fake_url()
+        bucket.generate_url(other, "satu", "a.png", 600, credential=credential)
+        other.meta.client.generate_presigned_url.assert_not_called()
+
+        # a different expiry or credential is signed again
+        bucket.generate_url(resource, "satu", "a.png", 60, credential=credential)
+        assert generate.call_count == 3
+        other_credential = ("123", "other-digest", "https://obs.net")
+        bucket.generate_url(other, "satu", "a.png", 600, credential=other_credential)
+        other.meta.client.generate_presigned_url.assert_called_once()
+
+        # without a credential identity nothing is cached
+        bucket.generate_url(resource, "satu", "a.png", 600)
+        assert generate.call_count == 4
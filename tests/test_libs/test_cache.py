@@ -0,0 +1,70 @@
+from obs.libs import cache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set():
+    lru = cache.TTLCache(maxsize=2, ttl=10)
+    lru.set("foo", 1)
+    assert lru.get("foo") == 1
+    assert lru.get("bar") is None
+    assert lru.stats() == {"size": 1, "maxsize": 2, "hits": 1, "misses": 1}
+
+
+def test_lru_eviction():
+    lru = cache.TTLCache(maxsize=2, ttl=10)
+    lru.set("foo", 1)
+    lru.set("bar", 2)
+    lru.get("foo")
+    lru.set("baz", 3)
+    assert lru.get("bar") is None
+    assert lru.get("foo") == 1
+    assert len(lru) == 2
+
+
+def test_ttl_expiration():
+    timer = FakeTimer()
+    lru = cache.TTLCache(maxsize=2, ttl=10, timer=timer)
+    lru.set("foo", 1)
+    timer.now = 9
+    assert lru.get("foo") == 1
+    timer.now = 10
+    assert lru.get("foo") is None
+    assert len(lru) == 0
+
+
+def test_entry_ttl():
+    timer = FakeTimer()
+    lru = cache.TTLCache(maxsize=2, ttl=10, timer=timer)
+    lru.set("foo", 1, ttl=5)
+    lru.set("bar", 2)
+    timer.now = 5
+    assert lru.get("foo") is None
+    assert lru.get("bar") == 2
+
+
+def test_discard_if():
+    lru = cache.TTLCache()
+    for key in ["img/a", "img/b", "doc/a"]:
+        lru.set(key, 1)
+    assert lru.discard_if(lambda key: key.startswith("img/")) == 2
+    assert len(lru) == 1
+
+
+def test_get_or_set():
+    lru = cache.TTLCache()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "resource"
+
+    assert lru.get_or_set("foo", factory) == "resource"
+    assert lru.get_or_set("foo", factory) == "resource"
+    assert len(calls) == 1
@@ -1,8 +1,6 @@
 import os
 import mock
-import requests
 import yaml
-import builtins
 import obs.libs.gmt as gmt
 from obs.libs import config
 from obs.libs import auth as auth_lib
@@ -43,15 +41,10 @@ def fake_notset():
     return "notset"
 
 
-def fake_open(file):
-    pass
-
-
-def test_policies(monkeypatch):
-    monkeypatch.setattr(gmt, "policies_file", fake_policies_file)
-    monkeypatch.setattr(gmt, "is_policy_exists", lambda: True)
-    monkeypatch.setattr(builtins, "open", fake_open)
-    monkeypatch.setattr(yaml, "safe_load", lambda file: fake_get_policies())
+def test_policies(monkeypatch, tmp_path):
+    policy_file = tmp_path / "gmt_policy.yaml"
+    policy_file.write_text(yaml.safe_dump(fake_get_policies()))
+    monkeypatch.setattr(gmt, "policies_file", lambda: str(policy_file))
 
     assert gmt.get_policies() == (
         {
@@ -65,6 +58,25 @@ def test_policies(monkeypatch):
     )
 
 
+def test_policies_cache(monkeypatch, tmp_path):
+    policy_file = tmp_path / "gmt_policy.yaml"
+    policy_file.write_text(yaml.safe_dump(fake_get_policies()))
+    monkeypatch.setattr(gmt, "policies_file", lambda: str(policy_file))
+    load_policies = mock.Mock(side_effect=gmt.load_policies)
+    monkeypatch.setattr(gmt, "load_policies", load_policies)
+
+    assert gmt.policy_index()["1c32d6320"] == "No description"
+    assert gmt.policy_index()["1c32d6320"] == "No description"
+    assert load_policies.call_count == 1
+
+    policies = fake_get_policies()
+    policies["WJV-1"]["description"] = "3 Replication in Midplaza"
+    policy_file.write_text(yaml.safe_dump(policies))
+    os.utime(policy_file, (0, 0))
+    assert gmt.policy_index()["1c32d6320"] == "3 Replication in Midplaza"
+    assert load_policies.call_count == 2
+
+
 def test_notset(monkeypatch):
     monkeypatch.setattr(gmt, "policies_file", fake_notset)
     assert gmt.get_policies() == "notset"
@@ -81,15 +93,19 @@ def fake_auth():
 
 
 def test_policy_id(monkeypatch):
-    monkeypatch.setattr(requests, "get", fake_request)
+    monkeypatch.setattr(auth_lib, "http_session", lambda: mock.Mock(get=fake_request))
     monkeypatch.setattr(auth_lib, "get_endpoint", lambda url, bucket_name: None)
     assert "dd7e84cfe467c0fc11b5b075ac9acd73" == gmt.policy_id(
         "awesome-bucket", fake_auth()
     )
 
 
+def fake_policy_index():
+    return gmt.index_policies(fake_get_policies())
+
+
 def test_policy_description(monkeypatch):
-    monkeypatch.setattr(gmt, "get_policies", fake_get_policies)
+    monkeypatch.setattr(gmt, "policy_index", fake_policy_index)
     assert (
         gmt.policy_description("d3031d77b")
         == f"2 Replication in Midplaza, 1 in Technovillage"
@@ -97,10 +113,10 @@ def test_policy_description(monkeypatch):
 
 
 def test_description_notset(monkeypatch):
-    monkeypatch.setattr(gmt, "get_policies", fake_notset)
+    monkeypatch.setattr(gmt, "policies_file", fake_notset)
     assert gmt.policy_description("d3031d77b") is None
 
 
 def test_no_description(monkeypatch):
-    monkeypatch.setattr(gmt, "get_policies", fake_get_policies)
+    monkeypatch.setattr(gmt, "policy_index", fake_policy_index)
     assert "No description" == gmt.policy_description("1c32d6320")
@@ -0,0 +1,69 @@
+import pytest
+from obs.libs import cache
+from obs.libs import listing
+
+
+@pytest.fixture(autouse=True)
+def listing_cache(monkeypatch):
+    monkeypatch.setattr(listing, "_cache", cache.TTLCache(maxsize=8, ttl=30))
+
+
+def test_caching():
+    key = listing.listing_key("access", "secret", "satu", "img/")
+    assert listing.cached_listing(key) is None
+
+    entries = listing.caching(key, iter([{"Key": "img/a.png"}]))
+    assert listing.cached_listing(key) is None
+    assert [*entries] == [{"Key": "img/a.png"}]
+    assert listing.cached_listing(key) == [{"Key": "img/a.png"}]
+
+
+def test_caching_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(listing, "_cache", None)
+    monkeypatch.delenv("OBS_LIST_CACHE_TTL", raising=False)
+    key = listing.listing_key("access", "secret", "satu")
+    assert [*listing.caching(key, range(3))] == [0, 1, 2]
+    assert listing.cached_listing(key) is None
+
+
+def test_caching_too_many(monkeypatch):
+    monkeypatch.setattr(listing, "MAX_CACHED_ENTRIES", 2)
+    key = listing.listing_key("access", "secret", "satu")
+    assert len([*listing.caching(key, range(3))]) == 3
+    assert listing.cached_listing(key) is None
+
+
+def test_caching_invalidated_midway():
+    key = listing.listing_key("access", "secret", "satu")
+    entries = listing.caching(key, range(3))
+    next(entries)
+    listing.invalidate("satu", "img/a.png")
+    assert [*entries] == [1, 2]
+    assert listing.cached_listing(key) is None
+
+
+def test_invalidate():
+    keys = {
+        prefix: listing.listing_key("access", "secret", "satu", prefix)
+        for prefix in ["", "img/", "img/2020/", "doc/"]
+    }
+    other = listing.listing_key("other", "secret", "dua", "img/")
+    buckets = listing.listing_key("access", "secret")
+    for key in [*keys.values(), other, buckets]:
+        [*listing.caching(key, [])]
+
+    listing.invalidate("satu", "img/logo.png")
+    cached = {
+        prefix
+        for prefix, key in keys.items()
+        if listing.cached_listing(key) is not None
+    }
+    assert cached == {"img/2020/", "doc/"}
+    assert listing.cached_listing(other) == []
+
+    listing.invalidate("satu", "img/")
+    assert listing.cached_listing(keys["img/2020/"]) is None
+
+    listing.invalidate_buckets()
+    assert listing.cached_listing(buckets) is None
+    assert listing.cached_listing(keys["doc/"]) == []
@@ -0,0 +1,114 @@
+import os
+import mock
+import hashlib
+from datetime import datetime, timezone
+from obs.libs import sync
+
+
+class FakeBucket:
+    """Keep objects of a single bucket in memory."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = []
+
+    def put(self, key, body, modified=1590541260):
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.objects[key] = {
+            "Key": key,
+            "Size": len(body),
+            "ETag": etag,
+            "LastModified": datetime.fromtimestamp(modified, timezone.utc),
+            "Body": body,
+        }
+        return etag
+
+    def put_object(self, Bucket, Key, Body):
+        self.uploads.append(Key)
+        return {"ETag": self.put(Key, Body.read(), modified=2000000000)}
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"])
+        return {}
+
+    def download_file(self, bucket_name, key, filename, Config=None):
+        with open(filename, "wb") as fp:
+            fp.write(self.objects[key]["Body"])
+
+    def list_objects_v2(self, Bucket, Prefix="", **kwargs):
+        contents = [
+            {name: value for name, value in obj.items() if name != "Body"}
+            for key, obj in sorted(self.objects.items())
+            if key.startswith(Prefix)
+        ]
+        return {"Contents": contents}
+
+
+def fake_resource():
+    resource = mock.Mock()
+    resource.meta.client = FakeBucket()
+    return resource
+
+
+def write(path, content, mtime=1500000000):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_push(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "manifest_dir", lambda: str(tmp_path / "manifest"))
+    local_dir = tmp_path / "local"
+    write(local_dir / "a.txt", b"abc")
+    write(local_dir / "img" / "b.png", b"png")
+    write(local_dir / "new.txt", b"new")
+
+    resource = fake_resource()
+    s3 = resource.meta.client
+    s3.put("backup/a.txt", b"abc")
+    s3.put("backup/old.txt", b"old")
+
+    stats = sync.push(resource, str(local_dir), "satu", "backup", delete=True)
+    assert (stats["transferred"], stats["skipped"], stats["deleted"]) == (2, 1, 1)
+    assert sorted(s3.uploads) == ["backup/img/b.png", "backup/new.txt"]
+    assert sorted(s3.objects) == ["backup/a.txt", "backup/img/b.png", "backup/new.txt"]
+
+    # unchanged files are skipped from manifest without listing the bucket
+    s3.list_objects_v2 = mock.Mock(side_effect=AssertionError("listed"))
+    write(local_dir / "a.txt", b"abcd", mtime=1600000000)
+    stats = sync.push(resource, str(local_dir), "satu", "backup/")
+    assert (stats["transferred"], stats["skipped"]) == (1, 2)
+    assert s3.objects["backup/a.txt"]["Body"] == b"abcd"
+
+
+def test_pull(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "manifest_dir", lambda: str(tmp_path / "manifest"))
+    local_dir = tmp_path / "local"
+    write(local_dir / "a.txt", b"abc", mtime=1590541260)
+    write(local_dir / "stale.txt", b"stale")
+
+    resource = fake_resource()
+    s3 = resource.meta.client
+    s3.put("backup/a.txt", b"abc")
+    s3.put("backup/img/b.png", b"png")
+
+    stats = sync.pull(resource, "satu", str(local_dir), "backup/", delete=True)
+    assert (stats["transferred"], stats["skipped"], stats["deleted"]) == (1, 1, 1)
+    assert (local_dir / "img" / "b.png").read_bytes() == b"png"
+    assert not (local_dir / "stale.txt").exists()
+
+    s3.put("backup/img/b.png", b"jpeg", modified=1600000000)
+    stats = sync.pull(resource, "satu", str(local_dir), "backup/")
+    assert (stats["transferred"], stats["skipped"]) == (1, 1)
+    assert (local_dir / "img" / "b.png").read_bytes() == b"jpeg"
+
+    manifest = sync.load_manifest(sync.manifest_file(str(local_dir), "satu", "backup/"))
+    assert manifest["img/b.png"]["etag"] == s3.objects["backup/img/b.png"]["ETag"]
+
+
+def test_manifest_file(monkeypatch):
+    monkeypatch.setattr(sync, "manifest_dir", lambda: "home/user/sync")
+    path = sync.manifest_file("/data", "satu", "backup/")
+    assert path.startswith("home/user/sync/")
+    assert path != sync.manifest_file("/data", "satu", "other/")
@@ -0,0 +1,274 @@
+import io
+import mock
+import os
+import pytest
+import hashlib
+from datetime import datetime, timezone
+
+from obs.libs import transfer
+
+MiB = 1024 * 1024
+
+
+def test_parse_size():
+    assert transfer.parse_size(1024) == 1024
+    assert transfer.parse_size("1024") == 1024
+    assert transfer.parse_size("64MiB") == 64 * MiB
+    assert transfer.parse_size("1 MB") == 1000000
+    with pytest.raises(ValueError):
+        transfer.parse_size("huge")
+
+
+def test_auto_chunksize():
+    assert transfer.auto_chunksize(0) == 8 * MiB
+    assert transfer.auto_chunksize(1024 * MiB) == 8 * MiB
+    assert transfer.auto_chunksize(100 * 1024 * MiB) == 128 * MiB
+    assert transfer.auto_chunksize(10 ** 13) == 5 * 1024 * MiB
+
+
+def test_transfer_options(monkeypatch):
+    monkeypatch.setenv("OBS_MULTIPART_THRESHOLD", "64MiB")
+    monkeypatch.setenv("OBS_MULTIPART_CHUNKSIZE", "Auto")
+    monkeypatch.delenv("OBS_MAX_CONCURRENCY", raising=False)
+
+    options = transfer.transfer_options(max_concurrency=20)
+    assert options == {
+        "multipart_threshold": 64 * MiB,
+        "multipart_chunksize": "auto",
+        "max_concurrency": 20,
+    }
+
+    options = transfer.transfer_options(multipart_chunksize="16MiB")
+    assert options["multipart_chunksize"] == 16 * MiB
+    assert options["max_concurrency"] == 10
+
+
+def test_transfer_config(monkeypatch):
+    options = transfer.transfer_options(8 * MiB, "auto", 4)
+    config = transfer.transfer_config(100 * 1024 * MiB, options)
+    assert config.multipart_chunksize == 128 * MiB
+    assert config.max_concurrency == 4
+
+    options = transfer.transfer_options(8 * MiB, 32 * MiB, 4)
+    config = transfer.transfer_config(100 * 1024 * MiB, options)
+    assert config.multipart_chunksize == 32 * MiB
+
+
+class FakeRangeClient:
+    def __init__(self, body, part_sizes=None, encryption=None):
+        self.body = body
+        self.part_sizes = part_sizes
+        self.encryption = encryption
+        self.ranges = []
+        if part_sizes:
+            offsets = [sum(part_sizes[:index]) for index in range(len(part_sizes))]
+            parts = [body[o : o + size] for o, size in zip(offsets, part_sizes)]
+            digests = [hashlib.md5(part).digest() for part in parts]
+            self.etag = transfer.multipart_etag(digests)
+        else:
+            self.etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+    def head_object(self, Bucket, Key, PartNumber=None, IfMatch=None):
+        if PartNumber:
+            assert IfMatch == self.etag
+            size = self.part_sizes[PartNumber - 1]
+            return {"ContentLength": size, "ETag": self.etag}
+        head = {"ContentLength": len(self.body), "ETag": self.etag}
+        if self.encryption:
+            head["ServerSideEncryption"] = self.encryption
+        return head
+
+    def get_object(self, Bucket, Key, Range, IfMatch):
+        assert IfMatch == self.etag
+        start, end = map(int, Range[len("bytes=") :].split("-"))
+        self.ranges.append((start, end))
+        return {"Body": io.BytesIO(self.body[start : end + 1])}
+
+
+def test_download_ranges(tmp_path):
+    body = os.urandom(100)
+    client = FakeRangeClient(body)
+    options = transfer.transfer_options(multipart_chunksize=30, max_concurrency=4)
+
+    path = str(tmp_path / "obj")
+    assert transfer.download_ranges(client, "satu", "obj", path, options) == 100
+    assert open(path, "rb").read() == body
+    assert sorted(client.ranges) == [(0, 29), (30, 59), (60, 89), (90, 99)]
+    assert os.listdir(tmp_path) == ["obj"]
+
+
+def test_download_ranges_multipart(tmp_path):
+    body = os.urandom(100)
+    client = FakeRangeClient(body, part_sizes=[40, 40, 20])
+
+    path = str(tmp_path / "obj")
+    transfer.download_ranges(client, "satu", "obj", path)
+    assert open(path, "rb").read() == body
+    assert sorted(client.ranges) == [(0, 39), (40, 79), (80, 99)]
+
+
+def test_download_ranges_uneven_parts(tmp_path):
+    body = os.urandom(100)
+    client = FakeRangeClient(body, part_sizes=[40, 25, 35])
+
+    path = str(tmp_path / "obj")
+    transfer.download_ranges(client, "satu", "obj", path)
+    assert open(path, "rb").read() == body
+    assert sorted(client.ranges) == [(0, 39), (40, 64), (65, 99)]
+
+
+def test_download_ranges_kms(tmp_path):
+    body = os.urandom(100)
+    client = FakeRangeClient(body, encryption="aws:kms")
+    client.etag = '"d41d8cd98f00b204e9800998ecf8427e"'
+
+    path = str(tmp_path / "obj")
+    assert transfer.download_ranges(client, "satu", "obj", path) == 100
+    assert open(path, "rb").read() == body
+
+
+def test_download_ranges_mismatch(tmp_path):
+    client = FakeRangeClient(b"x" * 100)
+    client.etag = '"d41d8cd98f00b204e9800998ecf8427e"'
+
+    with pytest.raises(IOError) as exc:
+        transfer.download_ranges(client, "satu", "obj", str(tmp_path / "obj"))
+    assert "ETag mismatch" in str(exc.value)
+    assert os.listdir(tmp_path) == []
+
+
+def test_multipart_upload():
+    client = mock.Mock()
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part.side_effect = lambda **kwargs: {
+        "ETag": f'"{len(kwargs["Body"])}"'
+    }
+    options = transfer.transfer_options(multipart_chunksize="5MiB", max_concurrency=2)
+
+    upload = transfer.MultipartUpload(client, "satu", "obj", options=options)
+    for _ in range(11):
+        upload.write(b"x" * MiB)
+    upload.complete()
+
+    parts = client.complete_multipart_upload.call_args[1]["MultipartUpload"]
+    assert parts["Parts"] == [
+        {"PartNumber": 1, "ETag": f'"{5 * MiB}"'},
+        {"PartNumber": 2, "ETag": f'"{5 * MiB}"'},
+        {"PartNumber": 3, "ETag": f'"{MiB}"'},
+    ]
+
+
+def test_multipart_upload_abort():
+    client = mock.Mock()
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part.side_effect = ValueError("Access Denied")
+    options = transfer.transfer_options(multipart_chunksize="5MiB", max_concurrency=1)
+
+    upload = transfer.MultipartUpload(client, "satu", "obj", options=options)
+    with pytest.raises(ValueError):
+        for _ in range(20):
+            upload.write(b"x" * MiB)
+    upload.abort()
+
+    assert client.upload_part.call_count == 1
+    client.abort_multipart_upload.assert_called_once_with(
+        Bucket="satu", Key="obj", UploadId="up-1"
+    )
+
+
+def test_multipart_upload_small():
+    client = mock.Mock()
+    options = transfer.transfer_options(multipart_chunksize="5MiB")
+
+    upload = transfer.MultipartUpload(
+        client, "satu", "obj", options=options, ContentType="image/png"
+    )
+    upload.write(b"x" * 1024)
+    upload.complete()
+
+    client.create_multipart_upload.assert_not_called()
+    client.put_object.assert_called_once_with(
+        Bucket="satu", Key="obj", Body=b"x" * 1024, ContentType="image/png"
+    )
+
+    upload = transfer.MultipartUpload(client, "satu", "obj", options=options)
+    upload.write(b"x")
+    upload.abort()
+    client.abort_multipart_upload.assert_not_called()
+
+
+def test_multipart_upload_max_parts(monkeypatch):
+    monkeypatch.setattr(transfer, "MAX_PARTS", 2)
+    client = mock.Mock()
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part.return_value = {"ETag": '"1"'}
+    options = transfer.transfer_options(multipart_chunksize="5MiB")
+
+    upload = transfer.MultipartUpload(client, "satu", "obj", options=options)
+    with pytest.raises(ValueError, match="exceeds 2 parts"):
+        upload.write(b"x" * 15 * MiB)
+    upload.abort()
+
+    upload = transfer.MultipartUpload(client, "satu", "obj", 30 * MiB, options)
+    assert upload.part_size == 15 * MiB
+
+
+def test_copy_multipart():
+    client = mock.Mock()
+    client.head_object.return_value = {"ContentLength": 12 * MiB}
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part_copy.side_effect = lambda **kwargs: {
+        "CopyPartResult": {"ETag": kwargs["CopySourceRange"]}
+    }
+    options = transfer.transfer_options(multipart_chunksize="5MiB", max_concurrency=3)
+
+    transfer.copy_multipart(client, "satu", "big", "dua", "big", 12 * MiB, options)
+
+    parts = client.complete_multipart_upload.call_args[1]["MultipartUpload"]
+    assert parts["Parts"] == [
+        {"PartNumber": 1, "ETag": f"bytes=0-{5 * MiB - 1}"},
+        {"PartNumber": 2, "ETag": f"bytes={5 * MiB}-{10 * MiB - 1}"},
+        {"PartNumber": 3, "ETag": f"bytes={10 * MiB}-{12 * MiB - 1}"},
+    ]
+    client.abort_multipart_upload.assert_not_called()
+
+
+def test_copy_multipart_headers():
+    expires = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    client = mock.Mock()
+    client.head_object.return_value = {
+        "ContentLength": 12 * MiB,
+        "ContentType": "image/png",
+        "Metadata": {"owner": "satu"},
+        "CacheControl": "max-age=60",
+        "Expires": expires,
+        "ETag": '"abc-3"',
+    }
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part_copy.return_value = {"CopyPartResult": {"ETag": '"abc"'}}
+
+    transfer.copy_multipart(client, "satu", "big", "dua", "big", 12 * MiB)
+
+    client.head_object.assert_called_once_with(Bucket="satu", Key="big")
+    client.create_multipart_upload.assert_called_once_with(
+        Bucket="dua",
+        Key="big",
+        ContentType="image/png",
+        Metadata={"owner": "satu"},
+        CacheControl="max-age=60",
+        Expires=expires,
+    )
+
+
+def test_copy_multipart_abort():
+    client = mock.Mock()
+    client.head_object.return_value = {"ContentLength": 12 * MiB}
+    client.create_multipart_upload.return_value = {"UploadId": "up-1"}
+    client.upload_part_copy.side_effect = ValueError("Access Denied")
+
+    with pytest.raises(ValueError):
+        transfer.copy_multipart(client, "satu", "big", "dua", "big", 12 * MiB)
+    client.complete_multipart_upload.assert_not_called()
+    client.abort_multipart_upload.assert_called_once_with(
+        Bucket="dua", Key="big", UploadId="up-1"
+    )
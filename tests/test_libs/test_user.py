@@ -124,3 +124,30 @@ def test_create():
 
 def test_remove():
     assert user.remove(fake_client(), "user", "group")
+
+
+def test_iter_users():
+    user_ids = [f"user{index:02}" for index in range(5)]
+    client = mock.Mock()
+    requests = []
+
+    def fake_list(groupId, userType, userStatus, limit, offset=None):
+        requests.append(offset)
+        start = user_ids.index(offset) if offset else 0
+        return [{"userId": user_id} for user_id in user_ids[start : start + limit]]
+
+    client.user.list.side_effect = fake_list
+    users = user.iter_users(client, "group", page_size=2)
+    assert [item["userId"] for item in users] == user_ids
+    assert requests == [None, "user02", "user04"]
+
+
+def test_iter_users_error():
+    client = mock.Mock()
+    client.user.list.return_value = {"reason": "Forbidden", "status_code": 403}
+    try:
+        next(user.iter_users(client, "group"))
+    except ValueError as exc:
+        assert f"{exc}" == "Forbidden"
+    else:
+        raise AssertionError("error not raised")
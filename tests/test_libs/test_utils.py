@@ -37,3 +37,29 @@ def test_check_plain(monkeypatch):
     monkeypatch.setattr(xmltodict, "parse", fake_parse)
     with pytest.raises(ValueError, match=(f"foo: False")):
         utils.check_plain(fake_response())
+
+
+def test_run_concurrently():
+    def square(number):
+        if number == 3:
+            raise ValueError("three")
+        return number * number
+
+    results = {
+        item: (result, error)
+        for item, result, error in utils.run_concurrently(
+            square, iter(range(5)), workers=2
+        )
+    }
+    assert [results[item][0] for item in (0, 1, 2, 4)] == [0, 1, 4, 16]
+    assert str(results[3][1]) == "three"
+
+
+def test_chunks():
+    assert list(utils.chunks(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(utils.chunks([], 2)) == []
+
+
+def test_split_fields():
+    assert utils.split_fields("ACL, Location,") == ["ACL", "Location"]
+    assert utils.split_fields("") is None
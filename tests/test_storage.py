@@ -1,7 +1,6 @@
 import pytest
 import mock
 import os
-import requests
 import xmltodict
 from datetime import datetime
 
@@ -10,6 +9,9 @@ import obs.libs.auth
 import obs.libs.gmt
 import obs.libs.utils
 import obs.libs.config
+import obs.libs.sync
+import obs.libs.transfer
+import obs.cli.storage.bucket
 from obs.cli.main import cli
 from click.testing import CliRunner
 
@@ -107,61 +109,130 @@ def test_except_ls(monkeypatch, resource):
     assert result.output == (f"Bucket listing failed. \n" f"Invalid format specifier\n")
 
 
-def fake_get_objects(resource, bucket_name, prefix=None):
-    return {
-        "Contents": [
-            {
-                "Key": "foo.txt",
-                "LastModified": datetime(2019, 9, 24, 1, 1, 0, 0),
-                "ETag": '"d41d8cd98f00b204e9800998ecffake"',
-                "Size": 36,
-                "StorageClass": "STANDARD",
-                "Owner": {
-                    "DisplayName": "john doe",
-                    "ID": "5ac765187f93d3f1cef810afakefake",
-                },
-            }
-        ],
-        "CommonPrefixes": [{"Prefix": "a/b/"}],
+def fake_iter_objects(resource, bucket_name, prefix=None):
+    yield {"Prefix": "a/b/"}
+    yield {
+        "Key": "foo.txt",
+        "LastModified": datetime(2019, 9, 24, 1, 1, 0, 0),
+        "ETag": '"d41d8cd98f00b204e9800998ecffake"',
+        "Size": 36,
+        "StorageClass": "STANDARD",
+        "Owner": {"DisplayName": "john doe", "ID": "5ac765187f93d3f1cef810afakefake"},
     }
 
 
 def test_ls_storage(monkeypatch, resource):
-    monkeypatch.setattr(obs.libs.bucket, "get_objects", fake_get_objects)
+    monkeypatch.setattr(obs.libs.bucket, "iter_objects", fake_iter_objects)
 
     runner = CliRunner()
     result = runner.invoke(cli, ["storage", "ls", "s3://bucket-two/a/b/"])
 
-    assert "bucket-two/foo.txt" in result.output
+    assert result.output == (
+        f"         DIR bucket-two/a/b/\n"
+        f"2019-09-24 01:01:00, 36.0 B, bucket-two/foo.txt\n"
+    )
 
 
 def test_empty_storage(monkeypatch, resource):
     monkeypatch.setattr(
-        obs.libs.bucket, "get_objects", lambda resource, bucket_name, prefix: ""
+        obs.libs.bucket, "iter_objects", lambda resource, bucket_name, prefix: iter([])
     )
 
     runner = CliRunner()
     result = runner.invoke(cli, ["storage", "ls", "bucket-one"])
 
+    assert result.output == f'Bucket "bucket-one" is empty\n'
+
+
+def test_remove_recursive(monkeypatch, resource):
+    def fake_remove_prefix(resource, bucket_name, prefix, workers):
+        error = {"Key": "logs/b", "Code": "AccessDenied", "Message": "Denied"}
+        return 9, [error]
+
+    monkeypatch.setattr(obs.libs.bucket, "remove_prefix", fake_remove_prefix)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["storage", "rm", "-r", "s3://bucket-one/logs/"])
+
+    assert result.output == (
+        f'Object "logs/b" removal failed. AccessDenied: Denied\n'
+        f'9 objects removed from "bucket-one/logs/"\n'
+    )
+
+
+def test_download_recursive(monkeypatch, resource):
+    def fake_download_prefix(
+        resource, bucket_name, prefix, local_dir, workers, options
+    ):
+        assert (prefix, local_dir, workers) == ("img/", "backup", 4)
+        return {
+            "transferred": 2,
+            "skipped": 1,
+            "failed": 0,
+            "bytes": 2048,
+            "errors": [],
+        }
+
+    monkeypatch.setattr(obs.libs.bucket, "download_prefix", fake_download_prefix)
+    monkeypatch.setattr(obs.cli.storage.bucket.time, "monotonic", iter([0, 2]).__next__)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["storage", "get", "-r", "s3://bucket-one/img/", "backup", "-j", "4"]
+    )
+
+    assert result.output == (
+        f"Downloaded 2 objects, 2.00 KiB in 2.0s (1.00 KiB/s), 1 skipped, 0 failed\n"
+    )
+
+
+def test_sync(monkeypatch, resource):
+    def fake_push(
+        resource, local_dir, bucket_name, prefix, delete, full, workers, options
+    ):
+        assert (local_dir, bucket_name, prefix) == ("photos", "bucket-one", "img/")
+        assert (delete, full, workers) == (True, False, 10)
+        return {
+            "transferred": 1,
+            "skipped": 3,
+            "failed": 0,
+            "deleted": 2,
+            "bytes": 1024,
+            "errors": [],
+        }
+
+    monkeypatch.setattr(obs.libs.sync, "push", fake_push)
+    monkeypatch.setattr(obs.cli.storage.bucket.time, "monotonic", iter([0, 1]).__next__)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["storage", "sync", "photos", "s3://bucket-one/img/", "--delete"]
+    )
+
     assert result.output == (
-        f'Bucket "bucket-one" is empty\n' f"string indices must be integers\n"
+        f"Uploaded 1 objects, 1.00 KiB in 1.0s (1.00 KiB/s), 3 skipped, 0 failed, "
+        f"2 deleted\n"
     )
 
 
-def fake_get_files(resource, bucket_name, prefix=""):
-    obj1 = mock.Mock()
-    obj1.key = "ddg.png"
-    obj1.size = 234
+def test_sync_local(resource):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["storage", "sync", "photos", "backup"])
 
-    obj2 = mock.Mock()
-    obj2.key = "obj.txt"
-    obj2.size = 793
+    assert result.exit_code == 2
 
-    return [obj1, obj2]
+
+def fake_walk_pages(resource, bucket_name, prefix="", workers=1):
+    yield {
+        "Contents": [
+            {"Key": "ddg.png", "Size": 234},
+            {"Key": "img/obj.txt", "Size": 793},
+        ]
+    }
 
 
 def test_bucket_usage(monkeypatch, resource):
-    monkeypatch.setattr(obs.libs.bucket, "get_files", fake_get_files)
+    monkeypatch.setattr(obs.libs.bucket, "walk_pages", fake_walk_pages)
 
     runner = CliRunner()
     result = runner.invoke(cli, ["storage", "du", "s3://bucket-one/"])
@@ -169,7 +240,21 @@ def test_bucket_usage(monkeypatch, resource):
     assert result.output == (f'1.00 KiB, 2 objects in "bucket-one" bucket\n')
 
 
-def fake_bucket_info(resource, bucket_name, auth):
+def test_prefix_usage(monkeypatch, resource):
+    monkeypatch.setattr(obs.libs.bucket, "walk_pages", fake_walk_pages)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["storage", "du", "s3://bucket-one/", "--depth", "1"])
+
+    assert result.output == (
+        f'234.00 Byte, 1 objects in "bucket-one/"\n'
+        f'793.00 Byte, 1 objects in "bucket-one/img/"\n'
+        f"---\n"
+        f'1.00 KiB, 2 objects in "bucket-one" bucket\n'
+    )
+
+
+def fake_bucket_info(resource, bucket_name, auth, fields=None):
     acl = [[["Test user"], ["FULL_CONTROL"]], [["Public"], ["FULL_CONTROL"]]]
     info = {
         "ACL": acl,
@@ -199,7 +284,21 @@ def test_bucket_info(monkeypatch, resource, plain_auth):
     )
 
 
-def fake_exc_bucket_info(resource, bucket_name, auth):
+def test_bucket_info_fields(monkeypatch, resource, plain_auth):
+    def fake_bucket_info(resource, bucket_name, auth, fields):
+        assert fields == ["Location", "ACL"]
+        return {"Location": "US", "ACL": [["Public", "READ"]]}
+
+    monkeypatch.setattr(obs.libs.bucket, "bucket_info", fake_bucket_info)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["storage", "info", "bucket-one", "--fields", "Location,ACL"]
+    )
+    assert result.output == f"Location: US\nACL: Public : READ\n"
+
+
+def fake_exc_bucket_info(resource, bucket_name, auth, fields=None):
     acl = [["Test user"], ["FULL_CONTROL"]]
     info = {
         "ACL": acl,
@@ -259,6 +358,23 @@ def test_object_info(monkeypatch, resource, plain_auth):
     )
 
 
+def test_objects_info(monkeypatch, resource):
+    def fake_objects_info(resource, bucket_name, prefix, workers):
+        assert (bucket_name, prefix, workers) == ("bucket-one", "img/", 10)
+        yield {"Key": "img/a.png", "Size": 3, "LastModified": datetime(2019, 9, 24)}
+        yield {"Key": "img/b.png", "Error": "Access Denied"}
+
+    monkeypatch.setattr(obs.libs.bucket, "objects_info", fake_objects_info)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["storage", "info", "-r", "s3://bucket-one/img/"])
+
+    assert result.output == (
+        '{"Key": "img/a.png", "Size": 3, "LastModified": "2019-09-24 00:00:00"}\n'
+        'Object "img/b.png" info fetching failed. Access Denied\n'
+    )
+
+
 def fake_exc_object_info(resource, bucket_name, object_name):
     info = {
         "ACL": "foo",
@@ -297,6 +413,25 @@ def test_presign(monkeypatch, resource):
     )
 
 
+def test_presign_stdin(monkeypatch, resource):
+    def fake_generate_urls(resource, bucket_name, object_names, expire):
+        assert (bucket_name, expire) == ("bucket-one", 60)
+        return {name: f"https://myendpotin.net/{name}" for name in object_names}
+
+    monkeypatch.setattr(obs.libs.bucket, "generate_urls", fake_generate_urls)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["storage", "presign", "s3://bucket-one/img/", "--stdin", "--expire", "60"],
+        input="a.png\n\nb.png\n",
+    )
+
+    assert result.output == (
+        "https://myendpotin.net/img/a.png\nhttps://myendpotin.net/img/b.png\n"
+    )
+
+
 def test_except_presign(monkeypatch, resource):
 
     runner = CliRunner()
@@ -314,7 +449,7 @@ def create_fake_buck(objsize):
     return buck.total_size, buck.total_objects
 
 
-def fake_disk_usage(resource):
+def fake_disk_usage(resource, workers, on_error):
     bucket_name = ["green", "black"]
     disk_usages = []
     buck = []
@@ -339,7 +474,7 @@ def test_disk_usage(monkeypatch, resource):
     )
 
 
-def fake_exc_disk_usage(resource):
+def fake_exc_disk_usage(resource, workers, on_error):
     bucket_name = ["green", "black"]
     disk_usages = []
     buck = []
@@ -456,6 +591,62 @@ def test_cp(monkeypatch):
     assert result.output == f'Object "obj1" copied successfully\n'
 
 
+def test_mv_recursive(monkeypatch, resource):
+    def fake_copy_prefix(
+        resource, src_bucket, prefix, dest_bucket, dest_prefix, move, workers
+    ):
+        assert (prefix, dest_bucket, dest_prefix) == ("logs/", "bucket-one", "old/")
+        assert (move, workers) == (True, 4)
+        return {
+            "transferred": 3,
+            "skipped": 0,
+            "failed": 1,
+            "deleted": 3,
+            "bytes": 3072,
+            "errors": [{"Key": "logs/b", "Message": "Access Denied"}],
+        }
+
+    monkeypatch.setattr(obs.libs.bucket, "copy_prefix", fake_copy_prefix)
+    monkeypatch.setattr(obs.cli.storage.bucket.time, "monotonic", iter([0, 3]).__next__)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["storage", "mv", "-r", "s3://bucket-one/logs/", "s3://bucket-one/old/"]
+        + ["-j", "4"],
+    )
+
+    assert result.output == (
+        f'Object "logs/b" move failed. Access Denied\n'
+        f"Moved 3 objects, 3.00 KiB in 3.0s (1.00 KiB/s), 0 skipped, 1 failed\n"
+    )
+
+
+def test_cp_recursive_root(monkeypatch):
+    def fake_copy_prefix(
+        resource, src_bucket, prefix, dest_bucket, dest_prefix, move, workers
+    ):
+        assert (prefix, dest_bucket, dest_prefix) == ("foo/", "bucket-two", "")
+        return {
+            "transferred": 1,
+            "skipped": 0,
+            "failed": 0,
+            "bytes": 1024,
+            "errors": [],
+        }
+
+    monkeypatch.setattr(obs.cli.storage.commands, "get_resources", mock.Mock)
+    monkeypatch.setattr(obs.libs.bucket, "copy_prefix", fake_copy_prefix)
+    monkeypatch.setattr(obs.cli.storage.bucket.time, "monotonic", iter([0, 1]).__next__)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["storage", "cp", "-r", "s3://bucket-one/foo/", "s3://bucket-two/"]
+    )
+
+    assert result.output.startswith("Copied 1 objects")
+
+
 def test_except_cp(resource):
     runner = CliRunner()
     result = runner.invoke(
@@ -501,7 +692,7 @@ def fake_mb(*args, **kwargs):
 
 def test_mb(monkeypatch, plain_auth):
     monkeypatch.setattr(obs.libs.auth, "strtobool", lambda http: True)
-    monkeypatch.setattr(requests, "put", fake_mb)
+    monkeypatch.setattr(obs.libs.auth, "http_session", lambda: mock.Mock(put=fake_mb))
     monkeypatch.setattr(obs.libs.utils, "check_plain", lambda response: None)
 
     runner = CliRunner()
@@ -606,7 +797,10 @@ def test_get(monkeypatch, fs, resource):
     def donwload():
         fs.create_file("/obj1.jpg")
         resource = mock.Mock()
-        resource.Object.return_value.download_file.side_effect = lambda name: None
+        resource.Object.return_value.download_file.side_effect = (
+            lambda name, Config: None
+        )
+        resource.Object.return_value.content_length = 1024
         return resource
 
     monkeypatch.setattr(obs.cli.storage.commands, "get_resources", donwload)
@@ -621,6 +815,37 @@ def test_get(monkeypatch, fs, resource):
     assert result.output == f'Object "obj1.jpg" downloaded successfully\n'
 
 
+def test_get_ranged(monkeypatch, resource):
+    def fake_download_ranges(client, bucket_name, object_name, path, options):
+        assert (bucket_name, object_name, path) == (
+            "bucket-one",
+            "obj1.jpg",
+            "obj1.jpg",
+        )
+        assert options["max_concurrency"] == 16
+
+    is_exists = mock.Mock(return_value=True)
+    monkeypatch.setattr(obs.libs.transfer, "download_ranges", fake_download_ranges)
+    monkeypatch.setattr(obs.cli.storage.commands, "get_resources", mock.Mock)
+    monkeypatch.setattr(obs.libs.bucket, "is_exists", is_exists)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "storage",
+            "get",
+            "s3://bucket-one/obj1.jpg",
+            "--ranged",
+            "--max-concurrency",
+            "16",
+        ],
+    )
+
+    assert result.output == f'Object "obj1.jpg" downloaded successfully\n'
+    is_exists.assert_not_called()
+
+
 def test_except_get(monkeypatch, resource):
     monkeypatch.setattr(
         obs.libs.bucket, "is_exists", lambda resource, bucket, object: False
@@ -647,6 +872,24 @@ def test_put(monkeypatch, fs, resource):
     assert result.output == f'Object "obj1.png" uploaded successfully\n'
 
 
+def test_put_invalid_chunksize(monkeypatch, resource):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "storage",
+            "put",
+            "obj1.png",
+            "s3://bucket-one/obj1.png",
+            "--multipart-chunksize",
+            "huge",
+        ],
+    )
+
+    assert result.exit_code == 2
+    assert "Invalid size: huge" in result.output
+
+
 def fake_dir():
     resource = mock.Mock()
     resource.meta.client.put_object.side_effect = lambda **kwargs: "done"